@@ -0,0 +1,68 @@
+-- migrations/001_partition_attack_tables.sql
+--
+-- "Attack_log"(detected_at) / "Attack_traffic"("@timestamp") 를 시간 범위(RANGE) 파티션 테이블로 전환합니다.
+--
+-- - 기존 테이블은 데이터를 복사하지 않고 이름만 바꿔 "<테이블>_legacy" 파티션(MINVALUE ~ 내일 0시 UTC)으로 붙입니다.
+-- - 파티션 테이블의 PK 는 파티션 키를 포함해야 하므로 (id, 시간) 복합 키가 됩니다. id 시퀀스는 그대로 이어서 사용하므로
+--   ORM 모델(src/models/models.py)은 변경 없이 id 단일 키로 동작합니다.
+-- - 이후 파티션은 src/monitoring/partition_maintenance.py 가 PARTITION_INTERVAL 단위로 미리 만들고, 보존 기간이 지나면 삭제/분리합니다.
+--   적용 직후 한 번 실행하세요:  python -m src.monitoring.partition_maintenance --once
+-- - 범위 밖의 행은 "<테이블>_default" 파티션에 저장되며, 유지보수 작업이 해당 범위의 파티션을 만들 때 옮깁니다.
+
+BEGIN;
+
+DO $$
+DECLARE
+    spec RECORD;
+    idx RECORD;
+    seq TEXT;
+    boundary TIMESTAMPTZ := date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' + INTERVAL '1 day';
+BEGIN
+    FOR spec IN
+        SELECT * FROM (VALUES
+            ('Attack_log', 'log_id', 'detected_at'),
+            ('Attack_traffic', 'traffic_id', '@timestamp')
+        ) AS t(tbl, pk, ts)
+    LOOP
+        -- 이미 전환된 테이블은 건너뜁니다.
+        IF EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid
+                   WHERE c.relname = spec.tbl AND c.relnamespace = 'public'::regnamespace) THEN
+            CONTINUE;
+        END IF;
+
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', spec.tbl, spec.tbl || '_legacy');
+
+        -- 새 부모 테이블과 이름이 겹치지 않도록 기존 인덱스(PK 포함) 이름에 _legacy 를 붙입니다.
+        FOR idx IN SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND tablename = spec.tbl || '_legacy' LOOP
+            EXECUTE format('ALTER INDEX %I RENAME TO %I', idx.indexname, left(idx.indexname, 56) || '_legacy');
+        END LOOP;
+
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS, PRIMARY KEY (%I, %I)) PARTITION BY RANGE (%I)',
+            spec.tbl, spec.tbl || '_legacy', spec.pk, spec.ts, spec.ts
+        );
+
+        -- id 시퀀스의 소유권을 새 테이블로 옮겨, legacy 파티션이 삭제되어도 시퀀스가 남도록 합니다.
+        seq := pg_get_serial_sequence(quote_ident(spec.tbl || '_legacy'), spec.pk);
+        IF seq IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.%I', seq, spec.tbl, spec.pk);
+        END IF;
+
+        EXECUTE format('ALTER TABLE %I ADD FOREIGN KEY (user_id) REFERENCES "Users" (user_id)', spec.tbl);
+        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (MINVALUE) TO (%L)',
+                       spec.tbl, spec.tbl || '_legacy', boundary);
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', spec.tbl || '_default', spec.tbl);
+    END LOOP;
+END $$;
+
+-- 부모 테이블에 만든 인덱스는 기존 / 이후 파티션 모두에 자동으로 생성됩니다.
+CREATE INDEX IF NOT EXISTS "ix_Attack_log_detected_at" ON "Attack_log" (detected_at);
+CREATE INDEX IF NOT EXISTS "ix_Attack_log_log_attack_id" ON "Attack_log" (log_attack_id);
+CREATE INDEX IF NOT EXISTS "ix_Attack_log_attack_type" ON "Attack_log" (attack_type);
+CREATE INDEX IF NOT EXISTS "ix_Attack_log_source_address" ON "Attack_log" (source_address);
+
+CREATE INDEX IF NOT EXISTS "ix_Attack_traffic_@timestamp" ON "Attack_traffic" ("@timestamp");
+CREATE INDEX IF NOT EXISTS "ix_Attack_traffic_traffic_attack_id" ON "Attack_traffic" (traffic_attack_id);
+CREATE INDEX IF NOT EXISTS "ix_Attack_traffic_Src_IP" ON "Attack_traffic" ("Src_IP");
+
+COMMIT;
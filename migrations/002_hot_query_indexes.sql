@@ -0,0 +1,34 @@
+-- migrations/002_hot_query_indexes.sql
+--
+-- 자주 실행되는 조회 형태에 맞춘 인덱스입니다. (001 적용 후 실행)
+-- 파티션 테이블의 부모에 만든 인덱스는 모든 파티션에 생성되며, 이후 만들어지는 파티션에도 자동으로 생성됩니다.
+-- 적용 후 인덱스 사용 여부는 pytest tests/test_query_plans.py 로 확인합니다.
+--
+-- - 알림 감시(postgres_watcher):   notification = false ORDER BY 시간 LIMIT :batch
+-- - attack_search_tool / get_recent_threat_logs / get_threat_summary:   user_id = :user_id [AND 시간 >= ...] ORDER BY 시간 DESC
+-- - 알림 쿨다운 조회:   "Alert_History" WHERE user_id = :user_id AND attack_type = :attack_type
+
+BEGIN;
+
+-- 아직 알림을 보내지 않은 행만 담는 부분 인덱스. 알림이 끝난 대부분의 행은 인덱스에 들어가지 않으므로 작게 유지됩니다.
+CREATE INDEX IF NOT EXISTS "ix_Attack_log_unnotified" ON "Attack_log" (detected_at) WHERE notification = false;
+CREATE INDEX IF NOT EXISTS "ix_Attack_traffic_unnotified" ON "Attack_traffic" ("@timestamp") WHERE notification = false;
+
+-- 사용자별 최신순 조회
+CREATE INDEX IF NOT EXISTS "ix_Attack_log_user_id_detected_at" ON "Attack_log" (user_id, detected_at DESC);
+CREATE INDEX IF NOT EXISTS "ix_Attack_traffic_user_id_@timestamp" ON "Attack_traffic" (user_id, "@timestamp" DESC);
+
+-- 사용자 / 공격 유형당 알림 이력은 한 행만 있어야 합니다. 중복이 있으면 가장 최근 발송 이력만 남깁니다.
+DELETE FROM "Alert_History" a
+USING "Alert_History" b
+WHERE a.user_id = b.user_id
+  AND a.attack_type = b.attack_type
+  AND (a.last_sent_at, a.id) < (b.last_sent_at, b.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "uq_Alert_History_user_id_attack_type" ON "Alert_History" (user_id, attack_type);
+
+COMMIT;
+
+ANALYZE "Attack_log";
+ANALYZE "Attack_traffic";
+ANALYZE "Alert_History";
@@ -0,0 +1,51 @@
+-- migrations/003_attack_log_rollup.sql
+--
+-- 사용자 / 공격 유형 / 1분 버킷별 탐지 건수 롤업 테이블입니다. (LogDashboardService.get_threat_summary 가 사용)
+--
+-- - "Attack_log" 에 INSERT(COPY 포함)될 때마다 문장 단위 트리거가 새 행들을 버킷별로 묶어 한 번에 더합니다.
+--   같은 버킷을 동시에 갱신하는 트랜잭션끼리 교착 상태가 생기지 않도록 항상 키 순서대로 갱신합니다.
+-- - 파티션 삭제로 없어지는 원본 행은 롤업에서 빼지 않으며, 롤업의 오래된 버킷은
+--   src/monitoring/partition_maintenance.py 가 같은 보존 기간으로 정리합니다.
+-- - 기존 데이터는 트리거를 만든 뒤 같은 트랜잭션에서 채웁니다. (그동안 "Attack_log" INSERT 는 대기)
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "Attack_log_rollup" (
+    user_id     VARCHAR(50)  NOT NULL,
+    attack_type VARCHAR(50)  NOT NULL,
+    bucket      TIMESTAMPTZ  NOT NULL,
+    count       BIGINT       NOT NULL,
+    PRIMARY KEY (user_id, bucket, attack_type)
+);
+
+CREATE OR REPLACE FUNCTION attack_log_rollup_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO "Attack_log_rollup" AS r (user_id, attack_type, bucket, count)
+    SELECT user_id, attack_type, date_trunc('minute', detected_at), count(*)
+    FROM new_rows
+    WHERE user_id IS NOT NULL
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 3, 2
+    ON CONFLICT (user_id, bucket, attack_type) DO UPDATE SET count = r.count + EXCLUDED.count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+LOCK TABLE "Attack_log" IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS attack_log_rollup_insert ON "Attack_log";
+CREATE TRIGGER attack_log_rollup_insert
+    AFTER INSERT ON "Attack_log"
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attack_log_rollup_insert();
+
+TRUNCATE "Attack_log_rollup";
+INSERT INTO "Attack_log_rollup" (user_id, attack_type, bucket, count)
+SELECT user_id, attack_type, date_trunc('minute', detected_at), count(*)
+FROM "Attack_log"
+WHERE user_id IS NOT NULL
+GROUP BY 1, 2, 3;
+
+COMMIT;
+
+ANALYZE "Attack_log_rollup";
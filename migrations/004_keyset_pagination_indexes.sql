@@ -0,0 +1,24 @@
+-- migrations/004_keyset_pagination_indexes.sql
+--
+-- 위협 로그 / 공격 트래픽 목록의 키셋 페이지네이션용 인덱스입니다. (002 적용 후 실행)
+--
+-- - LogDashboardService.get_threat_logs_page:       user_id = :user_id AND (detected_at, log_id) < (:ts, :id) ORDER BY detected_at DESC, log_id DESC
+-- - TrafficDashboardService.get_traffic_attacks_page: user_id = :user_id AND ("@timestamp", traffic_id) < (:ts, :id) ORDER BY "@timestamp" DESC, traffic_id DESC
+--
+-- 시간이 같은 행의 순서를 id 로 고정해야 페이지 경계에서 행이 빠지거나 중복되지 않습니다.
+-- 새 인덱스가 002 의 (user_id, 시간 DESC) 인덱스를 앞부분으로 포함하므로 기존 인덱스는 삭제합니다.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS "ix_Attack_log_user_id_detected_at_log_id"
+    ON "Attack_log" (user_id, detected_at DESC, log_id DESC);
+CREATE INDEX IF NOT EXISTS "ix_Attack_traffic_user_id_@timestamp_traffic_id"
+    ON "Attack_traffic" (user_id, "@timestamp" DESC, traffic_id DESC);
+
+DROP INDEX IF EXISTS "ix_Attack_log_user_id_detected_at";
+DROP INDEX IF EXISTS "ix_Attack_traffic_user_id_@timestamp";
+
+COMMIT;
+
+ANALYZE "Attack_log";
+ANALYZE "Attack_traffic";
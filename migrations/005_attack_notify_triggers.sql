@@ -0,0 +1,33 @@
+-- migrations/005_attack_notify_triggers.sql
+--
+-- "Attack_log" / "Attack_traffic" 에 미발송(notification = false) 행이 INSERT(COPY 포함)되면
+-- 테이블 이름을 payload 로 NOTIFY 합니다. src/monitoring/postgres_watcher.py 의 notify 모드가 LISTEN 합니다.
+--
+-- - 문장 단위 트리거이므로 배치 INSERT 한 번에 알림도 한 번입니다.
+--   같은 트랜잭션 안의 같은 채널 / payload 알림은 PostgreSQL 이 하나로 합치며, 커밋 시점에 전달됩니다.
+-- - 채널 이름은 트리거 인자이며 MONITORING_NOTIFY_CHANNEL 과 같아야 합니다.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION attack_notify_insert() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM new_rows WHERE notification = false) THEN
+        PERFORM pg_notify(TG_ARGV[0], TG_TABLE_NAME);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS attack_notify_insert ON "Attack_log";
+CREATE TRIGGER attack_notify_insert
+    AFTER INSERT ON "Attack_log"
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attack_notify_insert('attack_inserted');
+
+DROP TRIGGER IF EXISTS attack_notify_insert ON "Attack_traffic";
+CREATE TRIGGER attack_notify_insert
+    AFTER INSERT ON "Attack_traffic"
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attack_notify_insert('attack_inserted');
+
+COMMIT;
@@ -0,0 +1,23 @@
+-- migrations/006_inference_dead_letter.sql
+--
+-- 추론 워커(src/inference/stream.py)가 INFERENCE_MAX_BATCH_RETRIES 번 연속 실패한 배치에서 골라낸 레코드를 보관합니다.
+--
+-- - 저장에 실패한 행(예: "Users" 에 없는 user_id 의 FK 위반)은 행 단위로, 분류 단계에서 실패한 배치는 원본 레코드 단위로 저장합니다.
+-- - 격리한 레코드의 오프셋은 커밋되므로, 원인을 고친 뒤 payload 로 다시 넣어야 합니다.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "Inference_dead_letter" (
+    dead_letter_id BIGSERIAL    PRIMARY KEY,
+    worker         VARCHAR(50)  NOT NULL,
+    topic          VARCHAR(255) NOT NULL,
+    "partition"    INTEGER,
+    "offset"       BIGINT,
+    payload        JSONB        NOT NULL,
+    error          TEXT         NOT NULL,
+    created_at     TIMESTAMPTZ  NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS "ix_Inference_dead_letter_worker_created_at" ON "Inference_dead_letter" (worker, created_at DESC);
+
+COMMIT;
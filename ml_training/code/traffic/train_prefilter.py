@@ -0,0 +1,182 @@
+# ml_training/code/traffic/train_prefilter.py
+
+"""
+트래픽 캐스케이드 1단계(prefilter) 모델 학습 및 평가 스크립트입니다.
+
+traffic_model_pipline.ipynb 와 같은 샘플 데이터 / 피처 / 레이블 통합 / 분할(test_size=0.2, random_state=0, stratify)을 사용하고,
+운영 중인 imputer.joblib / scaler.joblib / label_encoder.joblib 으로 전처리하여 추론 서버와 같은 입력을 받도록 학습합니다.
+학습 후 검증 분할(held-out)에서 정상 확률 임계값(HIGH)별 처리량과 재현율 손실을 측정해 리포트로 저장합니다.
+
+    cd ml_training/code/traffic
+    python train_prefilter.py
+
+산출물
+    ../../model/traffic/prefilter_model.joblib   (TRAFFIC_PREFILTER_MODEL_PATH 로 지정)
+    ../../model/traffic/prefilter_report.json    (임계값별 평가 결과 → TRAFFIC_CASCADE_HIGH 선택에 사용)
+"""
+
+import json
+import os
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import recall_score
+from sklearn.model_selection import train_test_split
+from xgboost import XGBClassifier
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(BASE_DIR, "../../..")))
+from src.inference.cascade import cascade_predict_proba  # noqa: E402
+
+warnings.filterwarnings('ignore', category=UserWarning)
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+SAMPLED_FILE_PATH = os.path.join(BASE_DIR, "../../data/traffic/CSE-CIC-IDS2018_sampled_1_3.csv")
+MODEL_DIR = os.path.join(BASE_DIR, "../../model/traffic")
+PREFILTER_PATH = os.path.join(MODEL_DIR, "prefilter_model.joblib")
+REPORT_PATH = os.path.join(MODEL_DIR, "prefilter_report.json")
+
+# 평가할 정상 확률 임계값(HIGH) 후보. LOW 는 0 으로 고정(공격 의심 행은 모두 전체 모델로 전달)
+HIGH_CANDIDATES = [0.9, 0.95, 0.98, 0.99, 0.995, 0.999]
+# 처리량 측정에 사용할 검증 행 수
+THROUGHPUT_ROWS = 100_000
+
+SELECTED_FEATURES_ORIGINAL = [
+    'Dst Port', 'Protocol', 'Flow Duration', 'Tot Fwd Pkts', 'Tot Bwd Pkts',
+    'TotLen Fwd Pkts', 'TotLen Bwd Pkts',
+    'Flow Byts/s', 'Flow Pkts/s', 'Bwd IAT Tot', 'FIN Flag Cnt', 'RST Flag Cnt',
+    'PSH Flag Cnt', 'ACK Flag Cnt', 'URG Flag Cnt', 'Down/Up Ratio',
+    'Pkt Size Avg', 'Fwd Seg Size Avg', 'Fwd Pkt Len Mean', 'Bwd Seg Size Avg', 'Bwd Pkt Len Mean'
+]
+SELECTED_FEATURES_RENAMED = [col.replace(' ', '_').replace('/', '_per_') for col in SELECTED_FEATURES_ORIGINAL]
+
+label_mapping = {
+    'Benign': 'Benign', 'Bot': 'Bot', 'Infilteration': 'Bot',
+    'DoS attacks-SlowHTTPTest': 'DDoS', 'DoS attacks-Hulk': 'DDoS',
+    'DDoS attacks-LOIC-HTTP': 'DDoS', 'DoS attacks-GoldenEye': 'DDoS',
+    'DoS attacks-Slowloris': 'DDoS', 'DDOS attack-LOIC-UDP': 'DDoS',
+    'DDOS attack-HOIC': 'DDoS', 'Brute Force -Web': 'Brute Force',
+    'Brute Force -XSS': 'Brute Force', 'FTP-BruteForce': 'Brute Force',
+    'SSH-Bruteforce': 'Brute Force', 'SQL Injection': 'SQL Injection', 'XSS': 'XSS'
+}
+
+
+def load_split():
+    """노트북과 동일한 방식으로 데이터를 읽고 분할합니다."""
+    data = pd.read_csv(SAMPLED_FILE_PATH, usecols=SELECTED_FEATURES_ORIGINAL + ['Label'], low_memory=False)
+    data.columns = data.columns.str.replace(' ', '_').str.replace('/', '_per_')
+    data['Label'] = data['Label'].map(label_mapping)
+    filtered_data = data.dropna(subset=['Label']).copy()
+
+    X = filtered_data[SELECTED_FEATURES_RENAMED]
+    y = filtered_data['Label']
+    x_train, x_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=0, stratify=y)
+
+    x_train = x_train.apply(pd.to_numeric, errors='coerce').replace([np.inf, -np.inf], np.nan)
+    x_val = x_val.apply(pd.to_numeric, errors='coerce').replace([np.inf, -np.inf], np.nan)
+    return x_train, x_val, y_train, y_val
+
+
+def rows_per_sec(predict, X: np.ndarray) -> float:
+    started = time.perf_counter()
+    predict(X)
+    return len(X) / (time.perf_counter() - started)
+
+
+def evaluate(prefilter, model, x_val_scaled: np.ndarray, y_val_final: np.ndarray, benign_index: int):
+    """임계값별 전달 비율 / 처리량 / 재현율을 전체 모델 단독 실행과 비교합니다."""
+    full_pred = model.predict_proba(x_val_scaled).argmax(axis=1)
+    is_attack = y_val_final != benign_index
+    full_macro_recall = recall_score(y_val_final, full_pred, average='macro', zero_division=0)
+    full_attack_recall = float((full_pred[is_attack] != benign_index).mean())
+
+    bench = x_val_scaled[:THROUGHPUT_ROWS]
+    full_rps = rows_per_sec(model.predict_proba, bench)
+
+    results = []
+    for high in HIGH_CANDIDATES:
+        band = (0.0, high)
+        proba, escalated = cascade_predict_proba(x_val_scaled, prefilter, model, benign_index, band)
+        pred = proba.argmax(axis=1)
+        macro_recall = recall_score(y_val_final, pred, average='macro', zero_division=0)
+        attack_recall = float((pred[is_attack] != benign_index).mean())
+        cascade_rps = rows_per_sec(lambda X: cascade_predict_proba(X, prefilter, model, benign_index, band), bench)
+
+        results.append({
+            "high": high,
+            "escalation_rate": round(float(escalated.mean()), 4),
+            "rows_per_sec": round(cascade_rps),
+            "speedup": round(cascade_rps / full_rps, 2),
+            "macro_recall": round(float(macro_recall), 4),
+            "macro_recall_loss": round(float(full_macro_recall - macro_recall), 4),
+            "attack_recall": round(attack_recall, 4),
+            "attack_recall_loss": round(full_attack_recall - attack_recall, 4),
+        })
+
+    return {
+        "full_model": {
+            "rows_per_sec": round(full_rps),
+            "macro_recall": round(float(full_macro_recall), 4),
+            "attack_recall": round(full_attack_recall, 4),
+        },
+        "cascade": results,
+    }
+
+
+def main():
+    print("\n--- 데이터 처리 시작 ---")
+    x_train, x_val, y_train, y_val = load_split()
+    print(f"훈련/검증 데이터 분할 완료. 훈련 데이터 형태: {x_train.shape}, 검증 데이터 형태: {x_val.shape}")
+
+    # 운영 중인 전처리기와 레이블 인코더를 그대로 사용합니다.
+    imputer = joblib.load(os.path.join(MODEL_DIR, "imputer.joblib"))
+    scaler = joblib.load(os.path.join(MODEL_DIR, "scaler.joblib"))
+    le = joblib.load(os.path.join(MODEL_DIR, "label_encoder.joblib"))
+    model = joblib.load(os.path.join(MODEL_DIR, "traffic_model.joblib"))
+
+    # 운영 모델이 모르는 레이블(XSS 등)은 평가에서 제외합니다.
+    train_mask = y_train.isin(le.classes_).to_numpy()
+    val_mask = y_val.isin(le.classes_).to_numpy()
+    x_train_scaled = scaler.transform(imputer.transform(x_train[train_mask]))
+    x_val_scaled = scaler.transform(imputer.transform(x_val[val_mask]))
+    y_train_final = le.transform(y_train[train_mask])
+    y_val_final = le.transform(y_val[val_mask])
+    benign_index = int(np.flatnonzero(le.classes_ == 'Benign')[0])
+
+    # --- 1단계 모델: 얕은 트리 소수로 구성해 전체 모델(500 트리) 대비 평가 비용을 줄입니다. ---
+    prefilter = XGBClassifier(
+        n_estimators=30,
+        max_depth=3,
+        learning_rate=0.3,
+        tree_method='hist',
+        random_state=0,
+        n_jobs=-1,
+        eval_metric='mlogloss',
+    )
+    prefilter.fit(x_train_scaled, y_train_final)
+    joblib.dump(prefilter, PREFILTER_PATH)
+    print(f"1단계 모델이 '{PREFILTER_PATH}'에 저장되었습니다.")
+
+    report = evaluate(prefilter, model, x_val_scaled, y_val_final, benign_index)
+    report["validation_rows"] = int(len(y_val_final))
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    full = report["full_model"]
+    print("\n========== 캐스케이드 평가 결과 (검증 분할) ==========")
+    print(f"전체 모델 단독: {full['rows_per_sec']:,} rows/s, macro 재현율 {full['macro_recall']:.4f}, 공격 재현율 {full['attack_recall']:.4f}")
+    for row in report["cascade"]:
+        print(
+            f"HIGH={row['high']:<6} 전달 {row['escalation_rate']:.1%} | {row['rows_per_sec']:,} rows/s (x{row['speedup']}) | "
+            f"macro 재현율 손실 {row['macro_recall_loss']:+.4f} | 공격 재현율 손실 {row['attack_recall_loss']:+.4f}"
+        )
+    print("======================================================")
+    print(f"리포트가 '{REPORT_PATH}'에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
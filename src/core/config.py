@@ -1,5 +1,6 @@
 # src/core/config.py
 import os
+from typing import Optional
 from pydantic import Field, EmailStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -22,6 +23,10 @@ class Settings(BaseSettings):
     kafka_topic_winlogbeat: str = Field(alias="KAFKA_TOPIC_WINLOGBEAT")
     kafka_topic_packetbeat: str = Field(alias="KAFKA_TOPIC_PACKETBEAT")
     kafka_topic_agent_response: str = Field(alias="KAFKA_TOPIC_AGENT_RESPONSE")
+    # 에이전트 응답 프로듀서 (압축: gzip / lz4(lz4 패키지 필요) / snappy / zstd, 빈 문자열이면 압축 안 함)
+    agent_response_linger_ms: int = Field(alias="AGENT_RESPONSE_LINGER_MS", default=20)
+    agent_response_batch_bytes: int = Field(alias="AGENT_RESPONSE_BATCH_BYTES", default=65536)
+    agent_response_compression: str = Field(alias="AGENT_RESPONSE_COMPRESSION", default="gzip")
     
     # Redis
     redis_url: str = Field(alias="REDIS_URL")
@@ -31,11 +36,57 @@ class Settings(BaseSettings):
     log_columns_path: str = Field(alias="LOG_COLUMNS_PATH")
     log_model_path: str = Field(alias="LOG_MODEL_PATH")
     log_scaler_path: str = Field(alias="LOG_SCALER_PATH")
+    log_encoder_path: Optional[str] = Field(alias="LOG_ENCODER_PATH", default=None)  # 미지정 시 모델과 같은 폴더의 label_encoder.joblib
     traffic_model_path: str = Field(alias="TRAFFIC_MODEL_PATH")
     traffic_imputer_path: str = Field(alias="TRAFFIC_IMPUTER_PATH")
     traffic_scaler_path: str = Field(alias="TRAFFIC_SCALER_PATH")
     traffic_encoder_path: str = Field(alias="TRAFFIC_ENCODER_PATH")
-    
+    # tree_ensemble.py 로 변환한 .npz 경로 (지정 시 작은 배치를 NumPy 평가기로 추론)
+    log_compiled_model_path: Optional[str] = Field(alias="LOG_COMPILED_MODEL_PATH", default=None)
+    traffic_compiled_model_path: Optional[str] = Field(alias="TRAFFIC_COMPILED_MODEL_PATH", default=None)
+    # 이 행 수 이하 배치만 변환된 앙상블로, 더 큰 배치는 원본 모델로 평가합니다. 0이면 모든 배치를 앙상블로 평가 (xgboost 불필요)
+    compiled_model_max_rows: int = Field(alias="COMPILED_MODEL_MAX_ROWS", default=16)
+    # 캐스케이드 1단계(prefilter) 모델. 1단계 정상 확률이 [LOW, HIGH) 인 플로우만 전체 모델로 다시 분류
+    traffic_prefilter_model_path: Optional[str] = Field(alias="TRAFFIC_PREFILTER_MODEL_PATH", default=None)
+    traffic_cascade_low: float = Field(alias="TRAFFIC_CASCADE_LOW", default=0.0)
+    traffic_cascade_high: float = Field(alias="TRAFFIC_CASCADE_HIGH", default=0.98)
+
+    # Inference Worker (Kafka 마이크로 배치)
+    inference_batch_size: int = Field(alias="INFERENCE_BATCH_SIZE", default=256)
+    inference_linger_ms: int = Field(alias="INFERENCE_LINGER_MS", default=200)
+    inference_pool_size: int = Field(alias="INFERENCE_POOL_SIZE", default=0)  # 0이면 프로세스 풀 없이 워커 프로세스 안에서 추론
+    # 적응형 배치 크기 / linger 와 DB 쓰기 지연 시 fetch 중지(backpressure)
+    inference_adaptive: bool = Field(alias="INFERENCE_ADAPTIVE", default=True)
+    inference_min_batch_size: int = Field(alias="INFERENCE_MIN_BATCH_SIZE", default=16)
+    inference_max_batch_size: int = Field(alias="INFERENCE_MAX_BATCH_SIZE", default=4096)
+    inference_min_linger_ms: int = Field(alias="INFERENCE_MIN_LINGER_MS", default=10)
+    inference_target_batch_ms: float = Field(alias="INFERENCE_TARGET_BATCH_MS", default=1000.0)
+    inference_write_slow_ms: float = Field(alias="INFERENCE_WRITE_SLOW_MS", default=2000.0)
+    inference_metrics_port: int = Field(alias="INFERENCE_METRICS_PORT", default=0)  # 0이면 메트릭 서버 사용 안 함
+    inference_partition_parallel: bool = Field(alias="INFERENCE_PARTITION_PARALLEL", default=True)  # 파티션마다 별도 태스크로 처리/커밋
+    # 같은 오프셋에서 이 횟수만큼 연속 실패한 배치는 문제 행을 Inference_dead_letter 로 격리하고 커밋합니다.
+    inference_max_batch_retries: int = Field(alias="INFERENCE_MAX_BATCH_RETRIES", default=5)
+    # 재전송 / 재전달된 이벤트 중복 제거 (시간 단위로 교체되는 Bloom filter, 메모리는 두 세대 합계)
+    inference_dedup: bool = Field(alias="INFERENCE_DEDUP", default=True)
+    dedup_false_positive_rate: float = Field(alias="DEDUP_FALSE_POSITIVE_RATE", default=0.001)
+    dedup_memory_bytes: int = Field(alias="DEDUP_MEMORY_BYTES", default=8 * 1024 * 1024)
+    dedup_window_seconds: float = Field(alias="DEDUP_WINDOW_SECONDS", default=600.0)
+    # 탐지 행 대량 저장 (COPY / unnest INSERT). 끄면 ORM add_all 로 저장
+    inference_bulk_write: bool = Field(alias="INFERENCE_BULK_WRITE", default=True)
+    bulk_write_max_rows: int = Field(alias="BULK_WRITE_MAX_ROWS", default=1000)
+    bulk_write_flush_ms: int = Field(alias="BULK_WRITE_FLUSH_MS", default=200)
+    # 트래픽 예측 캐시 (양자화한 피처 벡터 → 확률, 0이면 사용 안 함)
+    # MAX_ENTRIES 는 바이트가 아닌 항목 수 한도입니다. 항목당 약 250 + 클래스 수 × 8 bytes (기본값 65536개, 2클래스면 약 17MB)
+    traffic_cache_max_entries: int = Field(alias="TRAFFIC_CACHE_MAX_ENTRIES", default=65536)
+    traffic_cache_ttl_seconds: float = Field(alias="TRAFFIC_CACHE_TTL_SECONDS", default=60.0)
+    traffic_cache_mantissa_bits: int = Field(alias="TRAFFIC_CACHE_MANTISSA_BITS", default=20)
+    # packetbeat 원시 이벤트 → 5-tuple 플로우 집계 (idle / 최대 지속 시간 초과 또는 FIN/RST 시 플로우 완료)
+    flow_idle_timeout_seconds: float = Field(alias="FLOW_IDLE_TIMEOUT_SECONDS", default=60.0)
+    flow_active_timeout_seconds: float = Field(alias="FLOW_ACTIVE_TIMEOUT_SECONDS", default=120.0)
+    flow_max_active: int = Field(alias="FLOW_MAX_ACTIVE", default=200000)
+    model_mmap_mode: str = Field(alias="MODEL_MMAP_MODE", default="r")  # 빈 문자열이면 메모리 매핑 없이 로드
+    model_reload_interval: int = Field(alias="MODEL_RELOAD_INTERVAL", default=30)
+
     # DB & JWT
     database_url: str = Field(alias="DATABASE_URL")
     secret_key: str = Field(alias="SECRET_KEY")
@@ -66,13 +117,38 @@ class Settings(BaseSettings):
     internal_api_base_url: str = Field(alias="INTERNAL_API_BASE_URL", default="http://210.119.12.96:8000")
     internal_api_base_url_second: str = Field(alias="INTERNAL_API_BASE_URL_SECOND", default="http://210.119.12.96:8001")
     monitoring_polling_interval: int = Field(alias="MONITORING_POLLING_INTERVAL", default=15)
+    # notify: INSERT 트리거의 NOTIFY 로 즉시 처리 + MONITORING_SWEEP_INTERVAL 마다 안전망 스캔 / poll: MONITORING_POLLING_INTERVAL 마다 스캔
+    # 채널 이름은 migrations/005_attack_notify_triggers.sql 의 트리거 인자와 같아야 합니다.
+    # 시작 시 두 테이블의 트리거를 확인하여 없으면(마이그레이션 미적용) poll 모드로 동작합니다. (적용 후 재시작 필요)
+    monitoring_mode: str = Field(alias="MONITORING_MODE", default="notify")
+    monitoring_notify_channel: str = Field(alias="MONITORING_NOTIFY_CHANNEL", default="attack_inserted")
+    monitoring_notify_debounce_ms: int = Field(alias="MONITORING_NOTIFY_DEBOUNCE_MS", default=200)
+    monitoring_sweep_interval: int = Field(alias="MONITORING_SWEEP_INTERVAL", default=300)
+    # 감시 프로세스가 한 트랜잭션에서 잠그고(FOR UPDATE SKIP LOCKED) 처리하는 최대 행 수
+    monitoring_claim_batch_size: int = Field(alias="MONITORING_CLAIM_BATCH_SIZE", default=1000)
+    # 알림 전달 방식 (http: 알림 API 호출 / inprocess: 같은 프로세스에서 알림 처리 함수를 직접 호출)
+    monitoring_alert_dispatch: str = Field(alias="MONITORING_ALERT_DISPATCH", default="http")
+    monitoring_alert_max_connections: int = Field(alias="MONITORING_ALERT_MAX_CONNECTIONS", default=20)
+    monitoring_alert_timeout: float = Field(alias="MONITORING_ALERT_TIMEOUT", default=10.0)
+    monitoring_alert_max_retries: int = Field(alias="MONITORING_ALERT_MAX_RETRIES", default=3)
+    monitoring_alert_retry_backoff_ms: int = Field(alias="MONITORING_ALERT_RETRY_BACKOFF_MS", default=200)
+    # API 서버 시작 시 postgres_watcher 를 같은 프로세스의 백그라운드 작업으로 실행합니다.
+    monitoring_run_in_api: bool = Field(alias="MONITORING_RUN_IN_API", default=False)
+
+    # Attack_log / Attack_traffic 시간 파티션 유지보수 (interval: day / week, retention_action: drop / detach)
+    partition_interval: str = Field(alias="PARTITION_INTERVAL", default="day")
+    partition_premake_days: int = Field(alias="PARTITION_PREMAKE_DAYS", default=7)
+    partition_retention_days: int = Field(alias="PARTITION_RETENTION_DAYS", default=90)
+    partition_retention_action: str = Field(alias="PARTITION_RETENTION_ACTION", default="drop")
+    partition_maintenance_interval: int = Field(alias="PARTITION_MAINTENANCE_INTERVAL", default=3600)
     
     password_reset_base_url: str
     
     model_config = SettingsConfigDict(
         env_file='.env',
         env_file_encoding='utf-8',
-        extra='forbid'  # .env에 정의되지 않은 필드가 있으면 오류 발생
+        extra='forbid',  # .env에 정의되지 않은 필드가 있으면 오류 발생
+        protected_namespaces=(),  # model_mmap_mode 같은 'model_' 필드 이름에 대한 pydantic 경고를 끕니다.
     )
 
 # 설정 객체 인스턴스 생성
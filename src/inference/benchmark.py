@@ -0,0 +1,185 @@
+# src/inference/benchmark.py
+
+"""
+로그 / 트래픽 모델 오프라인 추론 벤치마크입니다. (Kafka / DB 없이 CPU 만으로 실행)
+
+Settings 에 지정된 실제 아티팩트를 로드하고, 합성 배치(트래픽: SELECTED_FEATURES_ORIGINAL 21개 피처,
+로그: columns.json 스키마의 winlogbeat 이벤트)로 배치 크기별 처리량과 지연 시간을 측정해 JSON 으로 저장합니다.
+모델마다 별도 프로세스에서 측정하므로 최대 RSS 는 해당 모델만의 값입니다.
+
+    python -m src.inference.benchmark --output benchmarks/2025-08-01.json
+    python -m src.inference.benchmark --models traffic --batch-sizes 1 64 512 --compare benchmarks/2025-08-01.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_BATCH_SIZES = [1, 16, 64, 256, 1024]
+
+
+def _peak_rss_mb() -> float:
+    # Linux 의 ru_maxrss 단위는 KB, macOS 는 bytes 입니다.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _latency_stats(latencies: List[float], batch_size: int) -> Dict[str, Any]:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "batch_size": batch_size,
+        "iterations": len(latencies),
+        "rows_per_sec": round(batch_size * len(latencies) / float(np.sum(latencies))),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def benchmark_model(name: str, batch_sizes: List[int], seconds_per_size: float = 2.0,
+                    min_iterations: int = 20, seed: int = 0, use_cache: bool = False) -> Dict[str, Any]:
+    """
+    모델 하나를 로드하고 배치 크기별로 classify() 전체(피처 변환 + 전처리 + 추론)의 지연 시간을 측정합니다.
+    각 배치 크기마다 seconds_per_size 초 또는 min_iterations 회 중 더 오래 걸리는 쪽까지 반복합니다.
+    """
+    from ..core.config import settings
+    from .synthetic import synthetic_flows, synthetic_log_events
+
+    rss_before = _peak_rss_mb()
+    started = time.perf_counter()
+    if name == "traffic":
+        from .traffic_model import TrafficClassifier
+        classifier = TrafficClassifier.from_settings(mmap_mode=settings.model_mmap_mode or None)
+        if not use_cache:
+            classifier.cache = None  # 반복되는 합성 행이 캐시에 걸리지 않도록 모델 자체를 측정합니다.
+        paths = TrafficClassifier.artifact_paths()
+        make_records = lambda n, s: synthetic_flows(n, seed=s)
+    else:
+        from .log_model import LogClassifier
+        classifier = LogClassifier.from_settings(mmap_mode=settings.model_mmap_mode or None)
+        paths = LogClassifier.artifact_paths()
+        columns = classifier.featurizer.columns
+        make_records = lambda n, s: synthetic_log_events(columns, n, seed=s)
+    load_seconds = time.perf_counter() - started
+
+    classifier.classify(make_records(max(batch_sizes), seed))  # 워밍업
+
+    batches = []
+    for batch_size in batch_sizes:
+        # 매 반복마다 다른 배치를 쓰도록 미리 여러 개 만들어 둡니다.
+        pool = [make_records(batch_size, seed + k) for k in range(8)]
+        latencies = []
+        deadline = time.perf_counter() + seconds_per_size
+        while len(latencies) < min_iterations or time.perf_counter() < deadline:
+            records = pool[len(latencies) % len(pool)]
+            t0 = time.perf_counter()
+            classifier.classify(records)
+            latencies.append(time.perf_counter() - t0)
+        batches.append(_latency_stats(latencies, batch_size))
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_before_load_mb": rss_before,
+        "artifacts": {key: os.path.basename(path) for key, path in paths.items()},
+        "model_type": type(classifier.model).__name__,
+        "cache": use_cache and getattr(classifier, "cache", None) is not None,
+        "batches": batches,
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    versions = {"numpy": np.__version__}
+    for module in ("xgboost", "sklearn", "lightgbm"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit or None,
+        "versions": versions,
+    }
+
+
+def run_benchmark(models: List[str], batch_sizes: List[int], **kwargs) -> Dict[str, Any]:
+    """모델마다 새 프로세스(spawn)에서 benchmark_model 을 실행해 최대 RSS 가 섞이지 않도록 합니다."""
+    results = {}
+    for name in models:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            results[name] = executor.submit(benchmark_model, name, batch_sizes, **kwargs).result()
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": _environment(),
+        "models": results,
+    }
+
+
+def _print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    for name, result in report["models"].items():
+        print(f"\n📊 [{name}] {result['model_type']} 로드 {result['load_seconds']}s, 최대 RSS {result['peak_rss_mb']}MB")
+        base_rows = {}
+        if baseline and name in baseline.get("models", {}):
+            base_rows = {b["batch_size"]: b for b in baseline["models"][name]["batches"]}
+        for b in result["batches"]:
+            line = f"   - batch {b['batch_size']:>5}: {b['rows_per_sec']:>9,} rows/s | p50 {b['p50_ms']:8.3f}ms | p99 {b['p99_ms']:8.3f}ms"
+            prev = base_rows.get(b["batch_size"])
+            if prev:
+                line += f" | 이전 대비 처리량 {b['rows_per_sec'] / prev['rows_per_sec'] - 1:+.1%}, p99 {b['p99_ms'] / prev['p99_ms'] - 1:+.1%}"
+            print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="로그 / 트래픽 모델 오프라인 추론 벤치마크")
+    parser.add_argument("--models", nargs="+", choices=["traffic", "log"], default=["traffic", "log"])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--seconds", type=float, default=2.0, help="배치 크기별 최소 측정 시간(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--with-cache", action="store_true", help="트래픽 예측 캐시를 켠 상태로 측정")
+    parser.add_argument("--output", default="inference_benchmark.json", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="이전 결과 JSON 과 처리량/p99 비교")
+    args = parser.parse_args(argv)
+
+    # --- 프로젝트 경로 설정 ---
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(project_root)
+
+    report = run_benchmark(
+        args.models, sorted(set(args.batch_sizes)),
+        seconds_per_size=args.seconds, seed=args.seed, use_cache=args.with_cache,
+    )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_report(report, baseline)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
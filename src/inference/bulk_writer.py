@@ -0,0 +1,249 @@
+# src/inference/bulk_writer.py
+
+"""
+Attack_log / Attack_traffic 에 탐지 행을 한 번의 왕복으로 대량 저장하는 writer 입니다.
+
+ORM(db.add_all)은 행마다 INSERT 를 한 번씩 보내므로, 피크 때 초당 수천 번의 왕복이 생깁니다.
+- ID 가 필요 없으면 asyncpg copy_records_to_table(COPY ... FROM STDIN, binary)로 저장합니다.
+- ID 가 필요하면(returning=True) 컬럼별 배열을 unnest 하는 INSERT ... SELECT ... RETURNING 한 문장으로 저장하고
+  생성된 PK 목록을 반환합니다. (단일 INSERT ... SELECT unnest 의 RETURNING 은 입력 순서를 따릅니다)
+
+write() 는 즉시 저장하고, add() 는 max_rows 또는 flush_ms 중 먼저 도달하는 기준으로 모아서 저장합니다.
+
+    # ORM / COPY / unnest 경로 비교 (트랜잭션은 롤백되므로 테이블에 남지 않음, user_id 는 Users 에 있어야 함)
+    python -m src.inference.bulk_writer --table traffic --rows 10000 --user-id admin
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import Numeric, String
+
+from ..core.config import settings
+from ..core.database import engine
+
+# 타이머 저장이 실패하면 flush_ms 부터 두 배씩 늘려 이 간격(ms)까지 다시 시도합니다.
+FLUSH_RETRY_MAX_MS = 5000
+
+
+def _table_layout(model: Type) -> Tuple[str, str, List[Tuple[str, Any]]]:
+    """(테이블 이름, PK 컬럼 이름, [(ORM 속성 이름, Column)]) — 자동 증가 PK 는 DB 가 채우므로 제외합니다."""
+    mapper = sa_inspect(model)
+    table = mapper.local_table
+    pk = table.primary_key.columns.values()[0]
+    columns = [
+        (prop.key, prop.columns[0])
+        for prop in mapper.column_attrs
+        if prop.columns[0] is not pk
+    ]
+    return table.name, pk.name, columns
+
+
+def _convert(value: Any, column) -> Any:
+    if value is None:
+        default = column.default
+        if default is not None and default.is_scalar:
+            return default.arg
+        return None
+    if isinstance(column.type, JSONB):
+        # asyncpg 의 jsonb 기본 코덱은 문자열을 받습니다.
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    if isinstance(column.type, String) and not isinstance(value, str):
+        return str(value)  # asyncpg 는 text 컬럼에 숫자를 자동 변환하지 않습니다. (예: 이벤트의 user_id)
+    if isinstance(column.type, Numeric) and isinstance(value, float):
+        return Decimal(repr(value)) if math.isfinite(value) else Decimal(0)
+    return value
+
+
+class BulkWriter:
+    """ORM 모델 하나(AttackLog / AttackTraffic 등)의 행을 모아서 저장합니다."""
+
+    def __init__(self, model: Type, max_rows: Optional[int] = None, flush_ms: Optional[int] = None,
+                 returning: bool = False):
+        self.model = model
+        self.max_rows = max_rows or settings.bulk_write_max_rows
+        self.flush_ms = flush_ms or settings.bulk_write_flush_ms
+        self.returning = returning
+        self.table, self.pk, self._columns = _table_layout(model)
+        self.column_names = [column.name for _, column in self._columns]
+
+        # unnest($1::INTEGER[], $2::TEXT[], ...) 의 배열 타입은 모델 정의에서 가져옵니다.
+        dialect = postgresql.dialect()
+        arrays = ", ".join(f"${i}::{column.type.compile(dialect=dialect)}[]" for i, (_, column) in enumerate(self._columns, 1))
+        quoted = ", ".join(f'"{name}"' for name in self.column_names)
+        self._insert_sql = f'INSERT INTO "{self.table}" ({quoted}) SELECT * FROM unnest({arrays}) RETURNING "{self.pk}"'
+
+        self._buffer: List[Tuple] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self.rows_written = 0
+        self.flushes = 0
+
+    def to_records(self, rows: Sequence[Any]) -> List[Tuple]:
+        """ORM 객체 또는 ORM 속성 이름을 키로 하는 dict 를 COPY 레코드(튜플)로 변환합니다."""
+        records = []
+        for row in rows:
+            get = row.get if isinstance(row, dict) else (lambda key, _row=row: getattr(_row, key, None))
+            records.append(tuple(_convert(get(key), column) for key, column in self._columns))
+        return records
+
+    async def _write_records(self, records: List[Tuple], returning: bool) -> Optional[List[int]]:
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection  # asyncpg.Connection
+            async with driver.transaction():
+                if returning:
+                    columns = list(zip(*records))
+                    result = await driver.fetch(self._insert_sql, *[list(values) for values in columns])
+                    ids = [r[0] for r in result]
+                else:
+                    await driver.copy_records_to_table(self.table, records=records, columns=self.column_names)
+                    ids = None
+        self.rows_written += len(records)
+        self.flushes += 1
+        return ids
+
+    async def write(self, rows: Sequence[Any], returning: Optional[bool] = None) -> Optional[List[int]]:
+        """rows 를 즉시 한 트랜잭션으로 저장합니다. returning 이면 생성된 PK 목록을 반환합니다."""
+        if not rows:
+            return [] if (self.returning if returning is None else returning) else None
+        return await self._write_records(self.to_records(rows), self.returning if returning is None else returning)
+
+    async def add(self, rows: Sequence[Any]):
+        """버퍼에 넣고, max_rows 이상이면 바로 저장합니다. 나머지는 flush_ms 안에 타이머가 저장합니다."""
+        async with self._lock:
+            self._buffer.extend(self.to_records(rows))
+            if len(self._buffer) >= self.max_rows:
+                await self._flush_locked()
+            elif self._buffer and (self._timer is None or self._timer.done()):
+                self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self, delay_ms: Optional[float] = None):
+        delay_ms = delay_ms or self.flush_ms
+        await asyncio.sleep(delay_ms / 1000)
+        try:
+            await self.flush()
+        except Exception as e:
+            # 실패한 행은 버퍼에 남아 있으므로, 다음 add() 가 없어도 저장되도록 타이머를 다시 겁니다.
+            retry_ms = min(delay_ms * 2, FLUSH_RETRY_MAX_MS)
+            print(f"❌ [{self.table}] 대량 저장 실패 ({len(self._buffer)}건 대기, {retry_ms:.0f}ms 후 재시도): {e}")
+            self._timer = asyncio.create_task(self._flush_later(retry_ms))
+
+    async def _flush_locked(self) -> Optional[List[int]]:
+        records, self._buffer = self._buffer, []
+        if not records:
+            return None
+        try:
+            return await self._write_records(records, self.returning)
+        except BaseException:
+            # 실패하거나 취소되면(close() 가 타이머를 취소한 경우 등) 다음 flush 에서 다시 시도합니다.
+            self._buffer = records + self._buffer
+            raise
+
+    async def flush(self) -> Optional[List[int]]:
+        async with self._lock:
+            return await self._flush_locked()
+
+    async def close(self):
+        """타이머를 멈추고 남은 행을 저장합니다. 저장하지 못한 행이 남으면 예외를 그대로 올립니다. (행은 버퍼에 유지)"""
+        timer = self._timer
+        if timer is not None and not timer.done():
+            timer.cancel()
+            try:
+                await timer
+            except asyncio.CancelledError:
+                pass
+        self._timer = None
+        await self.flush()
+
+
+# --- 벤치마크 ---
+
+def _sample_rows(table: str, n: int, user_id: str) -> List[Any]:
+    from ..models.models import AttackLog
+    from .synthetic import synthetic_flows
+    from .traffic_model import featurize_flows
+
+    if table == "traffic":
+        from .traffic_worker import build_attack_traffic
+        flows = synthetic_flows(n, user_id=user_id)
+        X = featurize_flows(flows)
+        return [build_attack_traffic(flow, X[i]) for i, flow in enumerate(flows)]
+
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc)
+    return [
+        AttackLog(
+            detected_at=now, attack_type="Execution", severity="high", confidence=97.5,
+            source_address=f"10.0.0.{i % 250 + 1}", hostname=f"WORKSTATION{i % 50:02d}", user_id=user_id,
+            description={"technique": "T1059", "record_number": i}, response_type="alert", responded_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+async def _benchmark(table: str, rows_total: int, batch_size: int, user_id: str) -> Dict[str, float]:
+    from ..models.models import AttackLog, AttackTraffic
+
+    model = AttackTraffic if table == "traffic" else AttackLog
+    writer = BulkWriter(model)
+    results = {}
+
+    for mode in ("orm", "copy", "unnest"):
+        rows = _sample_rows(table, rows_total, user_id)
+        batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        async with engine.connect() as conn:
+            # 한 트랜잭션 안에서 측정하고 롤백합니다.
+            trans = await conn.begin()
+            started = time.perf_counter()
+            if mode == "orm":
+                from sqlalchemy.ext.asyncio import AsyncSession
+                session = AsyncSession(bind=conn)
+                for batch in batches:
+                    session.add_all(batch)
+                    await session.flush()
+            else:
+                driver = (await conn.get_raw_connection()).driver_connection
+                for batch in batches:
+                    records = writer.to_records(batch)
+                    if mode == "copy":
+                        await driver.copy_records_to_table(writer.table, records=records, columns=writer.column_names)
+                    else:
+                        await driver.fetch(writer._insert_sql, *[list(values) for values in zip(*records)])
+            elapsed = time.perf_counter() - started
+            await trans.rollback()
+        results[mode] = rows_total / elapsed
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ORM 개별 INSERT 와 대량 저장(COPY / unnest) 처리량 비교")
+    parser.add_argument("--table", choices=["traffic", "log"], default="traffic")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--user-id", required=True, help="Users 테이블에 존재하는 user_id (FK)")
+    args = parser.parse_args(argv)
+
+    # --- 프로젝트 경로 설정 ---
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(project_root)
+
+    results = asyncio.run(_benchmark(args.table, args.rows, args.batch_size, args.user_id))
+    print(f"📊 {args.table} {args.rows}행, 배치 {args.batch_size}")
+    for mode, rows_per_sec in results.items():
+        print(f"   - {mode:>6}: {rows_per_sec:>10,.0f} rows/s (ORM 대비 x{rows_per_sec / results['orm']:.1f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
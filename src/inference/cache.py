@@ -0,0 +1,140 @@
+# src/inference/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# 64비트 FNV-1a 상수 (열 단위로 섞어 행 하나를 정수 키 하나로 만듭니다)
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+_NAN_BITS = np.uint64(0x7FF8000000000000)
+
+# 항목 1개의 대략적인 메모리 사용량(bytes): OrderedDict 노드 + int 키 + (만료 시각, 확률 배열) 튜플
+_ENTRY_OVERHEAD_BYTES = 250
+
+
+def quantized_keys(X: np.ndarray, mantissa_bits: int = 20) -> np.ndarray:
+    """
+    (n, k) 원본 피처 행렬의 각 행을 64비트 해시 키로 변환합니다.
+    float64 가수부를 상위 mantissa_bits 비트만 남겨(상대 오차 약 2^-mantissa_bits) 거의 같은 값을 같은 키로 묶고,
+    NaN/inf 는 모두 같은 값(결측)으로 취급합니다.
+    """
+    bits = np.ascontiguousarray(X, dtype=np.float64).view(np.uint64).copy()
+    bits[~np.isfinite(X)] = _NAN_BITS
+    drop = 52 - max(0, min(52, mantissa_bits))
+    if drop:
+        bits &= ~np.uint64((1 << drop) - 1)
+
+    keys = np.full(len(bits), _FNV_OFFSET, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(bits.shape[1]):
+            keys ^= bits[:, j]
+            keys *= _FNV_PRIME
+    return keys
+
+
+class PredictionCache:
+    """
+    양자화한 피처 벡터 해시 → 클래스별 확률을 기억하는 LRU + TTL 캐시입니다.
+
+    스캔/비콘/DDoS 처럼 같은 피처 행이 반복되는 트래픽에서 모델 호출을 건너뛰기 위한 용도이며,
+    max_entries 를 넘으면 가장 오래 쓰이지 않은 항목부터, ttl_seconds 가 지난 항목은 조회 시점에 제거합니다.
+    값은 양자화된 키에 처음 들어온 행의 예측이므로, 분기 임계값 바로 근처 값은 원본과 다르게 분류될 수 있습니다.
+    (mantissa_bits=52 로 두면 완전히 같은 행만 캐시합니다)
+
+    max_entries 는 바이트가 아닌 항목 수 한도입니다. 항목 하나는 약 _ENTRY_OVERHEAD_BYTES + 클래스 수 × 8 bytes 이므로
+    최대 메모리는 max_entries × (250 + 8c) bytes 정도이며, 현재 사용량은 stats() 의 approx_bytes 로 확인할 수 있습니다.
+    """
+
+    def __init__(self, max_entries: int = 65536, ttl_seconds: float = 60.0, mantissa_bits: int = 20):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.mantissa_bits = mantissa_bits
+        # 키 → (만료 시각, 확률 배열)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["PredictionCache"]:
+        """TRAFFIC_CACHE_MAX_ENTRIES 가 0 이면 캐시를 사용하지 않습니다."""
+        from ..core.config import settings
+        if settings.traffic_cache_max_entries <= 0:
+            return None
+        return cls(
+            max_entries=settings.traffic_cache_max_entries,
+            ttl_seconds=settings.traffic_cache_ttl_seconds,
+            mantissa_bits=settings.traffic_cache_mantissa_bits,
+        )
+
+    def predict_proba(self, X: np.ndarray, predict) -> np.ndarray:
+        """
+        캐시에 없는 (배치 안에서 중복을 제거한) 행만 predict(X_subset) 으로 계산하고,
+        나머지는 캐시된 확률로 채운 (n, c) 배열을 반환합니다.
+        """
+        keys = quantized_keys(X, self.mantissa_bits)
+        unique_keys, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        key_list = unique_keys.tolist()
+        now = time.monotonic()
+
+        cached = [None] * len(key_list)
+        with self._lock:
+            for u, key in enumerate(key_list):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] < now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                cached[u] = entry[1]
+
+        missing = [u for u, value in enumerate(cached) if value is None]
+        if missing:
+            computed = predict(X[first_index[missing]])
+            expires_at = now + self.ttl_seconds
+            with self._lock:
+                for row, u in enumerate(missing):
+                    value = computed[row].copy()
+                    cached[u] = value
+                    self._entries[key_list[u]] = (expires_at, value)
+                    self._entries.move_to_end(key_list[u])
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        inverse = inverse.ravel()
+        miss_rows = int(np.isin(inverse, missing).sum()) if missing else 0
+        with self._lock:
+            self.misses += miss_rows
+            self.hits += len(keys) - miss_rows
+        return np.stack(cached)[inverse]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "approx_bytes": len(self._entries) * self._entry_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _entry_bytes(self) -> int:
+        sample = next(iter(self._entries.values()), None)
+        return _ENTRY_OVERHEAD_BYTES + (sample[1].nbytes if sample is not None else 0)
@@ -0,0 +1,29 @@
+# src/inference/cascade.py
+
+"""
+트래픽 2단계 캐스케이드 추론.
+Settings 를 읽지 않으므로 학습 스크립트(ml_training/code/traffic/train_prefilter.py)에서도 그대로 가져다 씁니다.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def cascade_predict_proba(X: np.ndarray, prefilter, model, benign_index: int,
+                          band: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    2단계 캐스케이드 추론. 전처리된 X 를 1단계(prefilter) 모델로 먼저 분류하고,
+    1단계의 정상(Benign) 확률이 band = [low, high) 구간에 있는 행만 2단계(전체) 모델로 다시 분류합니다.
+    high 이상은 1단계 결과(정상)를 그대로 쓰고, low 미만은 1단계가 공격으로 확신한 경우입니다.
+    (low=0 이면 공격 의심 행은 모두 2단계로 넘어가 공격 유형은 항상 전체 모델이 판정합니다)
+    반환값은 (확률, 2단계로 넘어간 행 마스크) 입니다.
+    """
+    low, high = band
+    proba = prefilter.predict_proba(X)
+    benign = proba[:, benign_index]
+    escalate = (benign >= low) & (benign < high)
+    if escalate.any():
+        proba = np.array(proba, dtype=np.float64)
+        proba[escalate] = model.predict_proba(X[escalate])
+    return proba, escalate
@@ -0,0 +1,128 @@
+# src/inference/dedup.py
+
+"""
+beat 에이전트 재전송 / Kafka 재전달로 같은 이벤트가 여러 번 들어올 때 두 번째부터 걸러내는 확률적 중복 제거 필터입니다.
+
+정확한 집합(set) 대신 Bloom filter 를 사용해 메모리를 memory_bytes 로 고정합니다.
+- 두 세대(current / previous)를 번갈아 쓰며, window_seconds 가 지나거나 current 가 용량에 도달하면
+  previous 를 버리고 새 current 를 만듭니다. → 키는 최소 window_seconds 동안 기억됩니다.
+- 거짓 양성(처음 보는 이벤트를 중복으로 판단) 확률은 세대당 false_positive_rate 이하로 유지되며, 거짓 음성은 없습니다.
+"""
+
+import hashlib
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+_BIT = np.array([1 << i for i in range(8)], dtype=np.uint8)
+
+
+def _hash_pairs(keys: List[bytes]) -> np.ndarray:
+    """키마다 128비트 blake2b 해시를 구해 (n, 2) uint64 배열(double hashing 의 h1, h2)로 반환합니다."""
+    digests = b"".join(hashlib.blake2b(key, digest_size=16).digest() for key in keys)
+    pairs = np.frombuffer(digests, dtype=np.uint64).reshape(-1, 2).copy()
+    pairs[:, 1] |= np.uint64(1)  # h2 가 0 이면 모든 위치가 같아지므로 홀수로 만듭니다.
+    return pairs
+
+
+class RotatingBloomFilter:
+    """시간 기준으로 세대를 교체하는 Bloom filter. (memory_bytes 는 두 세대를 합친 크기)"""
+
+    def __init__(self, false_positive_rate: float = 0.001, memory_bytes: int = 8 * 1024 * 1024,
+                 window_seconds: float = 600.0):
+        self.false_positive_rate = false_positive_rate
+        self.window_seconds = window_seconds
+        self.num_bits = max(64, (memory_bytes // 2) * 8)
+        # 비트 수 m 과 목표 오탐률 p 에서 최적 해시 개수 k 와 세대당 용량 n 을 구합니다.
+        self.capacity = max(1, int(self.num_bits * math.log(2) ** 2 / -math.log(false_positive_rate)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._steps = np.arange(self.num_hashes, dtype=np.uint64)
+
+        self._current = np.zeros(self.num_bits // 8, dtype=np.uint8)
+        self._previous = np.zeros_like(self._current)
+        self._current_count = 0
+        self._rotated_at = time.monotonic()
+
+        self.checked = 0
+        self.duplicates = 0
+        self.rotations = 0
+
+    @classmethod
+    def from_settings(cls) -> "RotatingBloomFilter":
+        from ..core.config import settings
+        return cls(
+            false_positive_rate=settings.dedup_false_positive_rate,
+            memory_bytes=settings.dedup_memory_bytes,
+            window_seconds=settings.dedup_window_seconds,
+        )
+
+    def _positions(self, keys: List[bytes]) -> np.ndarray:
+        pairs = _hash_pairs(keys)
+        with np.errstate(over="ignore"):
+            positions = pairs[:, :1] + self._steps * pairs[:, 1:]
+        return positions % np.uint64(self.num_bits)
+
+    @staticmethod
+    def _contains(bits: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        return np.all(bits[positions >> np.uint64(3)] & _BIT[positions & np.uint64(7)], axis=1)
+
+    def _maybe_rotate(self):
+        if time.monotonic() - self._rotated_at >= self.window_seconds or self._current_count >= self.capacity:
+            self._previous = self._current
+            self._current = np.zeros_like(self._previous)
+            self._current_count = 0
+            self._rotated_at = time.monotonic()
+            self.rotations += 1
+
+    def contains_many(self, keys: List[bytes]) -> np.ndarray:
+        """키마다 이미 본 적이 있는지(bool) 반환합니다. 필터는 변경하지 않습니다."""
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        self._maybe_rotate()
+        positions = self._positions(keys)
+        return self._contains(self._current, positions) | self._contains(self._previous, positions)
+
+    def add_many(self, keys: Iterable[bytes]):
+        keys = list(keys)
+        if not keys:
+            return
+        self._maybe_rotate()
+        positions = self._positions(keys).ravel()
+        np.bitwise_or.at(self._current, positions >> np.uint64(3), _BIT[positions & np.uint64(7)])
+        self._current_count += len(keys)
+
+    def filter(self, records: List[Any], keys: List[Optional[bytes]]):
+        """
+        이미 본 키(이전 배치 또는 같은 배치 안의 앞선 레코드)를 가진 레코드를 제외하고 (남은 레코드, 남은 키) 를 반환합니다.
+        키가 None 인 레코드는 식별할 수 없으므로 항상 통과시킵니다.
+        처리 실패 후 재전달된 배치가 중복으로 버려지지 않도록, 반환된 키는 처리가 끝난 뒤 add_many() 로 등록해야 합니다.
+        """
+        indexed = [i for i, key in enumerate(keys) if key is not None]
+        seen_before = self.contains_many([keys[i] for i in indexed])
+        drop = set()
+        in_batch = set()
+        for i, seen in zip(indexed, seen_before):
+            if seen or keys[i] in in_batch:
+                drop.add(i)
+            else:
+                in_batch.add(keys[i])
+        self.checked += len(indexed)
+        self.duplicates += len(drop)
+        if not drop:
+            return records, [key for key in keys if key is not None]
+        kept = [r for i, r in enumerate(records) if i not in drop]
+        return kept, list(in_batch)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "rotations": self.rotations,
+            "current_count": self._current_count,
+            "capacity": self.capacity,
+            "num_hashes": self.num_hashes,
+            "memory_bytes": self._current.nbytes + self._previous.nbytes,
+            "false_positive_rate": self.false_positive_rate,
+        }
@@ -0,0 +1,366 @@
+# src/inference/flows.py
+
+"""
+packetbeat 원시 이벤트(패킷 단위 또는 flow 업데이트)를 5-tuple 단위로 모아
+CICFlowMeter 형식의 트래픽 피처(TRAFFIC_FEATURES) 행으로 만드는 스트리밍 집계기입니다.
+
+- 패킷 이벤트: 방향(정방향 = 플로우를 시작한 쪽)별 패킷 수 / 바이트 / 역방향 도착 간격 / TCP 플래그를 누적합니다.
+- packetbeat flow 이벤트(type == "flow"): source/destination 누적 카운터로 상태를 덮어씁니다. (플래그 / IAT 정보 없음 → 결측)
+- FIN / RST 패킷, flow.final, 유휴 시간(idle_timeout), 최대 지속 시간(active_timeout) 중 먼저 오는 조건에서 플로우를 내보냅니다.
+- 활성 플로우가 max_flows 를 넘으면 가장 오래 갱신되지 않은 플로우부터 내보내 메모리 사용량을 제한합니다.
+
+시간은 이벤트의 @timestamp(이벤트 시각) 기준이므로 재생(replay) 시에도 같은 결과가 나옵니다.
+다만 새 이벤트가 오지 않으면 이벤트 시각이 멈추므로, 마지막 갱신 후 실제 시간(wall clock)으로 idle_timeout 이
+지난 플로우도 expire() 에서 내보냅니다. (워커가 주기적으로 호출)
+
+플로우 상태는 메모리에만 있으므로, 이벤트 위치(파티션, 오프셋)를 함께 넘기면 아직 저장되지 않은 플로우가 포함한
+가장 이른 오프셋을 commit_floor() 로 알려 줍니다. 워커는 그보다 앞으로 커밋하지 않으므로, 재시작되면
+진행 중이던 플로우의 패킷을 처음부터 다시 받습니다. 내보낸 플로우는 release()(저장 성공) 또는
+requeue()(저장 실패, 다음 process() 에서 다시 반환) 할 때까지 커밋 위치를 붙잡습니다.
+"""
+
+import heapq
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from .traffic_model import TRAFFIC_FEATURES
+
+_PROTOCOLS = {"tcp": 6, "udp": 17, "icmp": 1}
+_FLAG_BITS = {"fin": 0x01, "syn": 0x02, "rst": 0x04, "psh": 0x08, "ack": 0x10, "urg": 0x20}
+# 집계된 플로우 행에 붙는 플로우 번호 (release / requeue 에 사용, 피처 / 저장 컬럼이 아님)
+FLOW_ID_KEY = "_flow_id"
+
+
+def _get(record: Dict[str, Any], path: str) -> Any:
+    value: Any = record
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _tcp_flags(value: Any) -> int:
+    """packetbeat/ECS 의 tcp.flags 를 비트마스크로 변환합니다. (정수, ["FIN", "ACK"], {"fin": true}, "FA" 형태 지원)"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, dict):
+        return sum(bit for name, bit in _FLAG_BITS.items() if value.get(name))
+    if isinstance(value, (list, tuple)):
+        return sum(_FLAG_BITS.get(str(v).lower(), 0) for v in value)
+    if isinstance(value, str):
+        letters = {"F": 0x01, "S": 0x02, "R": 0x04, "P": 0x08, "A": 0x10, "U": 0x20}
+        return sum(letters.get(c, 0) for c in value.upper())
+    return 0
+
+
+def is_raw_event(record: Dict[str, Any]) -> bool:
+    """이미 피처가 계산된 플로우(CICFlowMeter 형식)가 아니라 packetbeat 원시 이벤트인지 확인합니다."""
+    return isinstance(record.get("source"), dict) and not any(name in record for name in TRAFFIC_FEATURES[:3])
+
+
+class FlowState:
+    """플로우 하나의 누적 상태. 플로우 수만큼 존재하므로 __slots__ 로 크기를 줄입니다."""
+
+    __slots__ = (
+        "src_ip", "src_port", "dst_ip", "dst_port", "protocol", "user_id",
+        "first_ts", "last_ts", "fwd_pkts", "bwd_pkts", "fwd_bytes", "bwd_bytes",
+        "first_bwd_ts", "last_bwd_ts", "fin", "rst", "psh", "ack", "urg", "has_packets",
+        "serial", "seen_at", "partitions",
+    )
+
+    def __init__(self, src_ip, src_port, dst_ip, dst_port, protocol, ts, user_id=None, serial=0):
+        self.src_ip, self.src_port, self.dst_ip, self.dst_port = src_ip, src_port, dst_ip, dst_port
+        self.protocol = protocol
+        self.user_id = user_id
+        self.first_ts = self.last_ts = ts
+        self.fwd_pkts = self.bwd_pkts = self.fwd_bytes = self.bwd_bytes = 0
+        self.first_bwd_ts = self.last_bwd_ts = None
+        self.fin = self.rst = self.psh = self.ack = self.urg = 0
+        self.has_packets = False
+        self.serial = serial
+        self.seen_at = time.monotonic()
+        # 이 플로우에 포함된 이벤트가 있는 파티션들 (오프셋 커밋을 붙잡는 파티션)
+        self.partitions: Tuple = ()
+
+    def add_packet(self, ts: float, forward: bool, length: int, flags: int):
+        self.has_packets = True
+        self.last_ts = max(self.last_ts, ts)
+        if forward:
+            self.fwd_pkts += 1
+            self.fwd_bytes += length
+        else:
+            self.bwd_pkts += 1
+            self.bwd_bytes += length
+            if self.first_bwd_ts is None:
+                self.first_bwd_ts = ts
+            self.last_bwd_ts = ts
+        if flags:
+            self.fin += bool(flags & 0x01)
+            self.rst += bool(flags & 0x04)
+            self.psh += bool(flags & 0x08)
+            self.ack += bool(flags & 0x10)
+            self.urg += bool(flags & 0x20)
+
+    def features(self) -> Dict[str, Any]:
+        """CICFlowMeter 정의에 맞춘 TRAFFIC_FEATURES 값과 저장에 필요한 메타 필드를 반환합니다."""
+        duration_us = (self.last_ts - self.first_ts) * 1e6
+        seconds = duration_us / 1e6
+        total_pkts = self.fwd_pkts + self.bwd_pkts
+        total_bytes = self.fwd_bytes + self.bwd_bytes
+        fwd_mean = self.fwd_bytes / self.fwd_pkts if self.fwd_pkts else 0.0
+        bwd_mean = self.bwd_bytes / self.bwd_pkts if self.bwd_pkts else 0.0
+        nan = float("nan")
+
+        if self.has_packets:
+            bwd_iat = (self.last_bwd_ts - self.first_bwd_ts) * 1e6 if self.bwd_pkts > 1 else 0.0
+            flags = (self.fin, self.rst, self.psh, self.ack, self.urg)
+        else:
+            # flow 이벤트에는 도착 간격 / 플래그 정보가 없으므로 결측으로 두고 중앙값으로 대체되게 합니다.
+            bwd_iat = nan
+            flags = (nan,) * 5
+
+        row = {
+            "Dst_Port": self.dst_port,
+            "Protocol": self.protocol,
+            "Flow_Duration": duration_us,
+            "Tot_Fwd_Pkts": self.fwd_pkts,
+            "Tot_Bwd_Pkts": self.bwd_pkts,
+            "TotLen_Fwd_Pkts": self.fwd_bytes,
+            "TotLen_Bwd_Pkts": self.bwd_bytes,
+            "Flow_Byts_per_s": total_bytes / seconds if seconds > 0 else float("inf"),
+            "Flow_Pkts_per_s": total_pkts / seconds if seconds > 0 else float("inf"),
+            "Bwd_IAT_Tot": bwd_iat,
+            "FIN_Flag_Cnt": flags[0],
+            "RST_Flag_Cnt": flags[1],
+            "PSH_Flag_Cnt": flags[2],
+            "ACK_Flag_Cnt": flags[3],
+            "URG_Flag_Cnt": flags[4],
+            "Down_per_Up_Ratio": self.bwd_pkts // self.fwd_pkts if self.fwd_pkts else 0,
+            "Pkt_Size_Avg": total_bytes / total_pkts if total_pkts else 0.0,
+            "Fwd_Seg_Size_Avg": fwd_mean,
+            "Fwd_Pkt_Len_Mean": fwd_mean,
+            "Bwd_Seg_Size_Avg": bwd_mean,
+            "Bwd_Pkt_Len_Mean": bwd_mean,
+        }
+        row["@timestamp"] = datetime.fromtimestamp(self.first_ts, tz=timezone.utc).isoformat()
+        row["Src_IP"] = self.src_ip
+        row["Src_Port"] = self.src_port
+        row["Dst_IP"] = self.dst_ip
+        if self.user_id is not None:
+            row["user_id"] = self.user_id
+        return row
+
+
+class FlowAggregator:
+    """
+    packetbeat 이벤트 묶음을 받아 완료된 플로우의 피처 행 목록을 돌려주는 집계기입니다.
+    이미 피처가 계산된 레코드(CICFlowMeter 형식)는 그대로 통과시킵니다.
+    """
+
+    def __init__(self, idle_timeout: float = 60.0, active_timeout: float = 120.0, max_flows: int = 200_000):
+        self.idle_timeout = idle_timeout
+        self.active_timeout = active_timeout
+        self.max_flows = max_flows
+        # 마지막 갱신 순서로 정렬된 활성 플로우 (앞쪽이 가장 오래 갱신되지 않은 플로우)
+        self._flows: "OrderedDict[Tuple, FlowState]" = OrderedDict()
+        self._clock = 0.0
+        self._serial = 0
+
+        # 오프셋 커밋을 붙잡고 있는 플로우 번호 (활성 플로우 + 내보냈지만 release 되지 않은 플로우)
+        self._held: Set[int] = set()
+        # 파티션 → (플로우의 첫 오프셋, 플로우 번호) 힙. 더 이상 _held 에 없는 항목은 조회 시 지웁니다.
+        self._floors: Dict[Hashable, List[Tuple[int, int]]] = {}
+        # 파티션 → 집계에 반영한 마지막 원시 이벤트 오프셋 (되감기로 다시 받은 이벤트를 두 번 세지 않도록)
+        self._fed: Dict[Hashable, int] = {}
+        self._retry: List[Dict[str, Any]] = []
+
+        self.events = 0
+        self.emitted = 0
+        self.evicted = 0
+        self.refed = 0
+
+    @classmethod
+    def from_settings(cls) -> "FlowAggregator":
+        from ..core.config import settings
+        return cls(
+            idle_timeout=settings.flow_idle_timeout_seconds,
+            active_timeout=settings.flow_active_timeout_seconds,
+            max_flows=settings.flow_max_active,
+        )
+
+    def process(self, events: List[Dict[str, Any]],
+                positions: Optional[List[Tuple[Hashable, int]]] = None) -> List[Dict[str, Any]]:
+        """
+        events 를 반영하고 내보낼 행(통과 레코드 + 완료 / 만료 플로우 + requeue 된 플로우)을 반환합니다.
+        positions 는 events 와 같은 순서의 (파티션, 오프셋) 목록입니다.
+        """
+        out, self._retry = self._retry, []
+        for i, event in enumerate(events):
+            if not is_raw_event(event):
+                out.append(event)
+                continue
+            position = positions[i] if positions is not None else None
+            if position is not None:
+                partition, offset = position
+                if offset <= self._fed.get(partition, -1):
+                    self.refed += 1  # 이미 활성 플로우에 반영된 패킷 (실패 후 되감기로 다시 받음)
+                    continue
+                self._fed[partition] = offset
+            self.events += 1
+            self._add(event, position, out)
+        out.extend(self.expire())
+        return out
+
+    def _emit(self, state: FlowState, out: List[Dict[str, Any]]):
+        row = state.features()
+        if state.partitions:
+            row[FLOW_ID_KEY] = state.serial
+        else:
+            self._held.discard(state.serial)
+        out.append(row)
+        self.emitted += 1
+
+    def _hold(self, state: FlowState, position: Tuple[Hashable, int]):
+        partition, offset = position
+        if partition in state.partitions:
+            return
+        state.partitions += (partition,)
+        self._held.add(state.serial)
+        heapq.heappush(self._floors.setdefault(partition, []), (offset, state.serial))
+
+    def _add(self, event: Dict[str, Any], position: Optional[Tuple[Hashable, int]], out: List[Dict[str, Any]]):
+        src_ip, src_port = _get(event, "source.ip"), _get(event, "source.port") or 0
+        dst_ip, dst_port = _get(event, "destination.ip"), _get(event, "destination.port") or 0
+        if src_ip is None or dst_ip is None:
+            return
+        transport = _get(event, "network.transport")
+        protocol = _PROTOCOLS.get(str(transport).lower(), 0) if transport else int(_get(event, "network.iana_number") or 0)
+        ts = _timestamp(event.get("@timestamp")) or _timestamp(_get(event, "event.start")) or self._clock
+        self._clock = max(self._clock, ts)
+
+        # 양방향 패킷이 같은 플로우로 모이도록 정렬된 5-tuple 을 키로 씁니다. (packetbeat flow.id 가 있으면 우선 사용)
+        a, b = (src_ip, src_port), (dst_ip, dst_port)
+        key = _get(event, "flow.id") or (protocol,) + (a + b if a <= b else b + a)
+
+        state = self._flows.get(key)
+        if state is None:
+            self._serial += 1
+            state = FlowState(src_ip, src_port, dst_ip, dst_port, protocol, ts, event.get("user_id"), self._serial)
+            self._flows[key] = state
+            if len(self._flows) > self.max_flows:
+                # 용량을 넘으면 가장 오래 갱신되지 않은 플로우를 미완료 상태 그대로 내보냅니다.
+                _, oldest = self._flows.popitem(last=False)
+                self._emit(oldest, out)
+                self.evicted += 1
+        else:
+            self._flows.move_to_end(key)
+            state.seen_at = time.monotonic()
+        if position is not None:
+            self._hold(state, position)
+
+        if event.get("type") == "flow":
+            # packetbeat flow 이벤트는 누적 카운터이므로 더하지 않고 덮어씁니다.
+            start = _timestamp(_get(event, "event.start"))
+            end = _timestamp(_get(event, "event.end"))
+            if start is not None:
+                state.first_ts = min(state.first_ts, start)
+            state.last_ts = max(state.last_ts, end or ts)
+            state.fwd_pkts = int(_get(event, "source.packets") or 0)
+            state.fwd_bytes = int(_get(event, "source.bytes") or 0)
+            state.bwd_pkts = int(_get(event, "destination.packets") or 0)
+            state.bwd_bytes = int(_get(event, "destination.bytes") or 0)
+            done = bool(_get(event, "flow.final"))
+        else:
+            forward = (src_ip, src_port) == (state.src_ip, state.src_port)
+            length = int(_get(event, "network.bytes") or _get(event, "packet.length") or _get(event, "source.bytes") or 0)
+            flags = _tcp_flags(_get(event, "tcp.flags"))
+            state.add_packet(ts, forward, length, flags)
+            done = bool(flags & 0x05)  # FIN 또는 RST
+
+        if done or state.last_ts - state.first_ts >= self.active_timeout:
+            del self._flows[key]
+            self._emit(state, out)
+
+    def expire(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        now(기본: 지금까지 본 가장 늦은 이벤트 시각) 기준으로 idle_timeout 이 지났거나,
+        마지막 갱신 후 실제 시간으로 idle_timeout 이 지난 플로우를 내보냅니다.
+        """
+        now = self._clock if now is None else now
+        wall = time.monotonic()
+        expired: List[Dict[str, Any]] = []
+        while self._flows:
+            key, state = next(iter(self._flows.items()))
+            if now - state.last_ts < self.idle_timeout and wall - state.seen_at < self.idle_timeout:
+                break
+            del self._flows[key]
+            self._emit(state, expired)
+        return expired
+
+    def flush(self, partitions: Optional[Iterable[Hashable]] = None) -> List[Dict[str, Any]]:
+        """
+        남아 있는 플로우(와 requeue 된 행)를 내보냅니다. partitions 를 주면 그 파티션의 이벤트가 포함된
+        활성 플로우만 내보내고, 해당 파티션의 되감기 기준을 지웁니다. (종료 / 파티션 회수 시 사용)
+        """
+        out: List[Dict[str, Any]] = []
+        if partitions is None:
+            out, self._retry = self._retry, []
+            states = list(self._flows.items())
+            self._fed.clear()
+        else:
+            partitions = set(partitions)
+            states = [(key, state) for key, state in self._flows.items() if partitions.intersection(state.partitions)]
+            for partition in partitions:
+                self._fed.pop(partition, None)
+        for key, state in states:
+            del self._flows[key]
+            self._emit(state, out)
+        return out
+
+    def release(self, rows: List[Dict[str, Any]]):
+        """저장이 끝난 플로우 행의 커밋 붙잡기를 풉니다."""
+        for row in rows:
+            serial = row.get(FLOW_ID_KEY)
+            if serial is not None:
+                self._held.discard(serial)
+
+    def requeue(self, rows: List[Dict[str, Any]]):
+        """저장하지 못한 플로우 행을 다음 process() 에서 다시 반환합니다. (통과 레코드는 Kafka 에서 다시 받음)"""
+        self._retry.extend(row for row in rows if FLOW_ID_KEY in row)
+
+    def take_retry(self) -> List[Dict[str, Any]]:
+        """재시도 대기 중인 플로우 행을 꺼냅니다. (커밋 붙잡기는 release() 로 따로 풉니다)"""
+        out, self._retry = self._retry, []
+        return out
+
+    def commit_floor(self, partition: Hashable) -> Optional[int]:
+        """partition 에서 아직 저장되지 않은 플로우가 포함한 가장 이른 오프셋. 없으면 None."""
+        heap = self._floors.get(partition)
+        while heap and heap[0][1] not in self._held:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active_flows": len(self._flows),
+            "max_flows": self.max_flows,
+            "events": self.events,
+            "emitted": self.emitted,
+            "evicted": self.evicted,
+            "held": len(self._held),
+            "refed": self.refed,
+        }
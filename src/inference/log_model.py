@@ -0,0 +1,190 @@
+# src/inference/log_model.py
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+from .tree_ensemble import load_artifact, load_model
+
+# 학습 노트북(model_training.ipynb)의 attack_type_mapping 과 동일합니다.
+ATTACK_TYPE_NAMES = {
+    'T1021.002': '원격 서비스 공격',
+    'T1021.003': 'DCOM 공격',
+    'T1047': 'WMI 공격',
+    'T1053.005': '스케줄 작업 공격',
+    'T1574.001': 'DLL 하이재킹',
+    'T1127.001': '방어 회피 (MSBuild)',
+    'T1136.001': '지속성 (계정 생성)',
+    'T1210': '원격 서비스 악용 (Zerologon)',
+    'Benign': '정상'
+}
+BENIGN_LABEL = "Benign"
+
+# winlogbeat(ECS) 형식으로 들어온 이벤트에서 학습 컬럼으로 옮겨 담을 필드 (컬럼명 → 점 경로)
+_WINLOGBEAT_ALIASES = {
+    'EventID': 'winlog.event_id',
+    'Channel': 'winlog.channel',
+    'RecordNumber': 'winlog.record_id',
+    'Opcode': 'winlog.opcode',
+    'Keywords': 'winlog.keywords',
+    'SourceName': 'winlog.provider_name',
+    'ProcessId': 'winlog.process.pid',
+    'ThreadID': 'winlog.process.thread.id',
+    'ActivityID': 'winlog.activity_id',
+    'System.Version': 'winlog.version',
+    'Level': 'log.level',
+    'Hostname': 'host.hostname',
+}
+
+
+def _get_path(record: Dict[str, Any], path: str) -> Any:
+    value: Any = record
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def flatten_json_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    노트북의 flatten_json_record 와 동일하게 'Event' 안의 System / EventData 를 개별 컬럼으로 펼칩니다.
+    winlogbeat 형식(winlog.event_data)은 event_data 를 최상위로 끌어올리고 주요 메타 필드를 학습 컬럼명으로 옮깁니다.
+    그 외의 평탄한 레코드는 그대로 반환합니다.
+    """
+    event_content = record.get('Event')
+    if isinstance(event_content, dict):
+        flat_record = {}
+        system_data = event_content.get('System') or {}
+        for key, value in system_data.items():
+            if not isinstance(value, dict):
+                flat_record[f'System.{key}'] = value
+
+        event_data = event_content.get('EventData') or {}
+        if 'Data' in event_data:
+            data_items = event_data.get('Data')
+            if not isinstance(data_items, list):
+                data_items = [data_items]
+            for item in data_items:
+                if isinstance(item, dict) and '@Name' in item:
+                    flat_record[item['@Name']] = item.get('#text', None)
+        return flat_record
+
+    winlog = record.get('winlog')
+    if isinstance(winlog, dict):
+        flat_record = dict(winlog.get('event_data') or {})
+        for column, path in _WINLOGBEAT_ALIASES.items():
+            if column not in flat_record:
+                flat_record[column] = _get_path(record, path)
+        return flat_record
+
+    return record
+
+
+class LogFeaturizer:
+    """
+    이벤트 묶음을 columns.json 의 30개 컬럼 순서대로 (n, 30) 행렬로 변환합니다.
+    문자열 값은 길이로, 숫자 값은 그대로, 누락된 값은 0 으로 처리합니다. (노트북 preprocess_dataframe 규칙)
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.column_index = {name: j for j, name in enumerate(self.columns)}
+
+    def transform(self, events: Sequence[Dict[str, Any]]) -> np.ndarray:
+        n, k = len(events), len(self.columns)
+        X = np.zeros((n, k), dtype=np.float64)
+        strings = np.empty((n, k), dtype=object)
+        is_string = np.zeros((n, k), dtype=bool)
+
+        for i, event in enumerate(events):
+            flat = flatten_json_record(event)
+            for name, j in self.column_index.items():
+                value = flat.get(name)
+                if value is None:
+                    continue
+                if isinstance(value, str):
+                    strings[i, j] = value
+                    is_string[i, j] = True
+                elif isinstance(value, (int, float)):
+                    X[i, j] = value
+
+        # 문자열 길이는 행 단위 apply 대신 한 번의 벡터 연산으로 계산합니다.
+        if is_string.any():
+            X[is_string] = np.char.str_len(strings[is_string].astype(str))
+        return X
+
+
+class LogClassifier:
+    """
+    로그 모델 아티팩트(columns.json / StandardScaler / XGBoost / LabelEncoder)를 한 번만 로드하고,
+    winlogbeat 이벤트 묶음을 배치당 한 번의 predict_proba 호출로 분류합니다.
+    """
+
+    def __init__(self, columns: Sequence[str], scaler, model, label_encoder):
+        self.featurizer = LogFeaturizer(columns)
+        self.model = model
+        self.classes = np.asarray(label_encoder.classes_)
+        self.benign_index = int(np.flatnonzero(self.classes == BENIGN_LABEL)[0])
+
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    @staticmethod
+    def artifact_paths() -> Dict[str, str]:
+        """
+        Settings에 지정된 아티팩트 경로. 변환된 앙상블(LOG_COMPILED_MODEL_PATH)이 지정되면
+        COMPILED_MODEL_MAX_ROWS 행 이하 배치에 사용합니다. (0이면 원본 모델 대신 사용)
+        """
+        paths = {
+            "columns": settings.log_columns_path,
+            "scaler": settings.log_scaler_path,
+            "model": settings.log_model_path,
+            "label_encoder": settings.log_encoder_path or os.path.join(
+                os.path.dirname(settings.log_model_path), "label_encoder.joblib"
+            ),
+        }
+        if settings.log_compiled_model_path:
+            paths["compiled_model"] = settings.log_compiled_model_path
+            if settings.compiled_model_max_rows <= 0:
+                del paths["model"]
+        return paths
+
+    @classmethod
+    def from_settings(cls, mmap_mode: Optional[str] = None) -> "LogClassifier":
+        """Settings에 지정된 경로에서 아티팩트를 로드합니다."""
+        paths = cls.artifact_paths()
+        with open(paths.pop("columns"), encoding="utf-8") as f:
+            columns = json.load(f)
+        model = load_model(paths.pop("model", None), paths.pop("compiled_model", None),
+                           settings.compiled_model_max_rows, mmap_mode)
+        return cls(columns=columns, model=model, **{name: load_artifact(path, mmap_mode) for name, path in paths.items()})
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X -= self.mean
+        X /= self.scale
+        return X
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if len(X) == 0:
+            return np.empty((0, len(self.classes)))
+        return self.model.predict_proba(self.transform(X))
+
+    def classify(self, events: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """이벤트 목록을 분류하여 (label, confidence, is_attack) 결과를 입력 순서대로 반환합니다."""
+        proba = self.predict_proba(self.featurizer.transform(events))
+        best = proba.argmax(axis=1)
+        labels = self.classes[best]
+        confidences = proba[np.arange(len(best)), best]
+
+        return [
+            {
+                "label": str(labels[i]),
+                "confidence": float(confidences[i]),
+                "is_attack": int(best[i]) != self.benign_index,
+            }
+            for i in range(len(best))
+        ]
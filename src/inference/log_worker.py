@@ -0,0 +1,141 @@
+# src/inference/log_worker.py
+
+import os
+import sys
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# --- 프로젝트 경로 설정 및 모듈 import ---
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from src.core.config import settings
+from src.models.models import AttackLog
+from src.inference.pool import InferencePool
+from src.inference.registry import ModelRegistry, model_registry
+from src.inference.stream import MicroBatchConsumer, serve_metrics
+from src.inference.log_model import ATTACK_TYPE_NAMES, flatten_json_record
+
+RESPONSE_TYPE = "alert"
+
+
+def _severity(confidence: float) -> str:
+    if confidence >= 0.9:
+        return "high"
+    if confidence >= 0.7:
+        return "medium"
+    return "low"
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc)
+
+
+def build_attack_log(event: Dict[str, Any], result: Dict[str, Any]) -> AttackLog:
+    """분류 결과가 공격인 이벤트를 Attack_log 행으로 변환합니다."""
+    flat = flatten_json_record(event)
+    host = event.get("host") or {}
+    now = datetime.now(timezone.utc)
+
+    return AttackLog(
+        detected_at=_parse_timestamp(event.get("@timestamp")),
+        attack_type=ATTACK_TYPE_NAMES.get(result["label"], result["label"]),
+        severity=_severity(result["confidence"]),
+        confidence=round(result["confidence"] * 100, 2),
+        source_address=flat.get("SourceAddress") or flat.get("IpAddress"),
+        hostname=flat.get("Hostname") or host.get("hostname") or host.get("name"),
+        user_id=event.get("user_id"),
+        description={
+            "technique": result["label"],
+            "event_id": flat.get("EventID"),
+            "record_number": flat.get("RecordNumber"),
+            "process_guid": flat.get("ProcessGuid"),
+            "process_path": flat.get("Image") or flat.get("ProcessName"),
+            "rule_name": flat.get("RuleName"),
+            "channel": flat.get("Channel"),
+        },
+        response_type=RESPONSE_TYPE,
+        responded_at=now,
+    )
+
+
+class LogInferenceWorker(MicroBatchConsumer):
+    """winlogbeat 토픽의 이벤트를 마이크로 배치로 분류하고, 공격 이벤트를 Attack_log 에 저장합니다."""
+
+    name = "log"
+
+    def __init__(self, registry: ModelRegistry = model_registry, pool: Optional[InferencePool] = None, **kwargs):
+        super().__init__(settings.kafka_topic_winlogbeat, **kwargs)
+        self.registry = registry
+        self.pool = pool
+        self.total_attacks = 0
+
+    def dedup_key(self, event: Dict[str, Any], position=None) -> Optional[bytes]:
+        # 같은 호스트 / 채널의 같은 RecordNumber (+ ProcessGuid) 는 같은 Windows 이벤트입니다.
+        winlog = event.get("winlog") or {}
+        record_id = winlog.get("record_id")
+        if record_id is None:
+            return None
+        host = event.get("host") or {}
+        process_guid = (winlog.get("event_data") or {}).get("ProcessGuid")
+        return f"{host.get('hostname') or host.get('name')}|{winlog.get('channel')}|{record_id}|{process_guid}".encode("utf-8")
+
+    async def handle_batch(self, batch: List[Dict[str, Any]], positions=None):
+        if self.pool is not None:
+            # 프로세스 풀 모드: 피처 행렬을 공유 메모리로 넘겨 다른 코어에서 추론합니다.
+            results = await self.pool.classify("log", batch)
+        else:
+            # 배치마다 레지스트리에서 현재 버전을 가져오므로, 모델이 교체되면 다음 배치부터 새 버전이 적용됩니다.
+            classifier = self.registry.get("log")
+            results = await asyncio.to_thread(classifier.classify, batch)
+
+        rows = [
+            build_attack_log(event, result)
+            for event, result in zip(batch, results)
+            if result["is_attack"]
+        ]
+        if not rows:
+            return
+
+        await self.persist(rows)
+        self.total_attacks += len(rows)
+        print(f"🚨 [log] {len(batch)}건 중 {len(rows)}건의 공격 이벤트 저장 (누적 {self.total_attacks}건)")
+
+
+async def main():
+    pool = None
+    watcher = None
+    if settings.inference_pool_size > 0:
+        # 자식 프로세스가 각자 모델을 로드하고 핫 리로드도 직접 확인합니다.
+        pool = InferencePool.from_settings(names=["log"])
+        await asyncio.to_thread(pool.start)
+    else:
+        # 시작 시 모델을 미리 로드하고, 아티팩트가 교체되면 재시작 없이 다시 로드합니다.
+        await asyncio.to_thread(model_registry.get, "log")
+        watcher = asyncio.create_task(model_registry.watch())
+
+    worker = LogInferenceWorker(model_registry, pool=pool)
+    metrics_runner = await serve_metrics([worker], registry=model_registry, pool=pool)
+    try:
+        if settings.inference_partition_parallel:
+            await worker.run_partitioned()
+        else:
+            await worker.run()
+    finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        if watcher is not None:
+            watcher.cancel()
+        if pool is not None:
+            pool.shutdown()
+
+
+# --- 스크립트 실행 ---
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,255 @@
+# src/inference/pool.py
+
+"""
+트리 앙상블 추론을 여러 코어로 나누어 실행하는 프로세스 풀입니다.
+
+한 프로세스의 추론은 GIL 때문에 코어 하나에 묶이므로, 각 자식 프로세스가 ModelRegistry 로 모델을 한 번씩 로드해 두고
+부모 프로세스는 피처 행렬만 multiprocessing.shared_memory 블록에 써서 넘깁니다.
+자식은 같은 블록의 출력 영역에 확률을 써 넣으므로, 배치 데이터 자체는 pickle 로 직렬화되지 않습니다.
+
+    # 합성 CIC-IDS2018 형태 플로우로 1 → N 프로세스 처리량 측정
+    python -m src.inference.pool --model traffic --rows 50000 --batch-size 512 --max-workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# --- 자식 프로세스 상태 ---
+_last_refresh = 0.0
+
+
+def _init_worker(names: Sequence[str]):
+    """자식 프로세스 시작 시 모델을 한 번 로드합니다. (mmap 로드 시 배열 페이지는 프로세스 간에 공유됩니다)"""
+    global _last_refresh
+    from .registry import model_registry
+    for name in names:
+        model_registry.get(name)
+    _last_refresh = time.monotonic()
+
+
+def _describe(name: str) -> Tuple[List[str], int]:
+    from .registry import model_registry
+    classifier = model_registry.get(name)
+    return [str(c) for c in classifier.classes], classifier.benign_index
+
+
+def _predict_shared(name: str, shm_name: str, n_rows: int, n_features: int, n_classes: int) -> Tuple[int, Dict[str, Any]]:
+    """
+    공유 메모리의 (n, k) 피처 행렬을 분류하여 같은 블록 뒤쪽의 (n, c) 영역에 확률을 씁니다.
+    부모가 자식별 모델 버전을 알 수 있도록 (pid, 사용한 모델 버전 정보)를 반환합니다.
+    """
+    global _last_refresh
+    from ..core.config import settings
+    from .registry import model_registry
+
+    # 자식 프로세스에도 핫 리로드를 적용합니다. (호출 사이 간격이 MODEL_RELOAD_INTERVAL 을 넘으면 변경 여부 확인)
+    now = time.monotonic()
+    if now - _last_refresh >= settings.model_reload_interval:
+        _last_refresh = now
+        model_registry.refresh()
+
+    # 자식 프로세스는 부모의 resource_tracker 를 공유하므로, 블록 해제(unlink)는 부모가 한 번만 수행합니다.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        X = np.ndarray((n_rows, n_features), dtype=np.float64, buffer=shm.buf)
+        out = np.ndarray((n_rows, n_classes), dtype=np.float64, buffer=shm.buf, offset=X.nbytes)
+        out[:] = model_registry.get(name).predict_proba(X)
+        del X, out
+    finally:
+        shm.close()
+    return os.getpid(), model_registry.info()[name]
+
+
+def _decode(proba: np.ndarray, classes: np.ndarray, benign_index: int) -> List[Dict[str, Any]]:
+    best = proba.argmax(axis=1)
+    labels = classes[best]
+    confidences = proba[np.arange(len(best)), best]
+    return [
+        {
+            "label": str(labels[i]),
+            "confidence": float(confidences[i]),
+            "is_attack": int(best[i]) != benign_index,
+        }
+        for i in range(len(best))
+    ]
+
+
+class InferencePool:
+    """
+    모델을 미리 로드한 자식 프로세스들에 배치 추론을 분배합니다.
+
+    - classify(name, records): 분류기의 classify() 와 같은 형식의 결과를 await 로 받습니다.
+    - map(name, batches): 최대 max_workers 개 배치를 동시에 실행하면서 결과는 제출 순서대로 내보냅니다.
+    피처 변환(dict → 행렬)은 부모 프로세스의 스레드에서(이벤트 루프를 막지 않도록), 전처리와 트리 평가는 자식 프로세스에서 수행합니다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, names: Sequence[str] = ("traffic", "log")):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.names = list(names)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._classes: Dict[str, Tuple[np.ndarray, int]] = {}
+        self._featurizers: Dict[str, Any] = {}
+        # 자식 pid → 모델 이름 → 마지막 배치를 처리한 모델 버전 정보
+        self._child_models: Dict[int, Dict[str, Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_settings(cls, names: Sequence[str] = ("traffic", "log")) -> "InferencePool":
+        from ..core.config import settings
+        return cls(max_workers=settings.inference_pool_size or None, names=names)
+
+    def start(self):
+        # 부모는 asyncio 스레드를 쓰므로 fork 대신 spawn 으로 깨끗한 자식 프로세스를 만듭니다.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.names,),
+        )
+        for name in self.names:
+            classes, benign_index = self._executor.submit(_describe, name).result()
+            self._classes[name] = (np.asarray(classes), benign_index)
+            self._featurizers[name] = self._make_featurizer(name)
+        print(f"⚙️  추론 프로세스 풀 시작: {self.max_workers}개 프로세스, 모델={self.names}")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._child_models.clear()
+
+    def model_info(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """자식 프로세스(pid)별로 마지막 배치를 처리한 모델 버전을 반환합니다. 아직 배치를 처리하지 않은 자식은 없습니다."""
+        return {str(pid): dict(models) for pid, models in self._child_models.items()}
+
+    @staticmethod
+    def _make_featurizer(name: str):
+        if name == "traffic":
+            from .traffic_model import featurize_flows
+            return featurize_flows
+        if name == "log":
+            from ..core.config import settings
+            from .log_model import LogFeaturizer
+            with open(settings.log_columns_path, encoding="utf-8") as f:
+                return LogFeaturizer(json.load(f)).transform
+        raise ValueError(f"지원하지 않는 모델입니다: {name}")
+
+    def featurize(self, name: str, records: Sequence[Dict[str, Any]]) -> np.ndarray:
+        return self._featurizers[name](records)
+
+    async def predict_proba(self, name: str, X: np.ndarray) -> np.ndarray:
+        """(n, k) 원본 피처 행렬을 자식 프로세스에서 분류하여 (n, c) 확률을 반환합니다."""
+        if self._executor is None:
+            raise RuntimeError("InferencePool.start() 를 먼저 호출해야 합니다.")
+        classes, _ = self._classes[name]
+        n, k = X.shape
+        c = len(classes)
+        if n == 0:
+            return np.empty((0, c))
+
+        shm = shared_memory.SharedMemory(create=True, size=(n * k + n * c) * 8)
+        try:
+            np.ndarray((n, k), dtype=np.float64, buffer=shm.buf)[:] = X
+            loop = asyncio.get_running_loop()
+            pid, info = await loop.run_in_executor(self._executor, _predict_shared, name, shm.name, n, k, c)
+            self._child_models.setdefault(pid, {})[name] = info
+            return np.ndarray((n, c), dtype=np.float64, buffer=shm.buf, offset=n * k * 8).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    async def classify(self, name: str, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """레코드 목록을 분류하여 (label, confidence, is_attack[, features]) 결과를 입력 순서대로 반환합니다."""
+        # 512건 로그 배치 기준 10ms 이상 걸리므로 이벤트 루프(다른 파티션 태스크, consumer heartbeat)에서 실행하지 않습니다.
+        X = await asyncio.to_thread(self.featurize, name, records)
+        proba = await self.predict_proba(name, X)
+        classes, benign_index = self._classes[name]
+        results = _decode(proba, classes, benign_index)
+        if name == "traffic":
+            for i, result in enumerate(results):
+                result["features"] = X[i]
+        return results
+
+    async def map(self, name: str, batches: Iterable[Sequence[Dict[str, Any]]]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        배치를 최대 max_workers 개까지 동시에 실행하고, 결과는 제출 순서대로 내보냅니다.
+        호출자가 중간에 순회를 멈추면(break / 예외) 아직 실행 중인 배치는 취소합니다.
+        """
+        pending: List[asyncio.Task] = []
+        try:
+            for batch in batches:
+                pending.append(asyncio.ensure_future(self.classify(name, batch)))
+                if len(pending) >= self.max_workers:
+                    yield await pending.pop(0)
+            while pending:
+                yield await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _benchmark_rows(pool: InferencePool, name: str, batches: List[Any]) -> float:
+    async def run() -> int:
+        rows = 0
+        async for results in pool.map(name, batches):
+            rows += len(results)
+        return rows
+
+    started = time.perf_counter()
+    rows = asyncio.run(run())
+    return rows / (time.perf_counter() - started)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="프로세스 풀 추론 처리량 벤치마크 (1 → N 프로세스)")
+    parser.add_argument("--model", choices=["traffic", "log"], default="traffic")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # --- 프로젝트 경로 설정 및 모듈 import ---
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(project_root)
+
+    if args.model == "traffic":
+        from src.inference.synthetic import synthetic_flows
+        records = synthetic_flows(args.rows, seed=args.seed)
+    else:
+        from src.core.config import settings
+        from src.inference.synthetic import synthetic_log_events
+        # 워커의 LogFeaturizer 와 같은 columns.json 으로, 실제 분포에 가까운 합성 이벤트를 만듭니다.
+        with open(settings.log_columns_path, encoding="utf-8") as f:
+            columns = json.load(f)
+        records = synthetic_log_events(columns, args.rows, seed=args.seed)
+    batches = [records[i:i + args.batch_size] for i in range(0, len(records), args.batch_size)]
+
+    print(f"📊 {args.model} 모델, {args.rows}행, 배치 {args.batch_size}, CPU {os.cpu_count()}개")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        pool = InferencePool(max_workers=workers, names=[args.model])
+        pool.start()
+        try:
+            _benchmark_rows(pool, args.model, batches[:workers])  # 워밍업
+            rows_per_sec = _benchmark_rows(pool, args.model, batches)
+        finally:
+            pool.shutdown()
+        baseline = baseline or rows_per_sec
+        print(f"   - 프로세스 {workers}개: {rows_per_sec:,.0f} rows/s (x{rows_per_sec / baseline:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
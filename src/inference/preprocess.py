@@ -0,0 +1,155 @@
+# src/inference/preprocess.py
+
+"""
+트래픽 피처 전처리(SimpleImputer(strategy='median') → RobustScaler)를 하나로 합친 변환기입니다.
+
+    # sklearn 결과와의 일치 여부 및 절약되는 메모리 할당량 확인
+    python -m src.inference.preprocess
+"""
+
+import os
+import sys
+import tracemalloc
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class FusedTrafficPreprocessor:
+    """
+    imputer.joblib / scaler.joblib 의 통계값을 미리 계산해 두고,
+    재사용하는 버퍼 위에서 '결측/무한대 → 중앙값 대체 → (x - center) / scale' 을 제자리(in-place)로 수행해
+    float32 버퍼로 내보냅니다.
+
+    계산 자체는 sklearn 과 같은 float64 연산 순서로 수행한 뒤 float32 로 변환합니다.
+    XGBoost 분기 임계값은 학습 데이터 값(float32)과 정확히 같은 경우가 많아,
+    float32 로 계산하면 1 ulp 차이로 분기가 바뀌어 원본 파이프라인과 결과가 달라지기 때문입니다.
+
+    sklearn 경로는 호출마다 imputer 출력과 scaler 출력 두 개의 새 배열을 할당하지만,
+    이 변환기는 버퍼보다 큰 배치가 들어올 때만 버퍼를 늘립니다.
+    반환값은 내부 버퍼의 뷰이므로 다음 transform() 호출 전에 사용해야 하며, 스레드 간에 공유하면 안 됩니다.
+    """
+
+    # sklearn 경로(imputer.transform + scaler.transform)가 호출마다 새로 만드는 (n, k) 배열 수
+    SKLEARN_ARRAYS_PER_CALL = 2
+
+    def __init__(self, imputer, scaler, initial_rows: int = 256):
+        medians = np.asarray(imputer.statistics_, dtype=np.float64)
+        center = np.asarray(scaler.center_, dtype=np.float64) if scaler.center_ is not None else np.zeros_like(medians)
+        scale = np.asarray(scaler.scale_, dtype=np.float64) if scaler.scale_ is not None else np.ones_like(medians)
+
+        self.n_features = len(medians)
+        self.center = center
+        self.scale = scale
+        # 결측값 자리에 들어갈 최종 값(중앙값을 스케일링한 값)을 미리 계산합니다.
+        self.filled = (medians - center) / scale
+
+        self._work = np.empty((initial_rows, self.n_features), dtype=np.float64)
+        self._buffer = np.empty((initial_rows, self.n_features), dtype=np.float32)
+        self._mask = np.empty((initial_rows, self.n_features), dtype=bool)
+
+        self.calls = 0
+        self.rows = 0
+        self.buffer_growths = 0
+
+    @classmethod
+    def from_paths(cls, imputer_path: str, scaler_path: str, **kwargs) -> "FusedTrafficPreprocessor":
+        import joblib
+        return cls(joblib.load(imputer_path), joblib.load(scaler_path), **kwargs)
+
+    def _reserve(self, n: int):
+        if n > len(self._buffer):
+            size = max(n, 2 * len(self._buffer))
+            self._work = np.empty((size, self.n_features), dtype=np.float64)
+            self._buffer = np.empty((size, self.n_features), dtype=np.float32)
+            self._mask = np.empty((size, self.n_features), dtype=bool)
+            self.buffer_growths += 1
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """(n, 21) 원본 피처 행렬을 전처리한 float32 뷰를 반환합니다. 배치 크기에는 제한이 없으며 X는 변경하지 않습니다."""
+        n = X.shape[0]
+        self._reserve(n)
+        work = self._work[:n]
+        finite = self._mask[:n]
+        out = self._buffer[:n]
+
+        np.copyto(work, X, casting="unsafe")
+        np.isfinite(work, out=finite)
+        work -= self.center
+        work /= self.scale
+        np.logical_not(finite, out=finite)
+        np.copyto(work, self.filled, where=finite)
+        np.copyto(out, work, casting="same_kind")
+
+        self.calls += 1
+        self.rows += n
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        """호출 수와 sklearn 경로 대비 절약한 배열 할당 수/바이트를 반환합니다."""
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "buffer_rows": len(self._buffer),
+            "buffer_growths": self.buffer_growths,
+            "allocations_saved": self.calls * self.SKLEARN_ARRAYS_PER_CALL - self.buffer_growths,
+            "bytes_saved": self.rows * self.n_features * 8 * self.SKLEARN_ARRAYS_PER_CALL,
+        }
+
+
+def _sklearn_transform(imputer, scaler, X: np.ndarray) -> np.ndarray:
+    X = np.where(np.isfinite(X), X, np.nan)
+    return scaler.transform(imputer.transform(X))
+
+
+def _allocated_bytes(func, *args) -> int:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def compare_with_sklearn(imputer, scaler, n_rows: int = 4096, seed: int = 0,
+                         preprocessor: Optional[FusedTrafficPreprocessor] = None) -> Dict[str, Any]:
+    """같은 입력(NaN / inf 포함)으로 sklearn 경로와 결과를 비교하고, 호출 1회당 최대 할당 바이트를 측정합니다."""
+    preprocessor = preprocessor or FusedTrafficPreprocessor(imputer, scaler, initial_rows=n_rows)
+    rng = np.random.default_rng(seed)
+    X = np.abs(rng.standard_normal((n_rows, preprocessor.n_features))) * np.asarray(scaler.scale_) * 2
+    X[rng.random(X.shape) < 0.05] = np.nan
+    X[rng.random(X.shape) < 0.01] = np.inf
+
+    expected = _sklearn_transform(imputer, scaler, X)
+    actual = preprocessor.transform(X)
+    # 출력이 float32 이므로 값의 크기에 비례한 상대 오차로 비교하고, float32 로 변환한 sklearn 결과와의 완전 일치 여부도 확인합니다.
+    rel_error = float((np.abs(expected - actual) / np.maximum(np.abs(expected), 1.0)).max())
+    exact = bool(np.array_equal(expected.astype(np.float32), actual))
+
+    return {
+        "rows": n_rows,
+        "max_rel_error": rel_error,
+        "float32_exact": exact,
+        "passed": rel_error < 1e-6 and exact,
+        "sklearn_peak_bytes": _allocated_bytes(_sklearn_transform, imputer, scaler, X),
+        "fused_peak_bytes": _allocated_bytes(preprocessor.transform, X),
+    }
+
+
+def main() -> int:
+    # --- 프로젝트 경로 설정 및 모듈 import ---
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(project_root)
+    import joblib
+    from src.core.config import settings
+
+    imputer = joblib.load(settings.traffic_imputer_path)
+    scaler = joblib.load(settings.traffic_scaler_path)
+    report = compare_with_sklearn(imputer, scaler)
+    print(f"{'✅' if report['passed'] else '❌'} sklearn 대비 최대 상대 오차: {report['max_rel_error']:.2e}, float32 완전 일치: {report['float32_exact']} ({report['rows']}행)")
+    print(f"   - 호출 1회 최대 할당량: sklearn {report['sklearn_peak_bytes']:,} bytes / fused {report['fused_peak_bytes']:,} bytes")
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
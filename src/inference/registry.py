@@ -0,0 +1,138 @@
+# src/inference/registry.py
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from .log_model import LogClassifier
+from .traffic_model import TrafficClassifier
+
+# 모델 이름 → 분류기 클래스 (artifact_paths() / from_settings(mmap_mode) 를 제공해야 합니다)
+MODEL_TYPES = {
+    "traffic": TrafficClassifier,
+    "log": LogClassifier,
+}
+
+
+def _stat_signature(paths: List[str]) -> Tuple:
+    """파일 크기와 수정 시각(ns)으로 만든 가벼운 변경 감지용 서명입니다."""
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((path, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def _content_hash(paths: List[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+class LoadedModel:
+    """레지스트리에 올라간 한 버전의 분류기와 그 메타데이터입니다."""
+
+    def __init__(self, name: str, classifier: Any, version: str, signature: Tuple, load_seconds: float):
+        self.name = name
+        self.classifier = classifier
+        self.version = version
+        self.signature = signature
+        self.loaded_at = datetime.now(timezone.utc)
+        self.load_seconds = load_seconds
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "loaded_at": self.loaded_at.isoformat(),
+            "load_seconds": round(self.load_seconds, 3),
+            "paths": [path for path, _, _ in self.signature],
+        }
+
+
+class ModelRegistry:
+    """
+    Settings의 모델 경로를 키로 분류기를 한 번만 로드해 두고 공유하는 레지스트리입니다.
+
+    - joblib mmap_mode(기본 'r')로 로드하여 아티팩트 안의 NumPy 배열을 여러 워커 프로세스가 같은 페이지 캐시로 공유합니다.
+      (XGBoost 원본 모델은 내부 바이너리라 매핑되지 않으므로, 공유가 필요하면 tree_ensemble 로 변환한 .joblib 을 지정하세요.)
+    - refresh()는 파일 크기/수정 시각을 먼저 비교하고, 바뀐 경우에만 내용 해시를 계산해 새 버전을 로드합니다.
+      새 분류기는 완전히 로드된 뒤 참조 하나를 바꾸는 방식으로 교체하므로,
+      이미 get()으로 이전 버전을 받아 간 요청은 끝까지 이전 버전으로 처리됩니다.
+    - 재학습 결과는 임시 파일에 쓴 뒤 rename 으로 교체하는 것을 권장합니다. 로드에 실패하면 기존 버전을 유지합니다.
+    """
+
+    def __init__(self, names: Optional[List[str]] = None, mmap_mode: Optional[str] = None,
+                 loaders: Optional[Dict[str, Callable[[Optional[str]], Any]]] = None):
+        self.names = names or list(MODEL_TYPES)
+        self.mmap_mode = mmap_mode if mmap_mode is not None else settings.model_mmap_mode
+        self._loaders = loaders or {name: MODEL_TYPES[name].from_settings for name in self.names}
+        self._models: Dict[str, LoadedModel] = {}
+        self._load_lock = threading.Lock()
+
+    def _paths(self, name: str) -> List[str]:
+        return list(MODEL_TYPES[name].artifact_paths().values())
+
+    def _load(self, name: str, signature: Tuple) -> LoadedModel:
+        paths = [path for path, _, _ in signature]
+        started = time.perf_counter()
+        classifier = self._loaders[name](self.mmap_mode or None)
+        return LoadedModel(name, classifier, _content_hash(paths), signature, time.perf_counter() - started)
+
+    def get(self, name: str) -> Any:
+        """현재 버전의 분류기를 반환합니다. 처음 호출될 때 로드합니다."""
+        loaded = self._models.get(name)
+        if loaded is None:
+            with self._load_lock:
+                loaded = self._models.get(name)
+                if loaded is None:
+                    loaded = self._load(name, _stat_signature(self._paths(name)))
+                    self._models[name] = loaded
+                    print(f"📦 [registry] '{name}' 모델 로드 완료 (version={loaded.version}, {loaded.load_seconds:.2f}s)")
+        return loaded.classifier
+
+    def refresh(self) -> List[str]:
+        """아티팩트가 바뀐 모델을 다시 로드하고, 교체된 모델 이름 목록을 반환합니다."""
+        swapped = []
+        for name in self.names:
+            current = self._models.get(name)
+            if current is None:
+                continue
+            try:
+                signature = _stat_signature(self._paths(name))
+                if signature == current.signature:
+                    continue
+                if _content_hash([path for path, _, _ in signature]) == current.version:
+                    current.signature = signature  # 내용은 같고 수정 시각만 바뀐 경우
+                    continue
+                with self._load_lock:
+                    loaded = self._load(name, signature)
+                    self._models[name] = loaded
+                swapped.append(name)
+                print(f"🔄 [registry] '{name}' 모델 교체: {current.version} → {loaded.version} ({loaded.load_seconds:.2f}s)")
+            except Exception as e:
+                print(f"❌ [registry] '{name}' 모델 재로드 실패, 기존 버전({current.version})을 유지합니다: {e}")
+        return swapped
+
+    async def watch(self, interval: Optional[int] = None):
+        """interval 초마다 refresh()를 실행합니다. 로드는 스레드에서 수행하여 이벤트 루프를 막지 않습니다."""
+        interval = interval or settings.model_reload_interval
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.refresh)
+
+    def info(self) -> Dict[str, Dict[str, Any]]:
+        """로드된 모델별 버전, 로드 시각, 로드 소요 시간을 반환합니다."""
+        return {name: loaded.info() for name, loaded in self._models.items()}
+
+
+# 프로세스 전역 레지스트리 인스턴스
+model_registry = ModelRegistry()
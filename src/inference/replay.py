@@ -0,0 +1,310 @@
+# src/inference/replay.py
+
+"""
+녹화된 이벤트(JSONL 또는 CSV, CIC-IDS2018 CICFlowMeter 내보내기 포함)를 정해진 속도로 탐지 파이프라인에 흘려보내는
+부하 테스트용 재생 도구입니다. 배포 전 용량 산정에 사용합니다.
+
+- kafka 대상: packetbeat / winlogbeat 토픽으로 전송합니다. (로컬 Kafka 호환 브로커도 --bootstrap 으로 지정 가능)
+  일부 메시지(--latency-sample 마다 1건)의 파티션/오프셋을 기록해 두고, 워커의 consumer group 커밋 오프셋이
+  그 위치를 지나는 시점까지를 '탐지 완료(분류 + 저장 + 커밋) 지연'으로 측정합니다.
+- pipeline 대상: Kafka 없이 워커의 중복 제거 → handle_batch() 를 같은 프로세스에서 직접 호출합니다.
+  --dry-run 이면 DB 저장을 건너뜁니다.
+
+속도는 --rate(초당 이벤트 수) 또는 --warp(원본 타임스탬프 간격을 몇 배 빠르게 재생할지) 중 하나로 정하며,
+둘 다 없으면 가능한 한 빠르게 보냅니다.
+
+    python -m src.inference.replay data/flows.csv --kind traffic --rate 5000 --loop 3 --user-id 1
+    python -m src.inference.replay final_processed_dataset.jsonl --kind log --warp 60 --target pipeline --dry-run
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# CICFlowMeter CSV 의 Timestamp 컬럼 형식
+_CIC_TIMESTAMP_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """확장자에 따라 JSONL(한 줄에 JSON 하나) 또는 CSV(헤더 행 포함)를 dict 로 읽습니다."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                # CIC-IDS2018 내보내기는 헤더가 중간에 반복되거나 컬럼명 앞뒤에 공백이 있는 경우가 있습니다.
+                row = {key.strip(): value for key, value in row.items() if key}
+                if row.get("Dst Port") == "Dst Port":
+                    continue
+                yield row
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+def event_time(record: Dict[str, Any]) -> Optional[float]:
+    value = record.get("@timestamp") or record.get("Timestamp")
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, _CIC_TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+class ReplayClock:
+    """이벤트마다 보내야 할 시각(monotonic)을 계산합니다."""
+
+    def __init__(self, rate: Optional[float] = None, warp: Optional[float] = None):
+        self.rate = rate
+        self.warp = warp
+        self.started = time.monotonic()
+        self.count = 0
+        self._first_event = None
+        self._last_event = None
+        self._loop_offset = 0.0
+
+    def new_loop(self):
+        # 다음 반복은 이전 반복의 마지막 이벤트 바로 뒤에 이어서 재생합니다.
+        if self._first_event is not None and self._last_event is not None:
+            self._loop_offset += (self._last_event - self._first_event) / self.warp
+        self._first_event = self._last_event = None
+
+    def due(self, record: Dict[str, Any]) -> float:
+        self.count += 1
+        if self.rate:
+            return self.started + (self.count - 1) / self.rate
+        if self.warp:
+            t = event_time(record)
+            if t is not None:
+                if self._first_event is None:
+                    self._first_event = t
+                self._last_event = max(self._last_event or t, t)
+                return self.started + self._loop_offset + (t - self._first_event) / self.warp
+        return 0.0
+
+
+class ReplayStats:
+    def __init__(self):
+        self.sent = 0
+        self.started = time.monotonic()
+        self.max_behind_ms = 0.0
+        self.latencies_ms: List[float] = []
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        result = {
+            "sent": self.sent,
+            "elapsed_seconds": round(elapsed, 3),
+            "events_per_sec": round(self.sent / elapsed, 1) if elapsed > 0 else 0.0,
+            "max_behind_schedule_ms": round(self.max_behind_ms, 1),
+            "latency_samples": len(self.latencies_ms),
+        }
+        if self.latencies_ms:
+            ms = np.asarray(self.latencies_ms)
+            result.update({
+                "latency_p50_ms": round(float(np.percentile(ms, 50)), 1),
+                "latency_p99_ms": round(float(np.percentile(ms, 99)), 1),
+                "latency_max_ms": round(float(ms.max()), 1),
+            })
+        return result
+
+
+def _prepare(record: Dict[str, Any], rewrite_timestamp: bool, user_id: Optional[str]) -> Dict[str, Any]:
+    if rewrite_timestamp:
+        # 재생한 행이 실시간 데이터처럼 저장되고 플로우 집계기의 유휴 시간 계산도 현재 시각 기준이 되도록 합니다.
+        record["@timestamp"] = datetime.now(timezone.utc).isoformat()
+    if user_id is not None and not record.get("user_id"):
+        record["user_id"] = user_id
+    return record
+
+
+async def _paced(args, stats: ReplayStats):
+    """재생 속도(예정 시각)에 맞춰 레코드를 내보냅니다."""
+    clock = ReplayClock(rate=args.rate, warp=args.warp)
+    stats.started = clock.started  # 연결 / 모델 로드 시간은 처리량 계산에서 제외합니다.
+    loop = 0
+    while args.loop == 0 or loop < args.loop:
+        loop += 1
+        clock.new_loop()
+        for record in iter_records(args.path):
+            due = clock.due(record)
+            wait = due - time.monotonic()
+            if wait > 0.001:
+                await asyncio.sleep(wait)
+            elif due:
+                stats.max_behind_ms = max(stats.max_behind_ms, -wait * 1000)
+            yield _prepare(record, not args.keep_timestamps, args.user_id)
+            if args.limit and stats.sent >= args.limit:
+                return
+
+
+async def replay_to_kafka(args, stats: ReplayStats):
+    from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+    from ..core.config import settings
+
+    topic = args.topic or (settings.kafka_topic_packetbeat if args.kind == "traffic" else settings.kafka_topic_winlogbeat)
+    bootstrap = args.bootstrap or settings.kafka_bootstrap_servers
+    producer = AIOKafkaProducer(
+        bootstrap_servers=bootstrap,
+        linger_ms=5,
+        value_serializer=lambda value: json.dumps(value, default=str, ensure_ascii=False).encode("utf-8"),
+    )
+    # 워커 consumer group 의 커밋 오프셋만 조회합니다. (구독하지 않으므로 그룹 리밸런스를 일으키지 않음)
+    offsets = AIOKafkaConsumer(bootstrap_servers=bootstrap, group_id=args.group or settings.kafka_consumer_group,
+                               enable_auto_commit=False)
+    await producer.start()
+    await offsets.start()
+    pending: List[Tuple[TopicPartition, int, float]] = []
+
+    async def track(future, sent_at):
+        metadata = await future
+        pending.append((TopicPartition(metadata.topic, metadata.partition), metadata.offset, sent_at))
+
+    async def poll_committed():
+        while True:
+            await asyncio.sleep(0.1)
+            if not pending:
+                continue
+            now = time.monotonic()
+            committed = {}
+            for tp in {tp for tp, _, _ in pending}:
+                committed[tp] = await offsets.committed(tp) or 0
+            remaining = []
+            for tp, offset, sent_at in pending:
+                if committed.get(tp, -1) > offset:
+                    stats.latencies_ms.append((now - sent_at) * 1000)
+                else:
+                    remaining.append((tp, offset, sent_at))
+            pending[:] = remaining
+
+    poller = asyncio.create_task(poll_committed())
+    trackers = []
+    print(f"🚀 재생 시작: {args.path} → Kafka '{topic}' ({bootstrap})")
+    try:
+        async for record in _paced(args, stats):
+            future = await producer.send(topic, value=record)
+            stats.sent += 1
+            if stats.sent % args.latency_sample == 0:
+                trackers.append(asyncio.create_task(track(future, time.monotonic())))
+        await producer.flush()
+        await asyncio.gather(*trackers)
+        # 마지막 샘플까지 워커가 커밋하기를 기다립니다.
+        deadline = time.monotonic() + args.drain_timeout
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.2)
+        if pending:
+            print(f"⚠️ {args.drain_timeout}초 안에 처리되지 않은 지연 샘플 {len(pending)}건")
+    finally:
+        poller.cancel()
+        await producer.stop()
+        await offsets.stop()
+
+
+async def replay_to_pipeline(args, stats: ReplayStats):
+    """Kafka 없이 워커의 중복 제거와 handle_batch() 를 직접 호출합니다. (배치 단위: --batch-size)"""
+    from .registry import model_registry
+    if args.kind == "traffic":
+        from .traffic_worker import TrafficInferenceWorker as Worker
+    else:
+        from .log_worker import LogInferenceWorker as Worker
+
+    await asyncio.to_thread(model_registry.get, args.kind)
+    worker = Worker(model_registry)
+    if args.dry_run:
+        async def discard(rows):
+            return None
+        worker.persist = discard
+
+    batch: List[Dict[str, Any]] = []
+    emitted_at: List[float] = []
+
+    async def flush():
+        records, _, keys = worker._drop_duplicates(batch)
+        if records:
+            await worker.handle_batch(records)
+        if keys:
+            worker.dedup.add_many(keys)
+        done = time.monotonic()
+        stats.latencies_ms.extend((done - t) * 1000 for t in emitted_at)
+        batch.clear()
+        emitted_at.clear()
+
+    print(f"🚀 재생 시작: {args.path} → {args.kind} 파이프라인 (in-process{', dry-run' if args.dry_run else ''})")
+    async for record in _paced(args, stats):
+        batch.append(record)
+        emitted_at.append(time.monotonic())
+        stats.sent += 1
+        if len(batch) >= args.batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="JSONL / CSV 이벤트를 정해진 속도로 탐지 파이프라인에 재생")
+    parser.add_argument("path", help="JSONL 또는 CSV(CIC-IDS2018 내보내기) 파일")
+    parser.add_argument("--kind", choices=["traffic", "log"], default="traffic")
+    parser.add_argument("--target", choices=["kafka", "pipeline"], default="kafka")
+    speed = parser.add_mutually_exclusive_group()
+    speed.add_argument("--rate", type=float, help="초당 이벤트 수")
+    speed.add_argument("--warp", type=float, help="원본 타임스탬프 간격 대비 재생 배속 (예: 60 → 1분을 1초에)")
+    parser.add_argument("--loop", type=int, default=1, help="반복 횟수 (0 이면 무한 반복)")
+    parser.add_argument("--limit", type=int, default=0, help="보낼 최대 이벤트 수 (0 이면 제한 없음)")
+    parser.add_argument("--user-id", type=str, help="user_id 가 없는 레코드에 채울 값")
+    parser.add_argument("--keep-timestamps", action="store_true", help="@timestamp 를 재생 시각으로 바꾸지 않음")
+    parser.add_argument("--topic", help="기본값: --kind 에 해당하는 beat 토픽")
+    parser.add_argument("--bootstrap", help="기본값: KAFKA_BOOTSTRAP_SERVERS")
+    parser.add_argument("--group", help="지연을 측정할 워커 consumer group (기본값: KAFKA_CONSUMER_GROUP)")
+    parser.add_argument("--latency-sample", type=int, default=100, help="몇 건마다 1건씩 지연을 측정할지 (kafka 대상)")
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="전송 후 워커 처리를 기다리는 최대 시간(초)")
+    parser.add_argument("--batch-size", type=int, default=256, help="pipeline 대상의 배치 크기")
+    parser.add_argument("--dry-run", action="store_true", help="pipeline 대상에서 DB 저장을 건너뜀")
+    parser.add_argument("--output", help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+    args.latency_sample = max(1, args.latency_sample)
+
+    # --- 프로젝트 경로 설정 ---
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(project_root)
+
+    stats = ReplayStats()
+    replay = replay_to_kafka if args.target == "kafka" else replay_to_pipeline
+    try:
+        asyncio.run(replay(args, stats))
+    except KeyboardInterrupt:
+        print("\n🛑 재생 중단")
+
+    summary = {"path": args.path, "kind": args.kind, "target": args.target, "rate": args.rate, "warp": args.warp, **stats.summary()}
+    print(f"\n📊 {summary['sent']}건 / {summary['elapsed_seconds']}s → {summary['events_per_sec']} events/s"
+          f" (목표 {args.rate or '-'}/s, 최대 지연 {summary['max_behind_schedule_ms']}ms)")
+    if stats.latencies_ms:
+        print(f"   - 탐지 완료 지연: p50 {summary['latency_p50_ms']}ms | p99 {summary['latency_p99_ms']}ms | 최대 {summary['latency_max_ms']}ms ({summary['latency_samples']}건)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,800 @@
+# src/inference/stream.py
+
+import asyncio
+import json
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, TopicPartition
+
+from sqlalchemy import inspect as sa_inspect
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.models import InferenceDeadLetter
+from .bulk_writer import BulkWriter
+from .dedup import RotatingBloomFilter
+
+STATS_INTERVAL_SECONDS = 30
+# DB 쓰기 지연으로 파티션 fetch 를 멈추는 최대 시간
+MAX_PAUSE_SECONDS = 30.0
+# 파티션 모드에서 한 파티션에 처리 대기 중인 레코드가 batch_size 의 몇 배를 넘으면 그 파티션만 fetch 를 멈출지
+PARTITION_BUFFER_BATCHES = 4
+# tick() 호출 주기 (레코드가 없어도 실행되는 주기 작업)
+TICK_SECONDS = 1.0
+
+
+class ThroughputCounter:
+    """처리량(rows/sec)과 배치 처리 시간을 누적 집계하는 카운터입니다."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.total_rows = 0
+        self.total_batches = 0
+        self.total_seconds = 0.0
+        self._window_started_at = self.started_at
+        self._window_rows = 0
+
+    def add(self, rows: int, elapsed: float):
+        self.total_rows += rows
+        self.total_batches += 1
+        self.total_seconds += elapsed
+        self._window_rows += rows
+
+    def snapshot(self, reset_window: bool = False) -> Dict[str, Any]:
+        now = time.monotonic()
+        window = max(now - self._window_started_at, 1e-9)
+        stats = {
+            "total_rows": self.total_rows,
+            "total_batches": self.total_batches,
+            "rows_per_sec": round(self._window_rows / window, 1),
+            "avg_batch_ms": round(self.total_seconds / self.total_batches * 1000, 2) if self.total_batches else 0.0,
+            "uptime_sec": round(now - self.started_at, 1),
+        }
+        if reset_window:
+            self._window_started_at = now
+            self._window_rows = 0
+        return stats
+
+
+class AdaptiveBatchController:
+    """
+    consumer lag 과 배치 처리 시간을 보고 다음 배치의 batch_size / linger_ms 를 정합니다.
+
+    - 배치 처리 시간이 target_batch_ms 를 넘으면 초과한 비율만큼 batch_size 를 줄여 배치당 지연을 제한합니다.
+    - 밀린 레코드(lag)가 batch_size 보다 많으면 batch_size 를 두 배로 늘려 배치당 고정 비용(추론 호출, 커밋)을 나눕니다.
+    - 밀린 레코드가 거의 없으면 batch_size 를 천천히 줄입니다.
+    - linger_ms 는 lag 에 비례합니다. 한산할 때는 min_linger_ms 로 기다리지 않고 바로 처리하고,
+      밀릴수록 max_linger_ms 까지 기다려 배치를 채웁니다.
+    """
+
+    def __init__(self, batch_size: int, linger_ms: int, min_batch_size: int, max_batch_size: int,
+                 min_linger_ms: int, target_batch_ms: float):
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max(max_batch_size, min_batch_size)
+        self.min_linger_ms = min(min_linger_ms, linger_ms)
+        self.max_linger_ms = linger_ms
+        self.target_batch_ms = target_batch_ms
+        self.batch_size = min(max(batch_size, self.min_batch_size), self.max_batch_size)
+        self.linger_ms = linger_ms
+
+    @classmethod
+    def from_settings(cls, batch_size: int, linger_ms: int) -> "AdaptiveBatchController":
+        return cls(
+            batch_size=batch_size,
+            linger_ms=linger_ms,
+            min_batch_size=settings.inference_min_batch_size,
+            max_batch_size=settings.inference_max_batch_size,
+            min_linger_ms=settings.inference_min_linger_ms,
+            target_batch_ms=settings.inference_target_batch_ms,
+        )
+
+    def update(self, lag: int, batch_ms: float):
+        if batch_ms > self.target_batch_ms:
+            size = int(self.batch_size * self.target_batch_ms / batch_ms)
+        elif lag > self.batch_size:
+            size = self.batch_size * 2
+        elif lag < self.batch_size // 4:
+            size = int(self.batch_size * 0.9)
+        else:
+            size = self.batch_size
+        self.batch_size = min(max(size, self.min_batch_size), self.max_batch_size)
+
+        fill = min(lag / self.batch_size, 1.0)
+        self.linger_ms = int(self.min_linger_ms + (self.max_linger_ms - self.min_linger_ms) * fill)
+
+
+class _BatchTuning:
+    """배치 수집 루프 하나의 batch_size / linger_ms 와 이를 정하는 배치 처리 시간 / DB 쓰기 시간 측정값입니다."""
+
+    def __init__(self, batch_size: int, linger_ms: int):
+        self.batch_size = batch_size
+        self.linger_ms = linger_ms
+        self.controller = (
+            AdaptiveBatchController.from_settings(batch_size, linger_ms)
+            if settings.inference_adaptive else None
+        )
+        self.last_batch_ms = 0.0
+        self.last_write_ms = 0.0
+        self.write_ms_ewma = 0.0
+
+    def record_write(self, write_ms: float):
+        self.last_write_ms = write_ms
+        self.write_ms_ewma = write_ms if not self.write_ms_ewma else 0.3 * write_ms + 0.7 * self.write_ms_ewma
+
+    def update(self, lag: int, batch_ms: float):
+        self.last_batch_ms = batch_ms
+        if self.controller is None:
+            return
+        self.controller.update(lag, batch_ms)
+        self.batch_size = self.controller.batch_size
+        self.linger_ms = self.controller.linger_ms
+
+
+# persist() 가 쓰기 시간을 기록할 배치 조정 상태 (파티션 태스크 안에서는 그 파티션의 상태)
+_current_tuning: ContextVar[Optional[_BatchTuning]] = ContextVar("inference_batch_tuning", default=None)
+# 반복 실패한 배치를 격리 모드로 다시 처리하는 중이면 (topic, 파티션 번호) — persist() 가 실패한 행만 골라 격리합니다.
+_quarantine_source: ContextVar[Optional[Tuple[str, Optional[int]]]] = ContextVar("inference_quarantine", default=None)
+
+
+def _json_safe(value: Any) -> Any:
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def _row_payload(row: Any) -> Dict[str, Any]:
+    """ORM 행을 격리 테이블에 남길 {"table": 테이블, 컬럼: 값} 형태로 바꿉니다."""
+    mapper = sa_inspect(type(row))
+    return _json_safe({"table": mapper.local_table.name, **{prop.key: getattr(row, prop.key) for prop in mapper.column_attrs}})
+
+
+class _PartitionState:
+    """파티션 하나의 처리 대기 레코드, 처리 태스크, 배치 조정 상태입니다."""
+
+    def __init__(self, tp: TopicPartition, tuning: _BatchTuning):
+        self.tp = tp
+        self.tuning = tuning
+        self.buffer: Deque[Any] = deque()
+        self.ready = asyncio.Event()
+        self.stopping = False
+        self.task: Optional[asyncio.Task] = None
+
+    def push(self, records: List[Any]):
+        self.buffer.extend(records)
+        self.ready.set()
+
+    async def take(self, batch_size: int, linger_ms: int) -> List[Any]:
+        """batch_size 만큼 모이거나 첫 레코드 이후 linger_ms 가 지나면 꺼냅니다. 1초 동안 레코드가 없으면 빈 목록을 반환합니다."""
+        deadline = time.monotonic() + linger_ms / 1000 if self.buffer else None
+        while len(self.buffer) < batch_size and not self.stopping:
+            timeout = 1.0 if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                if deadline is None:
+                    return []
+            if self.buffer and deadline is None:
+                deadline = time.monotonic() + linger_ms / 1000
+        if self.stopping:
+            return []  # 회수 중에는 새 배치를 시작하지 않습니다.
+        return [self.buffer.popleft() for _ in range(min(batch_size, len(self.buffer)))]
+
+
+class _PartitionRebalanceListener(ConsumerRebalanceListener):
+    def __init__(self, owner: "MicroBatchConsumer", partitioned: bool = True):
+        self.owner = owner
+        self.partitioned = partitioned
+
+    async def on_partitions_revoked(self, revoked):
+        await self.owner._stop_partitions(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        if self.partitioned:
+            self.owner._start_partitions(assigned)
+
+
+class MicroBatchConsumer:
+    """
+    Kafka 토픽을 구독하여 레코드를 '크기(batch_size)' 또는 '마감 시간(linger_ms)' 중
+    먼저 도달하는 기준으로 묶은 뒤 handle_batch()에 넘기는 장기 실행 워커의 기반 클래스입니다.
+    오프셋은 배치 처리가 성공한 뒤에만 커밋합니다.
+
+    INFERENCE_ADAPTIVE 가 켜져 있으면 배치마다 AdaptiveBatchController 로 batch_size / linger_ms 를 조정하고,
+    persist() 로 측정한 DB 쓰기 시간이 INFERENCE_WRITE_SLOW_MS 를 넘으면 파티션 fetch 를 잠시 멈춥니다(pause).
+    파티션 모드에서는 컨트롤러와 쓰기 시간 측정값을 파티션마다 따로 둡니다.
+    현재 상태는 metrics() 로 조회할 수 있습니다.
+
+    INFERENCE_DEDUP 이 켜져 있으면 dedup_key() 가 같은 레코드(재전송 / 재전달)를 handle_batch() 전에 걸러냅니다.
+    키는 배치 처리와 커밋이 성공한 뒤에만 필터에 등록하므로, 실패 후 다시 받은 배치는 중복으로 버려지지 않습니다.
+
+    run_partitioned() 는 할당된 파티션마다 별도 태스크가 '배치 수집 → handle_batch → 해당 파티션 오프셋 커밋'을
+    독립적으로 수행합니다. 한 파티션의 느린 배치가 다른 파티션을 막지 않으며, 리밸런스로 파티션이 회수되면
+    진행 중인 배치를 끝내고 커밋한 뒤 태스크를 종료합니다. (커밋되지 않은 레코드는 새 소유자가 다시 받음: at-least-once)
+
+    handle_batch() 가 레코드를 바로 저장하지 않고 보관하는 워커(예: 플로우 집계)는 commit_floor() 로 커밋 상한을 알려 주고,
+    파티션 회수 / 종료 시 on_revoke() 에서 보관 중인 레코드를 처리합니다. tick() 은 레코드가 없어도 TICK_SECONDS 마다 호출됩니다.
+
+    같은 위치에서 INFERENCE_MAX_BATCH_RETRIES 번 연속 실패한 배치는 격리 모드로 한 번 더 처리합니다.
+    격리 모드의 persist() 는 실패한 쓰기를 반으로 나눠 가며 저장할 수 없는 행만 Inference_dead_letter 에 남기고,
+    그래도 실패하면(분류 단계 오류 등) 배치의 원본 레코드 전체와 quarantine_pending() 이 돌려준 보관 레코드를 남긴 뒤 커밋합니다.
+    격리 테이블에도 쓰지 못하면(DB 장애) 커밋하지 않고 계속 재시도합니다.
+    """
+
+    name = "inference"
+
+    def __init__(self, topic: str, batch_size: Optional[int] = None, linger_ms: Optional[int] = None):
+        self.topic = topic
+        self.base_batch_size = batch_size or settings.inference_batch_size
+        self.base_linger_ms = linger_ms or settings.inference_linger_ms
+        self.tuning = _BatchTuning(self.base_batch_size, self.base_linger_ms)
+        self.counter = ThroughputCounter()
+        self.consumer: Optional[AIOKafkaConsumer] = None
+        self._last_report = time.monotonic()
+
+        self.lag = 0
+        self.pause_count = 0
+        # 파티션 → fetch 를 멈춘 이유들 ("write": DB 쓰기 지연, "buffer": 파티션 버퍼 초과). 이유가 모두 풀려야 재개합니다.
+        self._pause_reasons: Dict[TopicPartition, set] = {}
+        self._partitions: Dict[TopicPartition, _PartitionState] = {}
+        self.dedup = RotatingBloomFilter.from_settings() if settings.inference_dedup else None
+        self._writers: Dict[type, BulkWriter] = {}
+        # 파티션 → handle_batch 까지 성공한 다음 오프셋 / 마지막으로 커밋한 오프셋
+        self._consumed: Dict[TopicPartition, int] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+        self._commit_lock = asyncio.Lock()
+        self._tick_task: Optional[asyncio.Task] = None
+        # 파티션 → (연속 실패한 배치의 시작 오프셋, 실패 횟수)
+        self._failures: Dict[TopicPartition, Tuple[int, int]] = {}
+        self.max_batch_retries = settings.inference_max_batch_retries
+        self.dead_lettered = 0
+
+    async def start(self, listener: Optional[ConsumerRebalanceListener] = None):
+        self.consumer = AIOKafkaConsumer(
+            bootstrap_servers=settings.kafka_bootstrap_servers,
+            group_id=settings.kafka_consumer_group,
+            enable_auto_commit=False,
+            value_deserializer=self._decode,
+        )
+        self.consumer.subscribe([self.topic], listener=listener)
+        await self.consumer.start()
+        print(f"🚀 [{self.name}] '{self.topic}' 구독 시작 (batch_size={self.base_batch_size}, linger_ms={self.base_linger_ms})")
+
+    async def stop(self):
+        if self.consumer is not None:
+            await self.consumer.stop()
+            self.consumer = None
+
+    @staticmethod
+    def _decode(raw: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+
+    async def next_batch(self) -> List[Any]:
+        """batch_size 만큼 모이거나 첫 레코드 이후 linger_ms 가 지나면 배치(ConsumerRecord 목록)를 반환합니다."""
+        batch: List[Any] = []
+        deadline = None
+        batch_size, linger_ms = self.tuning.batch_size, self.tuning.linger_ms
+        while len(batch) < batch_size:
+            if deadline is None:
+                timeout_ms = 1000  # 첫 레코드를 기다리는 동안에는 마감 시간을 두지 않습니다.
+            else:
+                timeout_ms = int((deadline - time.monotonic()) * 1000)
+                if timeout_ms <= 0:
+                    break
+
+            fetched = await self.consumer.getmany(timeout_ms=timeout_ms, max_records=batch_size - len(batch))
+            for records in fetched.values():
+                batch.extend(records)
+
+            if batch and deadline is None:
+                deadline = time.monotonic() + linger_ms / 1000
+        return batch
+
+    def dedup_key(self, record: Dict[str, Any], position: Optional[Tuple[TopicPartition, int]] = None) -> Optional[bytes]:
+        """
+        같은 이벤트의 재전송이면 같은 값을 반환합니다. None 이면 블룸 필터 검사에서 제외됩니다.
+        내용이 같을 뿐인 다른 이벤트가 버려지지 않도록 생산자가 부여한 ID 처럼 이벤트 하나를 가리키는 값을 키로 써야 합니다.
+        position 은 Kafka 에서 받은 레코드의 (파티션, 오프셋)입니다. (같은 위치의 재전달은 키와 관계없이 걸러집니다)
+        """
+        return None
+
+    def _drop_duplicates(self, batch: List[Dict[str, Any]], positions: Optional[List[Tuple[TopicPartition, int]]] = None):
+        """
+        이미 처리한 레코드를 제외하고 (남은 레코드, 같은 순서의 위치 또는 None, 처리 후 등록할 키) 를 반환합니다.
+        Kafka 레코드는 이 프로세스가 이미 처리한 위치(파티션별 마지막 성공 오프셋 이전)면 정확히 재전달이므로 바로 버리고,
+        나머지는 dedup_key() 로 블룸 필터를 검사합니다.
+        """
+        if self.dedup is None:
+            return batch, positions, []
+        if positions is None:
+            keys = [self.dedup_key(record) for record in batch]
+            kept, keys = self.dedup.filter(batch, keys)
+            return kept, None, keys
+        fresh = [(record, (tp, offset)) for record, (tp, offset) in zip(batch, positions) if offset >= self._consumed.get(tp, -1)]
+        if len(fresh) < len(batch):
+            self.dedup.duplicates += len(batch) - len(fresh)
+            batch, positions = [record for record, _ in fresh], [position for _, position in fresh]
+        keys = [self.dedup_key(record, position) for record, position in zip(batch, positions)]
+        kept, keys = self.dedup.filter(list(zip(batch, positions)), keys)
+        return [record for record, _ in kept], [position for _, position in kept], keys
+
+    @staticmethod
+    def _unpack(records: List[Any]) -> Tuple[List[Dict[str, Any]], List[Tuple[TopicPartition, int]]]:
+        """ConsumerRecord 목록을 (값 목록, 같은 순서의 (파티션, 오프셋) 목록)으로 나눕니다. 디코딩에 실패한 레코드는 제외합니다."""
+        kept = [r for r in records if r.value is not None]
+        return [r.value for r in kept], [(TopicPartition(r.topic, r.partition), r.offset) for r in kept]
+
+    async def handle_batch(self, batch: List[Dict[str, Any]], positions: Optional[List[Tuple[TopicPartition, int]]] = None):
+        """batch 를 처리합니다. positions 는 Kafka 에서 받은 경우 batch 와 같은 순서의 (파티션, 오프셋) 목록입니다."""
+        raise NotImplementedError
+
+    def commit_floor(self, tp: TopicPartition) -> Optional[int]:
+        """tp 에서 아직 커밋하면 안 되는 가장 이른 오프셋 (handle_batch 가 저장하지 않고 보관 중인 레코드). 없으면 None."""
+        return None
+
+    async def on_revoke(self, partitions: List[TopicPartition]):
+        """파티션을 내주기 전(리밸런스 / 종료)에 호출됩니다. 보관 중인 레코드가 있으면 여기서 처리합니다."""
+
+    async def tick(self):
+        """레코드 유무와 관계없이 TICK_SECONDS 마다 호출됩니다."""
+
+    async def _commit(self, offsets: Dict[TopicPartition, int]):
+        """처리가 끝난 다음 오프셋을 커밋하되, commit_floor() 를 넘거나 이미 커밋한 위치보다 뒤로 가지 않게 합니다."""
+        async with self._commit_lock:
+            commits = {}
+            assigned = self.consumer.assignment()
+            for tp, offset in offsets.items():
+                if tp not in assigned:
+                    continue
+                floor = self.commit_floor(tp)
+                if floor is not None:
+                    offset = min(offset, floor)
+                if offset > self._committed.get(tp, -1):
+                    commits[tp] = offset
+            if commits:
+                await self.consumer.commit(commits)
+                self._committed.update(commits)
+
+    def _rewind(self, first_offsets: Dict[TopicPartition, int]):
+        """
+        실패한 배치를 다시 받도록, 파티션마다 마지막으로 성공한 위치(없으면 배치의 첫 오프셋)로 되돌립니다.
+        커밋 위치는 commit_floor() 때문에 더 앞일 수 있으므로, 이미 처리한 레코드를 다시 받지 않도록 커밋 위치를 쓰지 않습니다.
+        """
+        for tp, first in first_offsets.items():
+            self.consumer.seek(tp, self._consumed.get(tp, first))
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(TICK_SECONDS)
+            try:
+                await self.tick()
+                # 보관 중이던 레코드가 처리되어 commit_floor 가 올라갔을 수 있습니다.
+                await self._commit(dict(self._consumed))
+            except Exception as e:
+                print(f"❌ [{self.name}] 주기 작업 중 오류 발생: {e}")
+
+    async def _shutdown(self):
+        if self._tick_task is not None:
+            self._tick_task.cancel()
+            self._tick_task = None
+        if self.consumer is not None:
+            await self._stop_partitions(list(self.consumer.assignment()))
+        await self.stop()
+
+    async def persist(self, rows: List[Any]):
+        """
+        ORM 행을 한 트랜잭션으로 저장하고, 걸린 시간을 backpressure 판단에 사용합니다.
+        INFERENCE_BULK_WRITE 가 켜져 있으면 모델별 BulkWriter 로 COPY 한 번에 저장합니다.
+        (배치가 이미 버퍼 역할을 하고 오프셋은 저장 후 커밋하므로, 여기서는 추가로 모으지 않고 바로 씁니다)
+        """
+        started = time.monotonic()
+        try:
+            await self._write(rows)
+        except Exception:
+            source = _quarantine_source.get()
+            if source is None:
+                raise
+            failed = await self._write_isolated(rows)
+            await self.dead_letter([(_row_payload(row), source[1], None, error) for row, error in failed], source[0])
+        (_current_tuning.get() or self.tuning).record_write((time.monotonic() - started) * 1000)
+
+    async def _write(self, rows: List[Any]):
+        if settings.inference_bulk_write:
+            by_model: Dict[type, List[Any]] = {}
+            for row in rows:
+                by_model.setdefault(type(row), []).append(row)
+            for model, model_rows in by_model.items():
+                writer = self._writers.get(model)
+                if writer is None:
+                    writer = self._writers[model] = BulkWriter(model)
+                await writer.write(model_rows)
+        else:
+            async with AsyncSessionLocal() as db:
+                db.add_all(rows)
+                await db.commit()
+
+    async def _write_isolated(self, rows: List[Any]) -> List[Tuple[Any, str]]:
+        """행 묶음을 반으로 나눠 가며 저장하고, 혼자서도 저장되지 않는 행과 그 오류를 반환합니다."""
+        if len(rows) == 1:
+            try:
+                await self._write(rows)
+                return []
+            except Exception as e:
+                return [(rows[0], repr(e))]
+        failed = []
+        mid = len(rows) // 2
+        for half in (rows[:mid], rows[mid:]):
+            try:
+                await self._write(half)
+            except Exception:
+                failed.extend(await self._write_isolated(half))
+        return failed
+
+    async def dead_letter(self, entries: List[Tuple[Any, Optional[int], Optional[int], str]], topic: Optional[str] = None):
+        """(payload, 파티션, 오프셋, 오류) 목록을 Inference_dead_letter 에 한 트랜잭션으로 저장합니다. 실패하면 예외가 전파됩니다."""
+        if not entries:
+            return
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                InferenceDeadLetter(worker=self.name, topic=topic or self.topic, partition=partition, offset=offset,
+                                    payload=_json_safe(payload), error=error)
+                for payload, partition, offset, error in entries
+            ])
+            await db.commit()
+        self.dead_lettered += len(entries)
+        print(f"☣️  [{self.name}] {len(entries)}건을 Inference_dead_letter 로 격리했습니다 (누적 {self.dead_lettered}건): {entries[0][3][:200]}")
+
+    async def quarantine_pending(self, error: str):
+        """
+        격리 모드로도 처리하지 못한 배치를 건너뛸 때 호출됩니다. 이 배치 때문에 보관 중인 레코드(예: 재시도 대기 플로우)를
+        dead_letter() 로 남기고 보관 목록에서 빼야 커밋 상한(commit_floor)이 풀립니다.
+        """
+
+    def _note_failure(self, first_offsets: Dict[TopicPartition, int]) -> int:
+        """배치 실패를 기록하고, 같은 시작 오프셋에서 연속으로 실패한 횟수를 반환합니다."""
+        attempts = 0
+        for tp, offset in first_offsets.items():
+            last_offset, count = self._failures.get(tp, (offset, 0))
+            count = count + 1 if last_offset == offset else 1
+            self._failures[tp] = (offset, count)
+            attempts = max(attempts, count)
+        return attempts
+
+    async def _quarantine(self, batch: List[Any], positions: Optional[List[Tuple[TopicPartition, int]]],
+                          records: List[Any], error: Exception) -> bool:
+        """
+        반복 실패한 배치를 격리 모드로 다시 처리합니다. 커밋해도 되면 True, 격리 테이블에도 쓰지 못해 재시도해야 하면 False.
+        """
+        partitions = {r.partition for r in records}
+        print(f"☣️  [{self.name}] 같은 위치에서 {self.max_batch_retries}번 실패한 배치({len(records)}건)를 격리 모드로 처리합니다: {error}")
+        token = _quarantine_source.set((records[0].topic, partitions.pop() if len(partitions) == 1 else None))
+        try:
+            if batch:
+                await self.handle_batch(batch, positions)
+            return True
+        except Exception as e:
+            # 저장 밖(분류 등)에서 실패했으면 배치 전체를 원본 레코드 그대로 남깁니다.
+            detail = repr(e)
+            try:
+                await self.dead_letter([(r.value, r.partition, r.offset, detail) for r in records], records[0].topic)
+                await self.quarantine_pending(detail)
+                return True
+            except Exception as dead_letter_error:
+                print(f"❌ [{self.name}] 격리 저장 실패, 배치를 다시 시도합니다: {dead_letter_error}")
+                return False
+        finally:
+            _quarantine_source.reset(token)
+
+    async def consumer_lag(self, partitions: Optional[List[TopicPartition]] = None) -> int:
+        """할당된(또는 지정한) 파티션의 (high watermark - 현재 위치) 합계. 마지막 fetch 응답 기준 값입니다."""
+        lag = 0
+        for tp in (self.consumer.assignment() if partitions is None else partitions):
+            highwater = self.consumer.highwater(tp)
+            if highwater is None:
+                continue
+            lag += max(0, highwater - await self.consumer.position(tp))
+        return lag
+
+    @property
+    def paused(self) -> bool:
+        return bool(self._pause_reasons)
+
+    def _pause_partitions(self, partitions: List[TopicPartition], reason: str):
+        for tp in partitions:
+            self._pause_reasons.setdefault(tp, set()).add(reason)
+        if partitions:
+            self.consumer.pause(*partitions)
+
+    def _resume_partitions(self, partitions: List[TopicPartition], reason: str):
+        """reason 으로 멈춘 파티션 중 다른 이유로도 멈춰 있지 않은 파티션만 재개합니다."""
+        resumable = []
+        for tp in partitions:
+            reasons = self._pause_reasons.get(tp)
+            if not reasons or reason not in reasons:
+                continue
+            reasons.discard(reason)
+            if not reasons:
+                del self._pause_reasons[tp]
+                resumable.append(tp)
+        assigned = self.consumer.assignment()
+        resumable = [tp for tp in resumable if tp in assigned]
+        if resumable:
+            self.consumer.resume(*resumable)
+
+    async def _adapt(self, batch_ms: float, state: Optional[_PartitionState] = None):
+        self.lag = await self.consumer_lag()
+        if state is None:
+            tuning, lag = self.tuning, self.lag
+        else:
+            # 파티션 모드에서는 이 파티션의 lag 과 측정값으로 이 파티션의 배치만 조정합니다.
+            tuning, lag = state.tuning, await self.consumer_lag([state.tp])
+        tuning.update(lag, batch_ms)
+        if tuning.controller is None:
+            return
+
+        # DB 쓰기가 계속 느리면 파티션 fetch 를 멈춰, 처리하지 못할 레코드를 메모리에 미리 받아 두지 않도록 합니다.
+        slow_ms = settings.inference_write_slow_ms
+        if tuning.last_write_ms > slow_ms and tuning.write_ms_ewma > slow_ms:
+            # 파티션 모드에서는 이 배치의 파티션만 멈추고, 그 파티션의 태스크만 기다립니다.
+            partitions = [state.tp] if state is not None else list(self.consumer.assignment())
+            await self._pause(min(tuning.write_ms_ewma / 1000, MAX_PAUSE_SECONDS), partitions, tuning)
+
+    async def _pause(self, seconds: float, partitions: List[TopicPartition], tuning: _BatchTuning):
+        self._pause_partitions(partitions, "write")
+        self.pause_count += 1
+        print(f"⏸️  [{self.name}] DB 쓰기 지연({tuning.write_ms_ewma:.0f}ms)으로 {seconds:.1f}초간 파티션 {sorted(tp.partition for tp in partitions)} fetch 중지 (lag={self.lag})")
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self._resume_partitions(partitions, "write")
+
+    def _tunings(self) -> List[_BatchTuning]:
+        return [state.tuning for state in self._partitions.values()] or [self.tuning]
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        현재 배치 크기 / linger / consumer lag / backpressure 상태와 처리량 통계를 반환합니다.
+        파티션 모드에서 batch_size 는 파티션별 값의 합계, 나머지 배치 측정값은 가장 느린 파티션 기준입니다.
+        """
+        tunings = self._tunings()
+        return {
+            "worker": self.name,
+            "topic": self.topic,
+            "batch_size": sum(t.batch_size for t in tunings),
+            "linger_ms": max(t.linger_ms for t in tunings),
+            "consumer_lag": self.lag,
+            "last_batch_ms": round(max(t.last_batch_ms for t in tunings), 2),
+            "write_ms_ewma": round(max(t.write_ms_ewma for t in tunings), 2),
+            "paused": self.paused,
+            "pause_count": self.pause_count,
+            "partitions": len(self._partitions),
+            "partition_batch_size": {state.tp.partition: state.tuning.batch_size for state in self._partitions.values()},
+            "duplicates_dropped": self.dedup.duplicates if self.dedup is not None else 0,
+            "dead_lettered": self.dead_lettered,
+            **self.counter.snapshot(),
+        }
+
+    def report(self):
+        """STATS_INTERVAL_SECONDS 마다 처리량을 출력합니다."""
+        now = time.monotonic()
+        if now - self._last_report < STATS_INTERVAL_SECONDS:
+            return
+        self._last_report = now
+        stats = self.counter.snapshot(reset_window=True)
+        tunings = self._tunings()
+        print(f"📈 [{self.name}] {stats['rows_per_sec']} rows/s, 누적 {stats['total_rows']}건 / {stats['total_batches']}배치, 평균 {stats['avg_batch_ms']}ms"
+              f" (batch_size={sum(t.batch_size for t in tunings)}, linger_ms={max(t.linger_ms for t in tunings)}, lag={self.lag})")
+        if self.dedup is not None and self.dedup.checked:
+            d = self.dedup.stats()
+            print(f"🧹 [{self.name}] 중복 제거: {d['checked']}건 중 {d['duplicates']}건 제외 (세대 {d['current_count']}/{d['capacity']}개, {d['memory_bytes'] // 1024}KB)")
+
+    async def run(self):
+        await self.start(listener=_PartitionRebalanceListener(self, partitioned=False))
+        self._tick_task = asyncio.create_task(self._tick_loop())
+        try:
+            while True:
+                records = await self.next_batch()
+                if not records:
+                    self.report()
+                    continue
+
+                started = time.monotonic()
+                self.tuning.last_write_ms = 0.0
+                values, positions = self._unpack(records)
+                batch, positions, keys = self._drop_duplicates(values, positions)
+                consumed, first_offsets = {}, {}
+                for r in records:
+                    tp = TopicPartition(r.topic, r.partition)
+                    first_offsets.setdefault(tp, r.offset)
+                    consumed[tp] = r.offset + 1
+                try:
+                    try:
+                        if batch:
+                            await self.handle_batch(batch, positions)
+                    except Exception as e:
+                        if self._note_failure(first_offsets) < self.max_batch_retries or not await self._quarantine(batch, positions, records, e):
+                            raise
+                    self._consumed.update(consumed)
+                    await self._commit(dict(self._consumed))
+                    if keys:
+                        self.dedup.add_many(keys)
+                except Exception as e:
+                    # 마지막으로 성공한 위치로 되돌려 같은 배치를 다시 받도록 합니다. (at-least-once)
+                    print(f"❌ [{self.name}] 배치 처리 중 오류 발생 ({len(batch)}건): {e}")
+                    self._rewind(first_offsets)
+                    await asyncio.sleep(1)
+                    continue
+                for tp in first_offsets:
+                    self._failures.pop(tp, None)
+                elapsed = time.monotonic() - started
+                self.counter.add(len(batch), elapsed)
+                await self._adapt(elapsed * 1000)
+                self.report()
+        finally:
+            await self._shutdown()
+
+
+    # --- 파티션 병렬 모드 ---
+
+    def _start_partitions(self, partitions):
+        for tp in partitions:
+            if tp in self._partitions:
+                continue
+            state = _PartitionState(tp, _BatchTuning(self.base_batch_size, self.base_linger_ms))
+            state.task = asyncio.create_task(self._partition_loop(state))
+            self._partitions[tp] = state
+        if partitions:
+            print(f"🧩 [{self.name}] 파티션 할당: {sorted(tp.partition for tp in partitions)}")
+
+    async def _stop_partitions(self, partitions):
+        """
+        진행 중인 배치를 끝내고 커밋할 때까지 기다린 뒤 파티션 태스크를 종료합니다.
+        이어서 on_revoke() 로 보관 중인 레코드를 처리하고 마지막 위치를 커밋합니다. (파티션 모드가 아니어도 호출)
+        """
+        partitions = list(partitions)
+        states = [self._partitions.pop(tp) for tp in partitions if tp in self._partitions]
+        for state in states:
+            state.stopping = True
+            state.ready.set()
+        if states:
+            await asyncio.gather(*(state.task for state in states), return_exceptions=True)
+            print(f"🧩 [{self.name}] 파티션 회수: {sorted(state.tp.partition for state in states)}")
+        if not partitions or self.consumer is None:
+            return
+        try:
+            await self.on_revoke(partitions)
+            await self._commit({tp: self._consumed[tp] for tp in partitions if tp in self._consumed})
+        except Exception as e:
+            # 커밋하지 못한 레코드는 새 소유자가 다시 받습니다.
+            print(f"❌ [{self.name}] 파티션 회수 처리 중 오류 발생: {e}")
+        for tp in partitions:
+            self._consumed.pop(tp, None)
+            self._committed.pop(tp, None)
+            self._pause_reasons.pop(tp, None)
+            self._failures.pop(tp, None)
+
+    async def _partition_loop(self, state: _PartitionState):
+        # 이 태스크에서 호출되는 persist() 의 쓰기 시간은 이 파티션의 측정값으로 기록합니다.
+        _current_tuning.set(state.tuning)
+        while not state.stopping:
+            records = await state.take(state.tuning.batch_size, state.tuning.linger_ms)
+            self._resume_if_drained(state)
+            if not records:
+                self.report()
+                continue
+
+            values, positions = self._unpack(records)
+            batch, positions, keys = self._drop_duplicates(values, positions)
+            started = time.monotonic()
+            state.tuning.last_write_ms = 0.0
+            try:
+                try:
+                    if batch:
+                        await self.handle_batch(batch, positions)
+                except Exception as e:
+                    if (state.stopping or self._note_failure({state.tp: records[0].offset}) < self.max_batch_retries
+                            or not await self._quarantine(batch, positions, records, e)):
+                        raise
+                # 이 파티션의 DB 저장이 끝난 뒤에만 이 파티션의 오프셋을 커밋합니다.
+                self._consumed[state.tp] = records[-1].offset + 1
+                await self._commit({state.tp: self._consumed[state.tp]})
+                if keys:
+                    self.dedup.add_many(keys)
+            except Exception as e:
+                print(f"❌ [{self.name}] 파티션 {state.tp.partition} 배치 처리 중 오류 발생 ({len(records)}건): {e}")
+                if state.stopping:
+                    break
+                # 이 파티션만 마지막으로 성공한 위치로 되돌립니다. (대기 중인 레코드는 버리고 다시 받음)
+                state.buffer.clear()
+                self._rewind({state.tp: records[0].offset})
+                await asyncio.sleep(1)
+                continue
+
+            self._failures.pop(state.tp, None)
+            elapsed = time.monotonic() - started
+            self.counter.add(len(batch), elapsed)
+            await self._adapt(elapsed * 1000, state)
+            self.report()
+
+    def _resume_if_drained(self, state: _PartitionState):
+        if len(state.buffer) <= state.tuning.batch_size:
+            self._resume_partitions([state.tp], "buffer")
+
+    async def run_partitioned(self):
+        """단일 fetch 루프가 레코드를 파티션별 버퍼로 나눠 담고, 파티션 태스크들이 병렬로 처리합니다."""
+        await self.start(listener=_PartitionRebalanceListener(self))
+        self._tick_task = asyncio.create_task(self._tick_loop())
+        try:
+            while True:
+                fetched = await self.consumer.getmany(timeout_ms=1000, max_records=self.base_batch_size * PARTITION_BUFFER_BATCHES)
+                for tp, records in fetched.items():
+                    state = self._partitions.get(tp)
+                    if state is None or state.stopping:
+                        continue  # 회수 중인 파티션의 레코드는 새 소유자가 다시 받습니다.
+                    state.push(records)
+                    # 처리보다 fetch 가 빠른 파티션만 멈춥니다. (다른 파티션은 계속 진행)
+                    if len(state.buffer) > state.tuning.batch_size * PARTITION_BUFFER_BATCHES:
+                        self._pause_partitions([tp], "buffer")
+        finally:
+            await self._shutdown()
+
+
+def _prometheus_text(consumers: List[MicroBatchConsumer]) -> str:
+    lines = []
+    gauges = {
+        "inference_batch_size": "batch_size",
+        "inference_linger_ms": "linger_ms",
+        "inference_consumer_lag": "consumer_lag",
+        "inference_last_batch_ms": "last_batch_ms",
+        "inference_write_ms_ewma": "write_ms_ewma",
+        "inference_paused": "paused",
+        "inference_pause_total": "pause_count",
+        "inference_rows_total": "total_rows",
+        "inference_duplicates_dropped_total": "duplicates_dropped",
+        "inference_dead_lettered_total": "dead_lettered",
+    }
+    snapshots = [c.metrics() for c in consumers]
+    for metric, key in gauges.items():
+        lines.append(f"# TYPE {metric} gauge")
+        for m in snapshots:
+            lines.append(f'{metric}{{worker="{m["worker"]}",topic="{m["topic"]}"}} {float(m[key])}')
+    return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(consumers: List[MicroBatchConsumer], port: Optional[int] = None, registry=None, pool=None):
+    """
+    INFERENCE_METRICS_PORT 로 /metrics (Prometheus 텍스트) 와 /metrics.json 을 제공합니다. 포트가 0 이면 실행하지 않습니다.
+    /metrics.json 의 각 항목에는 registry 에 로드된 모델 버전("models")과,
+    프로세스 풀을 쓰면 자식 프로세스별 모델 버전("pool_models")도 함께 넣습니다.
+    반환된 runner 는 종료 시 cleanup() 해야 합니다.
+    """
+    port = settings.inference_metrics_port if port is None else port
+    if not port:
+        return None
+    from aiohttp import web
+
+    async def metrics_text(request):
+        return web.Response(text=_prometheus_text(consumers), content_type="text/plain")
+
+    async def metrics_json(request):
+        models = {}
+        if registry is not None:
+            models["models"] = registry.info()
+        if pool is not None:
+            models["pool_models"] = pool.model_info()
+        return web.json_response([{**c.metrics(), **models} for c in consumers])
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_text)
+    app.router.add_get("/metrics.json", metrics_json)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    print(f"📡 메트릭 서버 시작: http://0.0.0.0:{port}/metrics")
+    return runner
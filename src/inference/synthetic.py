@@ -0,0 +1,161 @@
+# src/inference/synthetic.py
+
+"""
+벤치마크/부하 테스트용 합성 플로우 · 로그 이벤트 생성기입니다.
+CSE-CIC-IDS2018(CICFlowMeter) 플로우의 대략적인 모양(포트 분포, 패킷 수, 지속 시간, 0 지속 시간으로 인한 inf 값)을 흉내 냅니다.
+모델 정확도 평가용이 아니라 처리량 측정용입니다.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .traffic_model import TRAFFIC_FEATURES
+
+# 프로파일 이름 → (비율, 목적지 포트 후보, 프로토콜, 평균 지속 시간(µs), 평균 정방향/역방향 패킷 수, 평균 패킷 길이)
+_PROFILES = {
+    "benign":      (0.70, [443, 80, 53, 3389, 445, 8080], 6, 2.0e6, (8, 7), (120, 600)),
+    "ddos":        (0.15, [80], 6, 5.0e3, (2, 1), (0, 0)),
+    "brute_force": (0.08, [21, 22], 6, 4.0e6, (20, 22), (40, 60)),
+    "bot":         (0.05, [8080], 6, 1.0e4, (3, 2), (80, 60)),
+    "sql_injection": (0.02, [80], 6, 5.0e6, (6, 5), (400, 900)),
+}
+
+
+def synthetic_flow_matrix(n: int, seed: int = 0) -> np.ndarray:
+    """TRAFFIC_FEATURES 순서의 (n, 21) float64 원본 피처 행렬을 생성합니다."""
+    rng = np.random.default_rng(seed)
+    names = list(_PROFILES)
+    weights = np.array([_PROFILES[name][0] for name in names])
+    profile = rng.choice(len(names), size=n, p=weights / weights.sum())
+
+    X = np.zeros((n, len(TRAFFIC_FEATURES)), dtype=np.float64)
+    col = {name: j for j, name in enumerate(TRAFFIC_FEATURES)}
+
+    for p, name in enumerate(names):
+        rows = np.flatnonzero(profile == p)
+        if len(rows) == 0:
+            continue
+        _, ports, protocol, duration, (fwd, bwd), (fwd_len, bwd_len) = _PROFILES[name]
+        k = len(rows)
+
+        dst_port = rng.choice(ports, size=k)
+        proto = np.where(dst_port == 53, 17, protocol)
+        dur = np.round(rng.lognormal(np.log(duration), 1.0, size=k))
+        dur[rng.random(k) < 0.02] = 0  # CICFlowMeter 의 0 지속 시간 플로우 → 초당 값이 inf
+        n_fwd = rng.poisson(fwd, size=k) + 1
+        n_bwd = rng.poisson(bwd, size=k)
+        len_fwd = n_fwd * rng.gamma(2.0, fwd_len / 2.0 + 1e-9, size=k) if fwd_len else np.zeros(k)
+        len_bwd = n_bwd * rng.gamma(2.0, bwd_len / 2.0 + 1e-9, size=k) if bwd_len else np.zeros(k)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            seconds = dur / 1e6
+            X[rows, col["Flow_Byts_per_s"]] = (len_fwd + len_bwd) / seconds
+            X[rows, col["Flow_Pkts_per_s"]] = (n_fwd + n_bwd) / seconds
+            fwd_mean = np.where(n_fwd > 0, len_fwd / n_fwd, 0.0)
+            bwd_mean = np.where(n_bwd > 0, len_bwd / np.maximum(n_bwd, 1), 0.0)
+
+        X[rows, col["Dst_Port"]] = dst_port
+        X[rows, col["Protocol"]] = proto
+        X[rows, col["Flow_Duration"]] = dur
+        X[rows, col["Tot_Fwd_Pkts"]] = n_fwd
+        X[rows, col["Tot_Bwd_Pkts"]] = n_bwd
+        X[rows, col["TotLen_Fwd_Pkts"]] = np.round(len_fwd)
+        X[rows, col["TotLen_Bwd_Pkts"]] = np.round(len_bwd)
+        X[rows, col["Bwd_IAT_Tot"]] = np.where(n_bwd > 1, dur * rng.random(k), 0.0)
+        X[rows, col["FIN_Flag_Cnt"]] = rng.random(k) < 0.3
+        X[rows, col["RST_Flag_Cnt"]] = rng.random(k) < 0.05
+        X[rows, col["PSH_Flag_Cnt"]] = rng.random(k) < 0.4
+        X[rows, col["ACK_Flag_Cnt"]] = rng.random(k) < 0.5
+        X[rows, col["URG_Flag_Cnt"]] = rng.random(k) < 0.02
+        X[rows, col["Down_per_Up_Ratio"]] = np.floor(n_bwd / n_fwd)
+        X[rows, col["Pkt_Size_Avg"]] = (len_fwd + len_bwd) / (n_fwd + n_bwd)
+        X[rows, col["Fwd_Seg_Size_Avg"]] = fwd_mean
+        X[rows, col["Fwd_Pkt_Len_Mean"]] = fwd_mean
+        X[rows, col["Bwd_Seg_Size_Avg"]] = bwd_mean
+        X[rows, col["Bwd_Pkt_Len_Mean"]] = bwd_mean
+
+    return X
+
+
+def synthetic_flows(n: int, seed: int = 0, user_id: str = "1") -> List[Dict[str, Any]]:
+    """packetbeat 토픽으로 들어오는 것과 같은 형태의 플로우(dict) 목록을 생성합니다."""
+    X = synthetic_flow_matrix(n, seed)
+    rng = np.random.default_rng(seed + 1)
+    hosts = rng.integers(1, 255, size=(n, 2))
+    start = datetime.now(timezone.utc)
+
+    flows = []
+    for i in range(n):
+        flow = {name: X[i, j].item() for j, name in enumerate(TRAFFIC_FEATURES)}
+        flow["@timestamp"] = (start + timedelta(milliseconds=i)).isoformat()
+        flow["Src_IP"] = f"10.0.{hosts[i, 0]}.{hosts[i, 1]}"
+        flow["user_id"] = user_id
+        flows.append(flow)
+    return flows
+
+
+# columns.json 중 event_data 에 숫자로 들어오는 컬럼 (나머지는 문자열로 생성 → 길이로 피처화됨)
+_LOG_NUMERIC_COLUMNS = {
+    "port", "EventType", "ProcessId", "ExecutionProcessID", "SourceThreadId", "SourceProcessId", "ThreadID",
+}
+_LOG_EVENT_IDS = [1, 3, 7, 10, 13, 4624, 4688, 4104, 5145, 5861]
+_LOG_CHANNELS = ["Microsoft-Windows-Sysmon/Operational", "Security", "Microsoft-Windows-PowerShell/Operational"]
+_LOG_IMAGES = ["C:\\Windows\\System32\\svchost.exe", "C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe",
+               "C:\\Program Files\\Microsoft Office\\root\\Office16\\EXCEL.EXE", "C:\\Windows\\System32\\wbem\\WmiPrvSE.exe"]
+
+
+def _guid(rng: np.random.Generator) -> str:
+    h = rng.bytes(16).hex().upper()
+    return f"{{{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}}}"
+
+
+def synthetic_log_events(columns: List[str], n: int, seed: int = 0, user_id: str = "1") -> List[Dict[str, Any]]:
+    """
+    winlogbeat 토픽으로 들어오는 것과 같은 형태(winlog.event_data)의 이벤트 목록을 생성합니다.
+    columns(columns.json) 중 일부만 채워서 실제 이벤트처럼 컬럼별로 누락이 섞이도록 합니다.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime.now(timezone.utc)
+    meta_paths = {
+        "EventID": ("event_id", lambda: int(rng.choice(_LOG_EVENT_IDS))),
+        "Channel": ("channel", lambda: str(rng.choice(_LOG_CHANNELS))),
+        "RecordNumber": ("record_id", lambda: int(rng.integers(1, 10_000_000))),
+        "Opcode": ("opcode", lambda: "Info"),
+        "SourceName": ("provider_name", lambda: "Microsoft-Windows-Sysmon"),
+    }
+
+    events = []
+    for i in range(n):
+        event_data: Dict[str, Any] = {}
+        winlog: Dict[str, Any] = {"event_data": event_data}
+        for column in columns:
+            if rng.random() < 0.4:
+                continue
+            if column in meta_paths:
+                key, make = meta_paths[column]
+                winlog[key] = make()
+            elif column in ("Hostname", "Level", "System.Version"):
+                continue
+            elif column in _LOG_NUMERIC_COLUMNS:
+                event_data[column] = int(rng.integers(0, 65536))
+            elif column.endswith(("Guid", "GUID")):
+                event_data[column] = _guid(rng)
+            elif column.endswith("Sid"):
+                event_data[column] = f"S-1-5-21-{rng.integers(10**9, 4 * 10**9)}-{rng.integers(1000, 9999)}"
+            elif column in ("SourceImage", "ProcessName", "Application"):
+                event_data[column] = str(rng.choice(_LOG_IMAGES))
+            elif column == "SourceAddress":
+                event_data[column] = f"10.0.{rng.integers(0, 255)}.{rng.integers(1, 255)}"
+            else:
+                event_data[column] = "x" * int(rng.integers(4, 64))
+
+        events.append({
+            "@timestamp": (start + timedelta(milliseconds=i)).isoformat(),
+            "winlog": winlog,
+            "host": {"hostname": f"WORKSTATION{int(rng.integers(1, 50)):02d}"},
+            "log": {"level": "information"},
+            "user_id": user_id,
+        })
+    return events
@@ -0,0 +1,165 @@
+# src/inference/traffic_model.py
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .cache import PredictionCache
+from .cascade import cascade_predict_proba
+from .preprocess import FusedTrafficPreprocessor
+from .tree_ensemble import load_artifact, load_model
+
+# 학습 노트북(traffic_model_pipline.ipynb)의 SELECTED_FEATURES_RENAMED 와 동일한 순서여야 합니다.
+TRAFFIC_FEATURES = [
+    'Dst_Port', 'Protocol', 'Flow_Duration', 'Tot_Fwd_Pkts', 'Tot_Bwd_Pkts',
+    'TotLen_Fwd_Pkts', 'TotLen_Bwd_Pkts',
+    'Flow_Byts_per_s', 'Flow_Pkts_per_s', 'Bwd_IAT_Tot', 'FIN_Flag_Cnt', 'RST_Flag_Cnt',
+    'PSH_Flag_Cnt', 'ACK_Flag_Cnt', 'URG_Flag_Cnt', 'Down_per_Up_Ratio',
+    'Pkt_Size_Avg', 'Fwd_Seg_Size_Avg', 'Fwd_Pkt_Len_Mean', 'Bwd_Seg_Size_Avg', 'Bwd_Pkt_Len_Mean'
+]
+
+# CICFlowMeter 원본 컬럼명('Dst Port', 'Flow Byts/s')으로 들어오는 경우를 위한 매핑
+_ORIGINAL_NAMES = {name: name.replace('_per_', '/').replace('_', ' ') for name in TRAFFIC_FEATURES}
+
+BENIGN_LABEL = "Benign"
+
+
+def _to_float(value: Any) -> float:
+    """숫자로 변환할 수 없는 값은 노트북의 pd.to_numeric(errors='coerce')처럼 NaN으로 처리합니다."""
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def featurize_flows(flows: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """플로우(dict) 목록을 (n, 21) 크기의 원본 피처 행렬로 변환합니다."""
+    X = np.empty((len(flows), len(TRAFFIC_FEATURES)), dtype=np.float64)
+    for i, flow in enumerate(flows):
+        for j, name in enumerate(TRAFFIC_FEATURES):
+            value = flow.get(name)
+            if value is None:
+                value = flow.get(_ORIGINAL_NAMES[name])
+            X[i, j] = _to_float(value)
+    return X
+
+
+class TrafficClassifier:
+    """
+    트래픽 모델 아티팩트(imputer / RobustScaler / XGBoost / LabelEncoder)를 한 번만 로드하고,
+    플로우 묶음(batch)을 한 번의 벡터 연산과 한 번의 predict_proba 호출로 분류합니다.
+    prefilter 가 주어지면 cascade_predict_proba 로 애매한 플로우만 전체 모델에 넘깁니다.
+    """
+
+    def __init__(self, imputer, scaler, model, label_encoder, cache: Optional[PredictionCache] = None,
+                 prefilter=None, cascade_band: Tuple[float, float] = (0.0, 1.0)):
+        self.model = model
+        self.label_encoder = label_encoder
+        self.classes = np.asarray(label_encoder.classes_)
+        self.benign_index = int(np.flatnonzero(self.classes == BENIGN_LABEL)[0])
+
+        # sklearn 객체를 매번 호출하는 대신 통계값을 합친 in-place 변환기로 처리합니다.
+        self.preprocessor = FusedTrafficPreprocessor(imputer, scaler)
+        # 전처리 버퍼를 재사용하므로 여러 스레드가 같은 분류기를 쓸 때는 배치 단위로 직렬화합니다.
+        self._lock = threading.Lock()
+        # 반복되는 피처 행(스캔/DDoS 등)은 모델을 호출하지 않고 캐시된 확률을 사용합니다.
+        self.cache = cache
+
+        self.prefilter = prefilter
+        self.cascade_band = cascade_band
+        self.cascade_rows = 0
+        self.cascade_escalated = 0
+
+    @staticmethod
+    def artifact_paths() -> Dict[str, str]:
+        """
+        Settings에 지정된 아티팩트 경로. 변환된 앙상블(TRAFFIC_COMPILED_MODEL_PATH)이 지정되면
+        COMPILED_MODEL_MAX_ROWS 행 이하 배치에 사용하고(0이면 원본 모델 대신 사용),
+        TRAFFIC_PREFILTER_MODEL_PATH 가 지정되면 캐스케이드 1단계 모델을 함께 로드합니다.
+        """
+        paths = {
+            "imputer": settings.traffic_imputer_path,
+            "scaler": settings.traffic_scaler_path,
+            "model": settings.traffic_model_path,
+            "label_encoder": settings.traffic_encoder_path,
+        }
+        if settings.traffic_compiled_model_path:
+            paths["compiled_model"] = settings.traffic_compiled_model_path
+            if settings.compiled_model_max_rows <= 0:
+                del paths["model"]
+        if settings.traffic_prefilter_model_path:
+            paths["prefilter"] = settings.traffic_prefilter_model_path
+        return paths
+
+    @classmethod
+    def from_settings(cls, mmap_mode: Optional[str] = None) -> "TrafficClassifier":
+        """Settings에 지정된 경로에서 아티팩트를 로드합니다."""
+        paths = cls.artifact_paths()
+        model = load_model(paths.pop("model", None), paths.pop("compiled_model", None),
+                           settings.compiled_model_max_rows, mmap_mode)
+        artifacts = {name: load_artifact(path, mmap_mode) for name, path in paths.items()}
+        return cls(
+            model=model,
+            **artifacts,
+            cache=PredictionCache.from_settings(),
+            cascade_band=(settings.traffic_cascade_low, settings.traffic_cascade_high),
+        )
+
+    def featurize(self, flows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        return featurize_flows(flows)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """inf/NaN → 중앙값 대체 → RobustScaler 를 재사용 버퍼 위에서 한 번에 수행합니다. (입력 X는 변경하지 않음)"""
+        return self.preprocessor.transform(X)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """원본 피처 행렬을 받아 클래스별 확률을 반환합니다. (배치당 predict_proba 1회)"""
+        if len(X) == 0:
+            return np.empty((0, len(self.classes)))
+        if self.cache is not None:
+            return self.cache.predict_proba(X, self._predict_proba)
+        return self._predict_proba(X)
+
+    def _predict_proba(self, X: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if self.prefilter is None:
+                return self.model.predict_proba(self.transform(X))
+            proba, escalated = cascade_predict_proba(
+                self.transform(X), self.prefilter, self.model, self.benign_index, self.cascade_band
+            )
+            self.cascade_rows += len(X)
+            self.cascade_escalated += int(escalated.sum())
+            return proba
+
+    def cascade_stats(self) -> Dict[str, Any]:
+        """캐스케이드 모드에서 2단계(전체 모델)로 넘어간 행의 비율을 반환합니다."""
+        return {
+            "rows": self.cascade_rows,
+            "escalated": self.cascade_escalated,
+            "escalation_rate": round(self.cascade_escalated / self.cascade_rows, 4) if self.cascade_rows else 0.0,
+        }
+
+    def classify(self, flows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        플로우 목록을 분류하여 (label, confidence, is_attack, features) 결과를 입력 순서대로 반환합니다.
+        features는 DB 저장을 위해 스케일링 전 원본 값을 담습니다.
+        """
+        X = self.featurize(flows)
+        proba = self.predict_proba(X)
+        best = proba.argmax(axis=1)
+        labels = self.classes[best]
+        confidences = proba[np.arange(len(best)), best]
+
+        return [
+            {
+                "label": str(labels[i]),
+                "confidence": float(confidences[i]),
+                "is_attack": int(best[i]) != self.benign_index,
+                "features": X[i],
+            }
+            for i in range(len(best))
+        ]
@@ -0,0 +1,211 @@
+# src/inference/traffic_worker.py
+
+import os
+import sys
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# --- 프로젝트 경로 설정 및 모듈 import ---
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from src.core.config import settings
+from src.models.models import AttackTraffic
+from src.inference.flows import FlowAggregator
+from src.inference.pool import InferencePool
+from src.inference.registry import ModelRegistry, model_registry
+from src.inference.stream import MicroBatchConsumer, STATS_INTERVAL_SECONDS, serve_metrics
+from src.inference.traffic_model import TRAFFIC_FEATURES
+
+_FEATURE_INDEX = {name: i for i, name in enumerate(TRAFFIC_FEATURES)}
+
+# Attack_traffic 테이블 컬럼(ORM 속성) ← 모델 피처 이름
+_TRAFFIC_COLUMNS = {
+    "dst_port": "Dst_Port",
+    "protocol": "Protocol",
+    "flow_duration": "Flow_Duration",
+    "tot_fwd_pkts": "Tot_Fwd_Pkts",
+    "tot_bwd_pkts": "Tot_Bwd_Pkts",
+    "flow_byts_per_s": "Flow_Byts_per_s",
+    "flow_pkts_per_s": "Flow_Pkts_per_s",
+    "bwd_iat_tot": "Bwd_IAT_Tot",
+    "fin_flag_cnt": "FIN_Flag_Cnt",
+    "rst_flag_cnt": "RST_Flag_Cnt",
+    "psh_flag_cnt": "PSH_Flag_Cnt",
+    "ack_flag_cnt": "ACK_Flag_Cnt",
+    "urg_flag_cnt": "URG_Flag_Cnt",
+    "down_per_up_ratio": "Down_per_Up_Ratio",
+}
+_NUMERIC_COLUMNS = {"flow_byts_per_s", "flow_pkts_per_s"}
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc)
+
+
+def build_attack_traffic(flow: Dict[str, Any], features: np.ndarray) -> AttackTraffic:
+    """분류 결과가 공격인 플로우를 Attack_traffic 행으로 변환합니다."""
+    values = np.where(np.isfinite(features), features, 0.0)
+    columns = {}
+    for attr, feature in _TRAFFIC_COLUMNS.items():
+        value = values[_FEATURE_INDEX[feature]]
+        columns[attr] = float(value) if attr in _NUMERIC_COLUMNS else int(round(value))
+
+    return AttackTraffic(
+        timestamp=_parse_timestamp(flow.get("@timestamp")),
+        user_id=flow.get("user_id"),
+        src_ip=flow.get("Src_IP") or flow.get("Src IP") or (flow.get("source") or {}).get("ip"),
+        **columns,
+    )
+
+
+class TrafficInferenceWorker(MicroBatchConsumer):
+    """packetbeat 토픽의 플로우를 마이크로 배치로 분류하고, 공격 플로우를 Attack_traffic 에 저장합니다."""
+
+    name = "traffic"
+
+    def __init__(self, registry: ModelRegistry = model_registry, pool: Optional[InferencePool] = None, **kwargs):
+        super().__init__(settings.kafka_topic_packetbeat, **kwargs)
+        self.registry = registry
+        self.pool = pool
+        # packetbeat 원시 이벤트는 5-tuple 플로우로 모은 뒤 완료된 플로우만 분류합니다. (이미 피처가 있는 플로우는 그대로 통과)
+        # 완료된 플로우를 저장하기 전까지 그 플로우의 패킷 오프셋은 커밋하지 않습니다. (commit_floor)
+        self.aggregator = FlowAggregator.from_settings()
+        # 주기 만료(tick)와 파티션 회수(on_revoke)가 같은 플로우를 동시에 내보내지 않도록 합니다.
+        self._emit_lock = asyncio.Lock()
+        self.total_attacks = 0
+
+    def dedup_key(self, record: Dict[str, Any], position=None) -> Optional[bytes]:
+        # 내용이 같은 패킷 / 플로우도 서로 다른 이벤트일 수 있으므로 내용으로는 비교하지 않습니다.
+        # 생산자가 부여한 event.id 가 있을 때만 키로 쓰고, 같은 Kafka 레코드의 재전달은 위치로 걸러집니다. (_drop_duplicates)
+        event = record.get("event")
+        event_id = event.get("id") if isinstance(event, dict) else None
+        return None if event_id is None else f"{event_id}".encode("utf-8")
+
+    def commit_floor(self, tp) -> Optional[int]:
+        return self.aggregator.commit_floor(tp)
+
+    async def handle_batch(self, batch: List[Dict[str, Any]], positions=None):
+        await self._classify_and_store(self.aggregator.process(batch, positions))
+
+    async def tick(self):
+        # 새 패킷이 오지 않아 이벤트 시각이 멈춰도, 실제 시간으로 유휴 시간이 지난 플로우를 내보냅니다.
+        async with self._emit_lock:
+            await self._classify_and_store(self.aggregator.process([]))
+
+    async def on_revoke(self, partitions):
+        # 회수되는 파티션의 진행 중인 플로우를 지금까지의 패킷으로 마감해 저장한 뒤 커밋되도록 합니다.
+        async with self._emit_lock:
+            rows = self.aggregator.flush(partitions)
+            try:
+                if rows:
+                    await self._store(rows)
+            finally:
+                # 저장에 실패하면 커밋하지 않으므로 새 소유자가 패킷을 다시 받아 집계합니다. 이 프로세스에서는 재시도하지 않습니다.
+                self.aggregator.release(rows)
+
+    async def quarantine_pending(self, error: str):
+        # 격리한 배치에서 나온 재시도 대기 플로우도 함께 격리해야 그 패킷들의 오프셋을 커밋할 수 있습니다.
+        rows = self.aggregator.take_retry()
+        try:
+            await self.dead_letter([(row, None, None, error) for row in rows])
+        except Exception:
+            self.aggregator.requeue(rows)
+            raise
+        self.aggregator.release(rows)
+
+    async def _classify_and_store(self, batch: List[Dict[str, Any]]):
+        """플로우 행을 분류해 공격만 저장합니다. 실패하면 집계된 플로우는 다음 배치에서 다시 처리합니다."""
+        if not batch:
+            return
+        try:
+            await self._store(batch)
+        except Exception:
+            self.aggregator.requeue(batch)
+            raise
+        self.aggregator.release(batch)
+
+    async def _store(self, batch: List[Dict[str, Any]]):
+        # 모델 추론은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+        if self.pool is not None:
+            # 프로세스 풀 모드: 피처 행렬을 공유 메모리로 넘겨 다른 코어에서 추론합니다.
+            results = await self.pool.classify("traffic", batch)
+        else:
+            # 배치마다 레지스트리에서 현재 버전을 가져오므로, 모델이 교체되면 다음 배치부터 새 버전이 적용됩니다.
+            classifier = self.registry.get("traffic")
+            results = await asyncio.to_thread(classifier.classify, batch)
+
+        rows = []
+        for flow, result in zip(batch, results):
+            if not result["is_attack"]:
+                continue
+            if not flow.get("user_id"):
+                print(f"   - ⚠️ user_id 없는 공격 플로우는 저장하지 않습니다: label={result['label']}")
+                continue
+            rows.append(build_attack_traffic(flow, result["features"]))
+
+        if not rows:
+            return
+
+        await self.persist(rows)
+        self.total_attacks += len(rows)
+        print(f"🚨 [traffic] {len(batch)}건 중 {len(rows)}건의 공격 플로우 저장 (누적 {self.total_attacks}건)")
+
+
+    def report(self):
+        # 처리량 출력 주기에 맞춰 캐스케이드 전달 비율과 예측 캐시 적중률도 함께 출력합니다. (프로세스 풀 모드에서는 캐시가 자식 프로세스에 있음)
+        if self.aggregator.events and time.monotonic() - self._last_report >= STATS_INTERVAL_SECONDS:
+            stats = self.aggregator.stats()
+            print(f"🔗 [traffic] 플로우 집계: 이벤트 {stats['events']}건 → 완료 플로우 {stats['emitted']}건, 활성 {stats['active_flows']}/{stats['max_flows']}개 (용량 초과 제거 {stats['evicted']}건, 커밋 대기 {stats['held']}개, 재전달 무시 {stats['refed']}건)")
+        if self.pool is None and time.monotonic() - self._last_report >= STATS_INTERVAL_SECONDS:
+            classifier = self.registry.get("traffic")
+            cache = classifier.cache
+            if classifier.prefilter is not None:
+                stats = classifier.cascade_stats()
+                print(f"🪜 [traffic] 캐스케이드: {stats['rows']}건 중 {stats['escalated']}건 전체 모델로 전달 ({stats['escalation_rate']:.1%})")
+            if cache is not None:
+                stats = cache.stats()
+                print(f"🗃️  [traffic] 예측 캐시 적중률 {stats['hit_rate']:.1%} ({stats['entries']}/{stats['max_entries']}개, 약 {stats['approx_bytes'] // 1024}KB, 제거 {stats['evictions']}건, 만료 {stats['expirations']}건)")
+        super().report()
+
+
+async def main():
+    pool = None
+    watcher = None
+    if settings.inference_pool_size > 0:
+        # 자식 프로세스가 각자 모델을 로드하고 핫 리로드도 직접 확인합니다.
+        pool = InferencePool.from_settings(names=["traffic"])
+        await asyncio.to_thread(pool.start)
+    else:
+        # 시작 시 모델을 미리 로드하고, 아티팩트가 교체되면 재시작 없이 다시 로드합니다.
+        await asyncio.to_thread(model_registry.get, "traffic")
+        watcher = asyncio.create_task(model_registry.watch())
+
+    worker = TrafficInferenceWorker(model_registry, pool=pool)
+    metrics_runner = await serve_metrics([worker], registry=model_registry, pool=pool)
+    try:
+        if settings.inference_partition_parallel:
+            await worker.run_partitioned()
+        else:
+            await worker.run()
+    finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        if watcher is not None:
+            watcher.cancel()
+        if pool is not None:
+            pool.shutdown()
+
+
+# --- 스크립트 실행 ---
+if __name__ == "__main__":
+    asyncio.run(main())
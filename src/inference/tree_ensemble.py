@@ -0,0 +1,422 @@
+# src/inference/tree_ensemble.py
+
+"""
+학습된 그래디언트 부스팅 모델(XGBoost / LightGBM)을 연속된 NumPy 노드 배열로 변환하고,
+학습 프레임워크 없이 NumPy만으로 배치 단위 추론을 수행합니다.
+
+    # 아티팩트 변환 (xgboost/lightgbm 이 설치된 환경에서 1회 실행)
+    # 출력 확장자가 .joblib 이면 joblib 으로 저장하여 mmap_mode 로 여러 워커가 같은 페이지를 공유할 수 있습니다.
+    python -m src.inference.tree_ensemble export ml_training/model/traffic/traffic_model.joblib ml_training/model/traffic/traffic_model.npz
+
+    # 원본 모델과의 결과 일치 여부 및 배치 크기별 지연 시간 확인
+    python -m src.inference.tree_ensemble parity ml_training/model/traffic/traffic_model.joblib ml_training/model/traffic/traffic_model.npz
+
+NumPy 평가기는 작은 배치에서만 원본 XGBoost 보다 빠릅니다. 저장소의 두 모델(500 / 1000 트리, 깊이 6) 기준 1회 predict_proba(ms):
+
+    행 수        1     8     32    64    256
+    traffic  원본 0.32  0.44  0.65  1.24  3.0   / 변환 0.09  0.24  0.82  1.66  6.7
+    log      원본 0.32  0.45  0.80  1.33  4.3   / 변환 0.10  0.42  1.50  3.18  14.1
+
+그래서 load_model() 은 원본 모델을 로드할 수 있으면 compiled_max_rows 행 이하 배치만 평가기로,
+더 큰 배치는 원본 모델로 보내는 RoutedModel 을 반환합니다.
+"""
+
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SUPPORTED_OBJECTIVES = ("multi:softprob", "multi:softmax", "binary:logistic", "multiclass", "binary")
+
+
+class TreeEnsemble:
+    """
+    모든 트리의 노드를 하나의 평평한 배열로 이어 붙인 트리 앙상블입니다.
+
+    - feature / threshold / left / default_left / value : 노드 단위 배열 (전체 트리 공용 인덱스)
+    - roots : 각 트리의 루트 노드 인덱스
+    - tree_class : 각 트리가 기여하는 클래스 번호
+    노드는 트리마다 너비 우선 순서로 재배치하여 항상 right == left + 1 이 되도록 저장합니다.
+    리프 노드는 left == 자기 자신, threshold == NaN, default_left == True 로 저장하므로 (x >= NaN 은 항상 거짓,
+    +inf 입력 포함) 항상 제자리에 머물고,
+    최대 깊이만큼 고정 횟수로 이동하면 모든 행이 리프에 도달합니다.
+    """
+
+    def __init__(self, feature, threshold, left, default_left, value, roots, tree_class,
+                 base_score: float, n_classes: int, objective: str, max_depth: int, n_features: int):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.tree_class = np.ascontiguousarray(tree_class, dtype=np.int32)
+        self.base_score = float(base_score)
+        self.n_classes = int(n_classes)
+        self.objective = objective
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+
+        # 입력은 임계값과 같은 정밀도로 비교해야 원본 라이브러리와 결과가 일치합니다. (XGBoost: float32)
+        self.dtype = self.threshold.dtype
+        # (트리 수, 클래스 수) 지시 행렬: 리프 값 (n, T) @ (T, C) → 클래스별 마진 (n, C)
+        self._class_matrix = np.zeros((len(self.roots), max(self.n_classes, 1)), dtype=np.float64)
+        self._class_matrix[np.arange(len(self.roots)), self.tree_class] = 1.0
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def leaf_indices(self, X: np.ndarray) -> np.ndarray:
+        """(n, n_features) 입력에 대해 각 행이 각 트리에서 도달한 리프 노드 인덱스 (n, T)를 반환합니다."""
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        n = X.shape[0]
+        flat_X = X.ravel()
+        row_offset = (np.arange(n, dtype=np.int64) * X.shape[1])[:, None]
+        node = np.tile(self.roots, (n, 1))
+        # 결측값이 없는 입력(예: imputer 를 거친 트래픽 피처)은 깊이마다 NaN 검사를 생략합니다.
+        has_missing = bool(np.isnan(flat_X).any())
+
+        for _ in range(self.max_depth):
+            x = flat_X.take(row_offset + self.feature.take(node))
+            go_right = x >= self.threshold.take(node)
+            if has_missing:
+                missing = np.isnan(x)
+                go_right[missing] = ~self.default_left.take(node[missing])
+            # 오른쪽 자식은 항상 왼쪽 자식 바로 다음 인덱스입니다.
+            node = self.left.take(node)
+            node += go_right
+        return node
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """클래스별 원시 점수(margin)를 반환합니다. 이진 분류는 (n, 1) 입니다."""
+        leaves = self.value[self.leaf_indices(X)]
+        return leaves @ self._class_matrix + self.base_score
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """원본 모델의 predict_proba 와 같은 형태의 확률을 반환합니다."""
+        margin = self.predict_margin(X)
+        if self.n_classes <= 1:
+            p = 1.0 / (1.0 + np.exp(-margin[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        margin -= margin.max(axis=1, keepdims=True)
+        np.exp(margin, out=margin)
+        margin /= margin.sum(axis=1, keepdims=True)
+        return margin
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.predict_proba(X).argmax(axis=1)
+
+    # --- 저장 / 로드 (NumPy 만 필요) ---
+
+    def save(self, path: str):
+        if path.endswith(".joblib"):
+            import joblib
+            joblib.dump(self, path)
+            return
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold, left=self.left,
+            default_left=self.default_left, value=self.value, roots=self.roots, tree_class=self.tree_class,
+            meta=np.array(json.dumps({
+                "base_score": self.base_score, "n_classes": self.n_classes, "objective": self.objective,
+                "max_depth": self.max_depth, "n_features": self.n_features,
+            })),
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = None) -> "TreeEnsemble":
+        if path.endswith(".joblib"):
+            import joblib
+            return joblib.load(path, mmap_mode=mmap_mode)
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {key: data[key] for key in data.files if key != "meta"}
+        return cls(**arrays, **meta)
+
+
+class RoutedModel:
+    """max_rows 행 이하 배치는 변환된 앙상블로, 더 큰 배치는 원본 모델로 평가합니다. (두 모델의 결과는 check_parity 로 확인)"""
+
+    def __init__(self, ensemble: TreeEnsemble, model: Any, max_rows: int):
+        self.ensemble = ensemble
+        self.model = model
+        self.max_rows = max_rows
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if len(X) <= self.max_rows:
+            return self.ensemble.predict_proba(X)
+        return np.asarray(self.model.predict_proba(X), dtype=np.float64)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.predict_proba(X).argmax(axis=1)
+
+
+def load_model(model_path: Optional[str], compiled_path: Optional[str] = None, compiled_max_rows: int = 0,
+               mmap_mode: Optional[str] = None) -> Any:
+    """
+    분류 모델을 로드합니다. compiled_path 가 없으면 원본 모델을 그대로 반환합니다.
+    compiled_path 가 있고 compiled_max_rows > 0 이면 원본 모델도 로드해 RoutedModel 로 묶고,
+    compiled_max_rows 가 0 이거나 원본 모델을 로드할 수 없으면(예: xgboost 미설치) 변환된 앙상블만 사용합니다.
+    """
+    if not compiled_path:
+        return load_artifact(model_path, mmap_mode)
+    ensemble = load_artifact(compiled_path, mmap_mode)
+    if compiled_max_rows <= 0:
+        return ensemble
+    try:
+        model = load_artifact(model_path, mmap_mode)
+    except ImportError as e:
+        print(f"⚠️ 원본 모델을 로드할 수 없어 모든 배치를 변환된 앙상블로 평가합니다: {e}")
+        return ensemble
+    return RoutedModel(ensemble, model, compiled_max_rows)
+
+
+def load_artifact(path: str, mmap_mode: Optional[str] = None) -> Any:
+    """
+    모델 아티팩트를 로드합니다. 변환된 앙상블(.npz)은 NumPy 로, 그 외(.joblib)는 joblib 으로 읽습니다.
+    mmap_mode='r' 이면 joblib 파일 안의 NumPy 배열을 복사하지 않고 메모리 매핑하여 프로세스 간에 페이지를 공유합니다.
+    """
+    if path.endswith(".npz"):
+        return TreeEnsemble.load(path)
+    import joblib
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+class _Builder:
+    """트리를 하나씩 받아 전역 노드 배열에 이어 붙입니다."""
+
+    def __init__(self):
+        self.feature: List[np.ndarray] = []
+        self.threshold: List[np.ndarray] = []
+        self.left: List[np.ndarray] = []
+        self.default_left: List[np.ndarray] = []
+        self.value: List[np.ndarray] = []
+        self.roots: List[int] = []
+        self.tree_class: List[int] = []
+        self.offset = 0
+        self.max_depth = 0
+
+    def add_tree(self, feature, threshold, left, right, default_left, value, tree_class: int):
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        feature = np.asarray(feature, dtype=np.int64)
+        threshold = np.asarray(threshold)
+        default_left = np.asarray(default_left, dtype=bool)
+        value = np.asarray(value, dtype=np.float64)
+
+        # 너비 우선 순서로 번호를 다시 매겨 두 자식이 연속된 인덱스를 갖게 합니다.
+        order, depth, children = [0], [0], [0]
+        k = 0
+        while k < len(order):
+            i = order[k]
+            if left[i] >= 0:
+                children[k] = len(order)
+                order.extend((left[i], right[i]))
+                depth.extend((depth[k] + 1, depth[k] + 1))
+                children.extend((0, 0))
+            k += 1
+        order = np.asarray(order)
+        is_leaf = left[order] < 0
+
+        # 리프는 자기 자신을 가리키고(항상 왼쪽으로 이동) 고정 횟수 순회가 가능하게 합니다.
+        # 임계값을 +inf 로 두면 +inf 입력이 'x >= inf' 로 오른쪽(다음 노드)으로 넘어가므로 NaN 을 씁니다.
+        self.left.append(np.where(is_leaf, np.arange(len(order)), children) + self.offset)
+        self.feature.append(np.where(is_leaf, 0, feature[order]))
+        self.threshold.append(np.where(is_leaf, np.nan, threshold[order]))
+        self.default_left.append(np.where(is_leaf, True, default_left[order]))
+        self.value.append(np.where(is_leaf, value[order], 0.0))
+        self.roots.append(self.offset)
+        self.tree_class.append(tree_class)
+        self.max_depth = max(self.max_depth, max(depth))
+        self.offset += len(order)
+
+    def build(self, threshold_dtype, **meta) -> TreeEnsemble:
+        return TreeEnsemble(
+            feature=np.concatenate(self.feature),
+            threshold=np.concatenate(self.threshold).astype(threshold_dtype),
+            left=np.concatenate(self.left),
+            default_left=np.concatenate(self.default_left),
+            value=np.concatenate(self.value),
+            roots=np.asarray(self.roots),
+            tree_class=np.asarray(self.tree_class),
+            max_depth=self.max_depth,
+            **meta,
+        )
+
+
+def _export_xgboost(model) -> TreeEnsemble:
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw(raw_format="json"))["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in SUPPORTED_OBJECTIVES:
+        raise ValueError(f"지원하지 않는 XGBoost objective 입니다: {objective}")
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError("gbtree 부스터만 변환할 수 있습니다.")
+
+    param = learner["learner_model_param"]
+    n_classes = int(param["num_class"])
+    trees = learner["gradient_booster"]["model"]["trees"]
+    tree_info = learner["gradient_booster"]["model"]["tree_info"]
+
+    # early stopping 으로 best_iteration 이 지정된 경우 원본 predict_proba 와 같이 그 지점까지만 사용합니다.
+    best_iteration = booster.attr("best_iteration")
+    if best_iteration is not None:
+        num_parallel = int(learner["gradient_booster"]["model"]["gbtree_model_param"]["num_parallel_tree"])
+        limit = (int(best_iteration) + 1) * max(n_classes, 1) * num_parallel
+        trees, tree_info = trees[:limit], tree_info[:limit]
+
+    builder = _Builder()
+    for tree, tree_class in zip(trees, tree_info):
+        if any(tree.get("split_type", [])):
+            raise ValueError("범주형 분기가 포함된 트리는 변환할 수 없습니다.")
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        builder.add_tree(
+            feature=np.asarray(tree["split_indices"], dtype=np.int64),
+            threshold=conditions,
+            left=tree["left_children"],
+            right=tree["right_children"],
+            default_left=tree["default_left"],
+            value=conditions.astype(np.float64),  # XGBoost 는 리프 값을 split_conditions 에 저장합니다.
+            tree_class=int(tree_class),
+        )
+
+    base_score = float(param["base_score"])
+    if objective == "binary:logistic":
+        base_score = float(np.log(base_score / (1.0 - base_score)))
+        n_classes = 1
+
+    return builder.build(
+        np.float32, base_score=base_score, n_classes=n_classes, objective=objective,
+        n_features=int(param["num_feature"]),
+    )
+
+
+def _export_lightgbm(model) -> TreeEnsemble:
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    dump = booster.dump_model()
+    objective = dump["objective"].split()[0]
+    if objective not in SUPPORTED_OBJECTIVES:
+        raise ValueError(f"지원하지 않는 LightGBM objective 입니다: {objective}")
+    n_classes = int(dump["num_class"]) if objective == "multiclass" else 1
+    trees_per_iteration = int(dump.get("num_tree_per_iteration", 1))
+
+    builder = _Builder()
+    for i, info in enumerate(dump["tree_info"]):
+        feature, threshold, left, right, default_left, value = [], [], [], [], [], []
+
+        def visit(node: Dict[str, Any]) -> int:
+            index = len(feature)
+            for column in (feature, threshold, left, right, default_left, value):
+                column.append(0)
+            if "leaf_value" in node or "split_feature" not in node:
+                left[index] = right[index] = -1
+                value[index] = float(node.get("leaf_value", 0.0))
+                threshold[index] = np.inf
+                return index
+            if node.get("decision_type") != "<=":
+                raise ValueError("범주형 분기가 포함된 트리는 변환할 수 없습니다.")
+            missing_type = node.get("missing_type", "None")
+            if missing_type == "Zero":
+                raise ValueError("missing_type=Zero 인 분기는 변환할 수 없습니다.")
+
+            t = float(node["threshold"])
+            feature[index] = int(node["split_feature"])
+            # LightGBM 은 'x <= t' 로 분기하므로 'x < 다음 표현 가능한 실수' 로 바꿔 저장합니다.
+            threshold[index] = np.nextafter(t, np.inf)
+            # missing_type=None 이면 NaN 을 0 으로 간주하고 비교합니다.
+            default_left[index] = bool(node.get("default_left")) if missing_type == "NaN" else (0.0 <= t)
+            left[index] = visit(node["left_child"])
+            right[index] = visit(node["right_child"])
+            return index
+
+        visit(info["tree_structure"])
+        builder.add_tree(
+            feature=np.asarray(feature, dtype=np.int64),
+            threshold=np.asarray(threshold, dtype=np.float64),
+            left=left, right=right, default_left=default_left,
+            value=np.asarray(value, dtype=np.float64),
+            tree_class=i % trees_per_iteration if n_classes > 1 else 0,
+        )
+
+    return builder.build(
+        np.float64, base_score=0.0, n_classes=n_classes, objective=objective,
+        n_features=int(dump["max_feature_idx"]) + 1,
+    )
+
+
+def export_ensemble(model) -> TreeEnsemble:
+    """학습된 XGBoost / LightGBM 모델(sklearn 래퍼 또는 Booster)을 TreeEnsemble 로 변환합니다."""
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        return _export_xgboost(model)
+    if module.startswith("lightgbm"):
+        return _export_lightgbm(model)
+    raise ValueError(f"변환을 지원하지 않는 모델 타입입니다: {type(model).__name__} (XGBoost / LightGBM 만 지원)")
+
+
+def check_parity(model, ensemble: TreeEnsemble, n_rows: int = 2000, seed: int = 0, atol: float = 1e-5) -> Dict[str, Any]:
+    """
+    원본 모델과 변환된 앙상블의 predict_proba 결과를 같은 입력(결측값 포함)으로 비교합니다.
+    입력은 학습 데이터와 비슷한 스케일(스케일링 이후)을 가정한 표준 정규 분포에서 생성하고, NaN / ±inf 를 섞습니다.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, ensemble.n_features)) * 3
+    X[rng.random(X.shape) < 0.05] = np.nan
+    X[rng.random(X.shape) < 0.02] = np.inf
+    X[rng.random(X.shape) < 0.02] = -np.inf
+    X = X.astype(np.float32)
+
+    expected = np.asarray(model.predict_proba(X), dtype=np.float64)
+    actual = ensemble.predict_proba(X)
+    max_abs_diff = float(np.abs(expected - actual).max())
+    agreement = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    return {
+        "rows": n_rows,
+        "max_abs_diff": max_abs_diff,
+        "argmax_agreement": agreement,
+        "passed": max_abs_diff <= atol and agreement == 1.0,
+    }
+
+
+def measure_latency(predict, n_features: int, batch_sizes=(1, 8, 32, 64, 256), repeats: int = 200) -> Dict[int, float]:
+    """배치 크기별 1회 predict_proba 평균 지연 시간(ms)을 측정합니다."""
+    rng = np.random.default_rng(0)
+    results = {}
+    for size in batch_sizes:
+        X = rng.standard_normal((size, n_features)).astype(np.float32)
+        predict(X)  # 워밍업
+        started = time.perf_counter()
+        for _ in range(repeats):
+            predict(X)
+        results[size] = round((time.perf_counter() - started) / repeats * 1000, 4)
+    return results
+
+
+def main(argv: List[str]) -> int:
+    import joblib
+
+    if len(argv) != 3 or argv[0] not in ("export", "parity"):
+        print("사용법: python -m src.inference.tree_ensemble [export|parity] <model.joblib> <ensemble.npz>")
+        return 2
+    command, model_path, ensemble_path = argv
+    model = joblib.load(model_path)
+
+    if command == "export":
+        ensemble = export_ensemble(model)
+        ensemble.save(ensemble_path)
+        print(f"✅ {len(ensemble.roots)}개 트리 / {ensemble.n_nodes}개 노드 (최대 깊이 {ensemble.max_depth}) → '{ensemble_path}'")
+        return 0
+
+    ensemble = TreeEnsemble.load(ensemble_path)
+    report = check_parity(model, ensemble)
+    print(f"{'✅' if report['passed'] else '❌'} 결과 비교: {report}")
+    print(f"   - 원본 모델 지연 시간(ms): {measure_latency(model.predict_proba, ensemble.n_features)}")
+    print(f"   - 변환 모델 지연 시간(ms): {measure_latency(ensemble.predict_proba, ensemble.n_features)}")
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
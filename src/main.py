@@ -3,10 +3,35 @@ from fastapi.responses import JSONResponse, Response # Response 임포트 추가
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import IntegrityError
+from contextlib import asynccontextmanager
+import asyncio
 from .core.database import Base, engine 
+from .core.config import settings
 from .routes import auth, analysis, users, attacks
+from .services.agent_response_producer import agent_response_producer
 
-app = FastAPI(title="FastAPI User Authentication API")
+# MONITORING_RUN_IN_API=true 이면 postgres_watcher 를 API 프로세스의 백그라운드 작업으로 실행합니다.
+# (MONITORING_ALERT_DISPATCH=inprocess 와 함께 쓰면 알림을 HTTP 없이 바로 처리합니다.)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watcher_task = None
+    if settings.monitoring_run_in_api:
+        from .monitoring import postgres_watcher
+        watcher_task = asyncio.create_task(postgres_watcher.main())
+    try:
+        yield
+    finally:
+        # 종료 시 감시 작업을 취소하고, 정리(HTTP 세션 닫기 등)가 끝날 때까지 기다립니다.
+        if watcher_task is not None:
+            watcher_task.cancel()
+            try:
+                await watcher_task
+            except asyncio.CancelledError:
+                pass
+        # 에이전트 응답 프로듀서 버퍼에 남은 차단/정책 지시를 보낸 뒤 연결을 닫습니다. (시작된 적이 없으면 아무것도 하지 않음)
+        await agent_response_producer.stop()
+
+app = FastAPI(title="FastAPI User Authentication API", lifespan=lifespan)
 
 # CORS Middleware configuration
 # 🚨 수정된 부분: 허용할 오리진 목록에 'http://localhost:5173' 명확히 포함
@@ -9,6 +9,7 @@ from sqlalchemy import (
     BigInteger,
     Numeric,
     Text,
+    Index,
     func
 )
 from sqlalchemy.dialects.postgresql import JSONB, INET
@@ -46,6 +47,7 @@ class User(Base):
 class AttackLog(Base):
     """
     공격 이벤트 로그를 저장하기 위한 'Attack_log' 테이블을 나타냅니다.
+    DB 에서는 detected_at 기준 시간 범위 파티션 테이블입니다. (migrations/001_partition_attack_tables.sql)
     """
     __tablename__ = 'Attack_log'
 
@@ -63,11 +65,30 @@ class AttackLog(Base):
     responded_at = Column(DateTime(timezone=True), nullable=False)
     notification = Column(Boolean, default=False, nullable=False)
 
+    # migrations/002_hot_query_indexes.sql: 미발송 행 부분 인덱스 / 004_keyset_pagination_indexes.sql: 사용자별 최신순 (키셋) 조회
+    __table_args__ = (
+        Index("ix_Attack_log_unnotified", detected_at, postgresql_where=(notification == False)),
+        Index("ix_Attack_log_user_id_detected_at_log_id", user_id, detected_at.desc(), log_id.desc()),
+    )
+
     user = relationship("User", back_populates="attack_logs")
 
+class AttackLogRollup(Base):
+    """
+    사용자 / 공격 유형 / 1분 버킷별 Attack_log 탐지 건수 롤업 'Attack_log_rollup' 테이블을 나타냅니다.
+    Attack_log INSERT 트리거가 갱신합니다. (migrations/003_attack_log_rollup.sql)
+    """
+    __tablename__ = 'Attack_log_rollup'
+
+    user_id = Column(String(50), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    attack_type = Column(String(50), primary_key=True)
+    count = Column(BigInteger, nullable=False)
+
 class AttackTraffic(Base):
     """
     공격과 관련된 트래픽 데이터를 저장하기 위한 'Attack_traffic' 테이블을 나타냅니다.
+    DB 에서는 "@timestamp" 기준 시간 범위 파티션 테이블입니다. (migrations/001_partition_attack_tables.sql)
     """
     __tablename__ = 'Attack_traffic'
 
@@ -95,6 +116,11 @@ class AttackTraffic(Base):
     down_per_up_ratio = Column("Down_per_Up_Ratio", Integer, nullable=False)
     notification = Column(Boolean, default=False, nullable=False)
 
+    __table_args__ = (
+        Index("ix_Attack_traffic_unnotified", timestamp, postgresql_where=(notification == False)),
+        Index("ix_Attack_traffic_user_id_@timestamp_traffic_id", user_id, timestamp.desc(), traffic_id.desc()),
+    )
+
     user = relationship("User", back_populates="attack_traffics")
 
 class IncidentLogReport(Base):
@@ -213,5 +239,23 @@ class AlertHistory(Base):
     user_id = Column(String(50), ForeignKey("Users.user_id"), nullable=False)
     attack_type = Column(String(100), nullable=False)
     last_sent_at = Column(DateTime(timezone=True), nullable=False)
+
+    # 사용자 / 공격 유형당 한 행 (migrations/002_hot_query_indexes.sql)
+    __table_args__ = (
+        Index("uq_Alert_History_user_id_attack_type", user_id, attack_type, unique=True),
+    )
     
     user = relationship("User", back_populates="alert_histories")
+
+class InferenceDeadLetter(Base):
+    """ 추론 워커가 반복 실패한 배치에서 격리한 레코드 (migrations/006_inference_dead_letter.sql) """
+    __tablename__ = "Inference_dead_letter"
+
+    dead_letter_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    worker = Column(String(50), nullable=False)
+    topic = Column(String(255), nullable=False)
+    partition = Column(Integer)
+    offset = Column(BigInteger)
+    payload = Column(JSONB, nullable=False)
+    error = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
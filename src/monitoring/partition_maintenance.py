@@ -0,0 +1,171 @@
+# src/monitoring/partition_maintenance.py
+
+"""
+시간 범위 파티션(migrations/001_partition_attack_tables.sql) 유지보수 작업입니다.
+
+- PARTITION_PREMAKE_DAYS 만큼 앞선 시점까지 PARTITION_INTERVAL(day / week) 단위 파티션을 미리 만듭니다.
+  새 파티션은 항상 기존 파티션들의 가장 늦은 상한에서 시작하므로 legacy 파티션과 겹치지 않습니다.
+- 상한이 PARTITION_RETENTION_DAYS 보다 오래된 파티션은 PARTITION_RETENTION_ACTION 에 따라 삭제(drop)하거나
+  분리(detach, 테이블은 남겨 두고 조회 대상에서만 제외)합니다.
+- 만들 범위의 행이 이미 default 파티션에 들어와 있으면 default 를 잠시 분리하고 해당 행을 새 파티션으로 옮깁니다.
+
+    python -m src.monitoring.partition_maintenance          # PARTITION_MAINTENANCE_INTERVAL 마다 반복
+    python -m src.monitoring.partition_maintenance --once   # 한 번만 실행 (마이그레이션 직후 / cron)
+"""
+
+import os
+import re
+import sys
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+# --- 프로젝트 경로 설정 및 모듈 import ---
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from src.core.config import settings
+from src.core.database import engine
+
+# 파티션 테이블 → 파티션 키 컬럼
+PARTITIONED_TABLES = {
+    "Attack_log": "detected_at",
+    "Attack_traffic": "@timestamp",
+}
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    value = value.strip("'")
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+def _interval_start(moment: datetime) -> datetime:
+    """moment 가 속한 파티션 구간의 시작 (UTC 0시, week 이면 월요일 0시)."""
+    start = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if settings.partition_interval == "week":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def _interval_end(start: datetime) -> datetime:
+    step = timedelta(weeks=1) if settings.partition_interval == "week" else timedelta(days=1)
+    return _interval_start(start) + step
+
+
+async def list_partitions(conn, table: str) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """(파티션 이름, 하한, 상한) 목록. default 파티션은 제외하며, MINVALUE / MAXVALUE 는 None 입니다."""
+    result = await conn.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:parent AS regclass)
+    """), {"parent": f'"{table}"'})
+    partitions = []
+    for name, bound in result.all():
+        match = _BOUND_RE.search(bound or "")
+        if match is None:
+            continue  # DEFAULT
+        partitions.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return partitions
+
+
+async def _create_partition(conn, table: str, column: str, start: datetime, end: datetime):
+    name = f"{table}_p{start:%Y%m%d}"
+    default = f"{table}_default"
+    params = {"start": start, "end": end}
+    moved = (await conn.execute(
+        text(f'SELECT count(*) FROM "{default}" WHERE "{column}" >= :start AND "{column}" < :end'), params
+    )).scalar()
+
+    if moved:
+        # default 에 이미 이 범위의 행이 있으면 파티션을 만들 수 없으므로, default 를 분리한 상태에서 행을 옮깁니다.
+        await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+    await conn.execute(text(
+        f"CREATE TABLE \"{name}\" PARTITION OF \"{table}\" FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    if moved:
+        # 부모가 아닌 새 파티션에 직접 넣어 Attack_log 롤업 트리거가 다시 집계하지 않도록 합니다.
+        await conn.execute(text(
+            f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE "{column}" >= :start AND "{column}" < :end'
+        ), params)
+        await conn.execute(text(f'DELETE FROM "{default}" WHERE "{column}" >= :start AND "{column}" < :end'), params)
+        await conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+    print(f"   - 🧱 파티션 생성: {name} [{start:%Y-%m-%d} ~ {end:%Y-%m-%d})" + (f", default 에서 {moved}건 이동" if moved else ""))
+
+
+async def ensure_partitions(conn, table: str, column: str, now: datetime) -> int:
+    """now + PARTITION_PREMAKE_DAYS 까지의 파티션을 만들고, 만든 개수를 반환합니다."""
+    uppers = [upper for _, _, upper in await list_partitions(conn, table) if upper is not None]
+    start = max(uppers) if uppers else _interval_start(now)
+    horizon = now + timedelta(days=settings.partition_premake_days)
+    created = 0
+    while start < horizon:
+        end = _interval_end(start)
+        await _create_partition(conn, table, column, start, end)
+        start = end
+        created += 1
+    return created
+
+
+async def expire_partitions(conn, table: str, now: datetime) -> int:
+    """상한이 보존 기간보다 오래된 파티션을 삭제(drop) 또는 분리(detach)하고, 처리한 개수를 반환합니다."""
+    cutoff = now - timedelta(days=settings.partition_retention_days)
+    expired = 0
+    for name, _, upper in await list_partitions(conn, table):
+        if upper is None or upper > cutoff:
+            continue
+        await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+        if settings.partition_retention_action == "drop":
+            await conn.execute(text(f'DROP TABLE "{name}"'))
+        print(f"   - 🗑️ 만료 파티션 {'삭제' if settings.partition_retention_action == 'drop' else '분리'}: {name} (상한 {upper:%Y-%m-%d})")
+        expired += 1
+    return expired
+
+
+async def run_once(now: Optional[datetime] = None):
+    now = now or datetime.now(timezone.utc)
+    for table, column in PARTITIONED_TABLES.items():
+        # 테이블마다 별도 트랜잭션으로 처리해 한 테이블의 실패가 다른 테이블에 영향을 주지 않도록 합니다.
+        try:
+            async with engine.begin() as conn:
+                created = await ensure_partitions(conn, table, column, now)
+                expired = await expire_partitions(conn, table, now)
+            print(f"✅ [{table}] 파티션 유지보수 완료 (생성 {created}개, 만료 {expired}개)")
+        except Exception as e:
+            print(f"❌ [{table}] 파티션 유지보수 중 오류 발생: {e}")
+
+    # 원본 파티션과 같은 보존 기간이 지난 롤업 버킷도 정리합니다. (migrations/003_attack_log_rollup.sql)
+    try:
+        async with engine.begin() as conn:
+            cutoff = now - timedelta(days=settings.partition_retention_days)
+            deleted = (await conn.execute(text('DELETE FROM "Attack_log_rollup" WHERE bucket < :cutoff'), {"cutoff": cutoff})).rowcount
+        if deleted:
+            print(f"✅ [Attack_log_rollup] 만료 버킷 {deleted}개 삭제")
+    except Exception as e:
+        print(f"❌ [Attack_log_rollup] 만료 버킷 정리 중 오류 발생: {e}")
+
+
+async def main(once: bool = False):
+    print(f"🚀 파티션 유지보수 시작 (단위={settings.partition_interval}, 미리 생성={settings.partition_premake_days}일, "
+          f"보존={settings.partition_retention_days}일, 만료 시={settings.partition_retention_action})")
+    while True:
+        await run_once()
+        if once:
+            break
+        await asyncio.sleep(settings.partition_maintenance_interval)
+    await engine.dispose()
+
+
+# --- 스크립트 실행 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attack_log / Attack_traffic 시간 범위 파티션 생성 및 만료 처리")
+    parser.add_argument("--once", action="store_true", help="한 번만 실행하고 종료")
+    args = parser.parse_args()
+    asyncio.run(main(once=args.once))
@@ -2,18 +2,20 @@
 
 import os
 import sys
-import requests
 import time
+import random
 import asyncio
+import aiohttp
 from datetime import datetime, timezone, timedelta
 from collections import defaultdict
-from sqlalchemy import select, update
+from sqlalchemy import select, update, func, literal, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 # --- 프로젝트 경로 설정 및 모듈 import ---
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 
-from src.core.database import AsyncSessionLocal
+from src.core.database import AsyncSessionLocal, engine
 from src.models.models import AttackLog, AttackTraffic, AlertHistory
 from src.core.config import settings
 
@@ -21,19 +23,69 @@ from src.core.config import settings
 ALERT_API_URL = settings.internal_api_base_url_second + "/api/internal/alert"
 POLLING_INTERVAL = settings.monitoring_polling_interval
 ALERT_COOLDOWN_MINUTES = 10
+ALERT_MAX_RETRIES = settings.monitoring_alert_max_retries
+ALERT_RETRY_BACKOFF = settings.monitoring_alert_retry_backoff_ms / 1000
+# 재시도할 HTTP 상태 코드. 그 밖의 4xx 는 다시 보내도 같은 결과이므로 바로 실패로 처리합니다.
+# 알림 API 는 멱등이 아니므로(보고서 생성 + 이메일/SMS 발송) 요청이 처리되지 않았다고 확신할 수 있는 응답만 재시도합니다.
+RETRYABLE_STATUS = {429, 502, 503, 504}
+# 한 번에 잠그고 처리하는 최대 행 수. 여러 감시 프로세스가 이 단위로 백로그를 나눠 가집니다.
+CLAIM_BATCH_SIZE = settings.monitoring_claim_batch_size
+
+# 모델별 탐지 시각 컬럼 (파티션 키)
+TIME_COLUMNS = {AttackLog: AttackLog.detected_at, AttackTraffic: AttackTraffic.timestamp}
+
+# (user_id, attack_type) → 이 프로세스가 마지막으로 알림을 보낸 시각. (Alert_History 커밋 후에만 기록)
+# Alert_History 의 값은 이보다 이를 수 없으므로, 캐시에서 쿨다운 중이면 DB 를 확인하지 않습니다.
+_cooldown_cache = {}
+# 한 INSERT 문에 넣는 최대 키 수 (asyncpg 파라미터 수 제한 32767 / 컬럼 3개)
+CLAIM_CHUNK_SIZE = 5000
+
+# 알림 API 호출에 재사용하는 keep-alive 세션 (get_http_session 에서 생성)
+_http_session = None
+# 진행 중인 in-process 알림의 이메일 / SMS 작업 (가비지 컬렉션 방지)
+_background_tasks = set()
+
+# NOTIFY payload(테이블 이름) → (모델, ID 필드, source)
+WATCHED_TABLES = {
+    "Attack_log": (AttackLog, "log_id", "log"),
+    "Attack_traffic": (AttackTraffic, "traffic_id", "traffic"),
+}
 
 # --- 2. 핵심 기능 함수 ---
 
-async def fetch_unprocessed_attacks(db, model):
-    """지정된 테이블에서 처리되지 않은 모든 공격을 비동기로 가져옵니다."""
+def claim_statement(model, attack_id_field: str, limit: int = CLAIM_BATCH_SIZE):
+    """미처리 공격을 오래된 순으로 잠그는 SELECT ... FOR UPDATE SKIP LOCKED 문 (tests/test_query_plans.py 가 실행 계획을 확인)"""
+    time_column = TIME_COLUMNS[model]
+    attack_type = model.attack_type if hasattr(model, "attack_type") else literal("Traffic Anomaly")
+    return (
+        select(getattr(model, attack_id_field).label("attack_id"), model.user_id, attack_type.label("attack_type"))
+        .where(model.notification == False)
+        .order_by(time_column)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+async def fetch_unprocessed_attacks(db, model, attack_id_field: str, limit: int = CLAIM_BATCH_SIZE):
+    """
+    지정된 테이블에서 처리되지 않은 공격을 오래된 순으로 최대 limit 개 가져와 잠급니다.
+    다른 감시 프로세스가 잠근 행은 건너뛰므로(SKIP LOCKED) 여러 프로세스가 같은 행을 중복 처리하지 않으며,
+    잠금은 트랜잭션이 커밋 / 롤백될 때 풀립니다.
+    ORM 객체 대신 알림에 필요한 (attack_id, user_id, attack_type) 컬럼만 가져오므로 메모리는 limit 에 비례합니다.
+    탐지 시각으로 거르지 않으므로 오래 밀린 행도 빠짐없이 알림 / 표시되며,
+    스캔 범위는 미발송 행만 담은 부분 인덱스(ix_*_unnotified)가 제한합니다.
+    """
     try:
-        stmt = select(model).where(model.notification == False)
-        result = await db.execute(stmt)
-        return result.scalars().all()
+        result = await db.execute(claim_statement(model, attack_id_field, limit))
+        return result.all()
     except Exception as e:
         print(f"❌ DB 조회 중 오류 발생 ({model.__tablename__}): {e}")
         return []
 
+async def count_unprocessed_attacks(db, model) -> int:
+    """진행률 표시용 미처리 공격 수 (잠긴 행 포함)."""
+    stmt = select(func.count()).select_from(model).where(model.notification == False)
+    return (await db.execute(stmt)).scalar()
+
 async def mark_attacks_as_sent(db, model, attack_ids, id_column_name: str):
     """지정된 ID 목록에 해당하는 레코드들을 처리 완료로 비동기 업데이트합니다."""
     if not attack_ids: return
@@ -46,24 +98,120 @@ async def mark_attacks_as_sent(db, model, attack_ids, id_column_name: str):
         print(f"   - ❌ DB 업데이트 중 오류 발생: {e}")
         raise
 
-async def call_alert_api_async(payload: dict):
-    """FastAPI 서버의 알림 API를 비동기적으로 호출합니다."""
-    try:
-        response = await asyncio.to_thread(
-            requests.post, ALERT_API_URL, json=payload, timeout=10
+async def get_http_session() -> aiohttp.ClientSession:
+    """알림 API 용 aiohttp 세션을 만들거나 재사용합니다. 연결은 keep-alive 로 유지되며 최대 연결 수가 제한됩니다."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.monitoring_alert_max_connections),
+            timeout=aiohttp.ClientTimeout(total=settings.monitoring_alert_timeout),
         )
-        response.raise_for_status()
-        print(f"   - ✅ API 호출 성공: user_id={payload.get('user_id')}, type={payload.get('attack_type')}")
+    return _http_session
+
+async def close_http_session():
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+async def dispatch_alert_in_process(payload: dict):
+    """HTTP 를 거치지 않고 알림 처리 함수(routes/attacks.handle_alert)를 직접 호출합니다."""
+    from fastapi import BackgroundTasks
+    from src.routes.attacks import AlertPayload, handle_alert
+
+    try:
+        background_tasks = BackgroundTasks()
+        async with AsyncSessionLocal() as db:
+            await handle_alert(AlertPayload(**payload), db, background_tasks)
+        # 이메일 / SMS 는 API 의 BackgroundTasks 처럼 응답(여기서는 감시 루프)을 막지 않고 따로 실행합니다.
+        task = asyncio.create_task(background_tasks())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        print(f"   - ✅ 알림 처리 성공 (in-process): user_id={payload.get('user_id')}, type={payload.get('attack_type')}")
         return True
-    except requests.RequestException as e:
-        error_detail = e.response.json() if e.response else str(e)
-        print(f"   - ❌ API 호출 실패: {e}, 상세: {error_detail}")
+    except Exception as e:
+        print(f"   - ❌ 알림 처리 실패 (in-process): {e}")
         return False
 
-async def process_attacks(db, model, attack_id_field, source_name):
-    """공격 목록을 그룹화하고, 쿨다운을 확인하여 알림을 보냅니다. (commit 없음)"""
-    attacks = await fetch_unprocessed_attacks(db, model)
-    if not attacks: return
+async def call_alert_api_async(payload: dict):
+    """
+    FastAPI 서버의 알림 API를 비동기적으로 호출합니다.
+    서버에 연결하지 못한 경우와 429/502/503/504 응답만 지수 백오프에 지터를 더해 최대 MONITORING_ALERT_MAX_RETRIES 번 재시도합니다.
+    알림 API 는 멱등이 아니므로, 요청이 서버에 도달했을 수 있는 타임아웃 / 연결 끊김 / 500 은 중복 알림을 막기 위해 재시도하지 않습니다.
+    """
+    if settings.monitoring_alert_dispatch == "inprocess":
+        return await dispatch_alert_in_process(payload)
+
+    session = await get_http_session()
+    error_detail = None
+    for attempt in range(ALERT_MAX_RETRIES + 1):
+        if attempt:
+            # full jitter: 여러 알림이 같은 시점에 한꺼번에 재시도하지 않도록 0 ~ 백오프 사이에서 무작위로 기다립니다.
+            await asyncio.sleep(random.uniform(0, ALERT_RETRY_BACKOFF * 2 ** (attempt - 1)))
+        try:
+            async with session.post(ALERT_API_URL, json=payload) as response:
+                if response.status < 400:
+                    print(f"   - ✅ API 호출 성공: user_id={payload.get('user_id')}, type={payload.get('attack_type')}")
+                    return True
+                error_detail = f"HTTP {response.status}: {await response.text()}"
+                if response.status not in RETRYABLE_STATUS:
+                    break
+        except aiohttp.ClientConnectorError as e:
+            # 연결 자체가 안 된 경우에는 요청이 전송되지 않았으므로 다시 보내도 안전합니다.
+            error_detail = repr(e)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error_detail = repr(e)
+            break
+    print(f"   - ❌ API 호출 실패: user_id={payload.get('user_id')}, type={payload.get('attack_type')}, 상세: {error_detail}")
+    return False
+
+def cooldown_statement(keys, now: datetime):
+    """
+    키마다 쿨다운(ALERT_COOLDOWN_MINUTES)이 지났을 때만 발송 시각을 기록하고 기록한 키를 돌려주는
+    INSERT ... ON CONFLICT DO UPDATE ... WHERE ... RETURNING 문 (tests/test_query_plans.py 가 실행 계획을 확인)
+    """
+    cutoff = now - timedelta(minutes=ALERT_COOLDOWN_MINUTES)
+    stmt = pg_insert(AlertHistory).values(
+        [{"user_id": user_id, "attack_type": attack_type, "last_sent_at": now} for user_id, attack_type in keys]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[AlertHistory.user_id, AlertHistory.attack_type],
+        set_={"last_sent_at": stmt.excluded.last_sent_at},
+        where=AlertHistory.last_sent_at < cutoff,
+    ).returning(AlertHistory.user_id, AlertHistory.attack_type)
+
+async def claim_alert_slots(db, keys, now: datetime):
+    """
+    (user_id, attack_type) 키 중 쿨다운이 지난 키를 골라 발송 시각을 기록하고, 알림을 보낼 키 집합을 반환합니다. (commit 없음)
+    롤백되면 기록도 사라지므로, 캐시에는 커밋이 성공한 뒤 remember_alert_slots() 로 넣습니다.
+    캐시로 걸러지지 않은 키는 INSERT ... ON CONFLICT DO UPDATE ... WHERE last_sent_at < cutoff RETURNING
+    한 문장으로 판정과 기록을 함께 하므로, 그룹 수와 관계없이 DB 왕복은 한 번입니다.
+    """
+    cutoff = now - timedelta(minutes=ALERT_COOLDOWN_MINUTES)
+    for key in [k for k, sent_at in _cooldown_cache.items() if sent_at < cutoff]:
+        del _cooldown_cache[key]
+
+    # 여러 감시 프로세스가 같은 행을 갱신할 때 교착 상태가 생기지 않도록 키 순서대로 처리합니다.
+    candidates = sorted(key for key in keys if key not in _cooldown_cache)
+    claimed = set()
+    for i in range(0, len(candidates), CLAIM_CHUNK_SIZE):
+        result = await db.execute(cooldown_statement(candidates[i:i + CLAIM_CHUNK_SIZE], now))
+        claimed.update((user_id, attack_type) for user_id, attack_type in result.all())
+    return claimed
+
+def remember_alert_slots(keys, now: datetime):
+    """claim_alert_slots() 로 기록한 발송 시각이 커밋된 뒤 캐시에 반영합니다."""
+    for key in keys:
+        _cooldown_cache[key] = now
+
+async def claim_attacks(db, model, attack_id_field, source_name):
+    """
+    잠근 공격 한 묶음을 그룹화하고, 쿨다운을 판정 / 기록하고, 처리 완료로 표시합니다. (commit 없음)
+    알림은 보내지 않고 (처리한 행 수, 보낼 알림 payload 목록, 쿨다운을 새로 기록한 키 집합, 기록 시각) 을 반환합니다.
+    알림 API 호출(재시도 포함)은 커밋 뒤에 하므로, 행 잠금과 DB 연결은 이 조회 / 갱신 동안만 잡힙니다.
+    """
+    attacks = await fetch_unprocessed_attacks(db, model, attack_id_field)
+    if not attacks: return 0, [], set(), None
 
     print(f"🚨 [{datetime.now(timezone.utc).isoformat()}] {len(attacks)}개의 새로운 '{model.__tablename__}' 공격 탐지!")
     
@@ -72,88 +220,234 @@ async def process_attacks(db, model, attack_id_field, source_name):
     unidentified_attacks = []
 
     for attack in attacks:
-        user_id = getattr(attack, 'user_id', None)
-        attack_type = getattr(attack, 'attack_type', 'Traffic Anomaly')
-        if user_id:
-            grouped_attacks[(user_id, attack_type)].append(attack)
+        if attack.user_id:
+            grouped_attacks[(attack.user_id, attack.attack_type)].append(attack.attack_id)
         else:
             # user_id가 없는 공격은 별도로 모음
-            unidentified_attacks.append(attack)
+            unidentified_attacks.append(attack.attack_id)
 
     all_processed_ids = []
-    alert_tasks = []
+    payloads = []
 
-    # 1. user_id가 있는 공격 처리
-    for (user_id, attack_type), attack_list in grouped_attacks.items():
-        stmt = select(AlertHistory).where(
-            AlertHistory.user_id == user_id, 
-            AlertHistory.attack_type == attack_type
-        )
-        result = await db.execute(stmt)
-        history = result.scalars().first()
-        
-        now = datetime.now(timezone.utc)
-        cooldown_time = now - timedelta(minutes=ALERT_COOLDOWN_MINUTES)
-        
-        attack_ids_in_group = [getattr(a, attack_id_field) for a in attack_list]
+    # 1. user_id가 있는 공격 처리 (모든 그룹의 쿨다운을 한 번에 판정)
+    claimed_at = datetime.now(timezone.utc)
+    sendable = await claim_alert_slots(db, grouped_attacks.keys(), claimed_at)
+    for (user_id, attack_type), attack_ids_in_group in grouped_attacks.items():
         all_processed_ids.extend(attack_ids_in_group)
 
-        if not history or history.last_sent_at < cooldown_time:
-            print(f"   - 📢 알림 발송 준비: User={user_id}, Type={attack_type}, Count={len(attack_list)}")
+        if (user_id, attack_type) in sendable:
+            print(f"   - 📢 알림 발송 준비: User={user_id}, Type={attack_type}, Count={len(attack_ids_in_group)}")
             
             payload = {
                 "user_id": user_id,
                 "attack_type": attack_type,
-                "count": len(attack_list),
+                "count": len(attack_ids_in_group),
                 "source": source_name,
                 "attack_ids": attack_ids_in_group
             }
-            alert_tasks.append(call_alert_api_async(payload))
-            
-            if history:
-                history.last_sent_at = now
-            else:
-                db.add(AlertHistory(user_id=user_id, attack_type=attack_type, last_sent_at=now))
+            payloads.append(payload)
         else:
             print(f"   - 🚫 쿨다운, 알림 건너뛰기: User={user_id}, Type={attack_type}")
 
     # 2. user_id가 없는 공격 ID들을 처리 목록에 추가
     if unidentified_attacks:
-        unidentified_ids = [getattr(a, attack_id_field) for a in unidentified_attacks]
-        all_processed_ids.extend(unidentified_ids)
-        print(f"   - ℹ️ {len(unidentified_ids)}개의 user_id 없는 공격을 처리 대상으로 표시합니다.")
-
-
-    # 모든 API 호출을 병렬로 실행
-    if alert_tasks:
-        await asyncio.gather(*alert_tasks)
+        all_processed_ids.extend(unidentified_attacks)
+        print(f"   - ℹ️ {len(unidentified_attacks)}개의 user_id 없는 공격을 처리 대상으로 표시합니다.")
 
     # 처리된 ID가 있으면 DB 업데이트를 스테이징
     if all_processed_ids:
         await mark_attacks_as_sent(db, model, all_processed_ids, attack_id_field)
+    return len(attacks), payloads, sendable, claimed_at
 
-# --- 3. 메인 실행 루프 ---
-async def main():
-    """메인 감시 루프를 실행합니다."""
-    print("🚀 PostgreSQL 기반 지능형 알림 시스템 (비동기)을 시작합니다...")
+async def dispatch_alerts(payloads):
+    """커밋된 묶음의 알림을 병렬로 보냅니다. 실패한 알림은 call_alert_api_async 가 로그로 남깁니다."""
+    if payloads:
+        await asyncio.gather(*(call_alert_api_async(payload) for payload in payloads))
+
+async def run_table(table) -> int:
+    """
+    한 테이블의 미처리 공격을 CLAIM_BATCH_SIZE 단위로 잠가 처리하고 묶음마다 커밋합니다.
+    백로그 크기와 관계없이 한 번에 메모리에 올리는 행과 트랜잭션 크기는 한 묶음으로 제한됩니다.
+    묶음마다 '잠금 → 쿨다운 기록 → 처리 완료 표시 → 커밋' 을 짧은 트랜잭션 하나로 끝내고, 연결을 반납한 뒤 알림을 보냅니다.
+    (커밋 후 알림이 실패해도 행은 처리 완료로 남습니다. 실패한 알림은 로그로만 남는 기존 동작과 같습니다)
+    남은 행이 없거나 다른 감시 프로세스가 모두 잠가 묶음이 덜 차면 끝나며, 처리한 행 수를 반환합니다.
+    """
+    total = 0
+    backlog = None
+    started = time.monotonic()
     while True:
         db_session = AsyncSessionLocal()
         try:
-            await process_attacks(db_session, AttackLog, "log_id", "log")
-            await process_attacks(db_session, AttackTraffic, "traffic_id", "traffic")
-            
+            processed, payloads, claimed, claimed_at = await claim_attacks(db_session, *WATCHED_TABLES[table])
             await db_session.commit()
-            print("✅ 모든 작업이 성공적으로 커밋되었습니다.")
-
+            remember_alert_slots(claimed, claimed_at)
+            # 첫 묶음이 가득 차면 밀린 백로그로 보고, 진행률 표시를 위해 남은 행 수를 한 번 셉니다.
+            if backlog is None and processed >= CLAIM_BATCH_SIZE:
+                backlog = processed + await count_unprocessed_attacks(db_session, WATCHED_TABLES[table][0])
+                await db_session.commit()
         except Exception as e:
             print(f"감시 루프 중 에러 발생: {e}")
             await db_session.rollback()
+            return total
         finally:
             await db_session.close()
-        
+
+        await dispatch_alerts(payloads)
+        total += processed
+        if processed:
+            if backlog:
+                elapsed = time.monotonic() - started
+                print(f"✅ [{table}] {total}/{backlog}개 처리 ({min(total / backlog, 1):.0%}, {total / max(elapsed, 1e-9):.0f}개/초)")
+            else:
+                print("✅ 모든 작업이 성공적으로 커밋되었습니다.")
+        if processed < CLAIM_BATCH_SIZE:
+            return total
+
+async def run_cycle(tables):
+    """지정된 테이블들의 미처리 공격을 처리합니다."""
+    for table in tables:
+        await run_table(table)
+
+class NotifyListener:
+    """
+    LISTEN 전용 asyncpg 연결입니다. (migrations/005_attack_notify_triggers.sql)
+    알림받은 테이블 이름을 모아 두고 wakeup 이벤트로 감시 루프를 깨웁니다.
+    연결이 끊겨도 wakeup 을 설정하므로 감시 루프가 바로 재연결합니다.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.pending = set()
+        self.wakeup = asyncio.Event()
+        self._conn = None
+        self._driver = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        # 알 수 없는 payload 면 모든 테이블을 확인합니다.
+        self.pending.update([payload] if payload in WATCHED_TABLES else WATCHED_TABLES)
+        self.wakeup.set()
+
+    def _on_terminate(self, connection):
+        self.wakeup.set()
+
+    @property
+    def connected(self) -> bool:
+        return self._driver is not None and not self._driver.is_closed()
+
+    async def connect(self):
+        self._conn = await engine.connect()
+        raw = await self._conn.get_raw_connection()
+        self._driver = raw.driver_connection  # asyncpg.Connection
+        await self._driver.add_listener(self.channel, self._on_notify)
+        self._driver.add_termination_listener(self._on_terminate)
+
+    async def close(self):
+        if self._conn is not None:
+            try:
+                if not self.connected:
+                    await self._conn.invalidate()
+                await self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+        self._driver = None
+
+    def drain(self):
+        """모인 테이블 이름을 꺼내고 비웁니다. 이후 도착한 알림은 다음 wakeup 으로 처리됩니다."""
+        tables, self.pending = self.pending, set()
+        self.wakeup.clear()
+        return tables
+
+async def missing_notify_triggers(channel: str):
+    """
+    migrations/005 의 attack_notify_insert 트리거가 없거나, 꺼져 있거나, 다른 채널로 NOTIFY 하는 감시 테이블 이름 목록을 반환합니다.
+    LISTEN 은 트리거가 없어도 성공하므로, 이 확인 없이 notify 모드로 돌면 알림이 안전망 스캔 주기까지 늦어집니다.
+    """
+    stmt = text("""
+        SELECT c.relname, t.tgargs
+        FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid
+        WHERE t.tgname = 'attack_notify_insert' AND NOT t.tgisinternal AND t.tgenabled <> 'D'
+          AND c.relname = ANY(:tables)
+    """)
+    async with engine.connect() as conn:
+        rows = (await conn.execute(stmt, {"tables": list(WATCHED_TABLES)})).all()
+    # tgargs 는 NUL 로 끝나는 인자들을 이어 붙인 bytea 입니다.
+    ready = {relname for relname, tgargs in rows if channel in bytes(tgargs).decode().split("\x00")}
+    return [table for table in WATCHED_TABLES if table not in ready]
+
+# --- 3. 메인 실행 루프 ---
+async def poll_loop():
+    """MONITORING_POLLING_INTERVAL 마다 두 테이블을 모두 확인합니다."""
+    while True:
+        await run_cycle(WATCHED_TABLES)
         print(f"--- 다음 확인까지 {POLLING_INTERVAL}초 대기 ---")
         await asyncio.sleep(POLLING_INTERVAL)
 
+async def notify_loop():
+    """
+    INSERT 트리거의 NOTIFY 를 받으면 바로 해당 테이블을 처리합니다.
+    알림이 없으면 DB 를 조회하지 않으며, MONITORING_SWEEP_INTERVAL 마다 한 번씩만 전체를 확인하는 안전망 스캔을 합니다.
+    """
+    listener = NotifyListener(settings.monitoring_notify_channel)
+    debounce = settings.monitoring_notify_debounce_ms / 1000
+    sweep_interval = settings.monitoring_sweep_interval
+    try:
+        while True:
+            if not listener.connected:
+                await listener.close()
+                try:
+                    await listener.connect()
+                    print(f"👂 LISTEN {settings.monitoring_notify_channel} (안전망 스캔 {sweep_interval}초)")
+                except Exception as e:
+                    print(f"❌ LISTEN 연결 실패: {e}, {POLLING_INTERVAL}초 후 재시도 (그동안 폴링)")
+                    await run_cycle(WATCHED_TABLES)
+                    await asyncio.sleep(POLLING_INTERVAL)
+                    continue
+                # 연결 전 / 끊긴 동안 들어온 행은 알림을 받지 못했으므로 (재)연결 직후 전체를 확인합니다.
+                await run_cycle(WATCHED_TABLES)
+
+            try:
+                await asyncio.wait_for(listener.wakeup.wait(), timeout=sweep_interval)
+            except asyncio.TimeoutError:
+                print("🧹 안전망 스캔")
+                await run_cycle(WATCHED_TABLES)
+                continue
+
+            if not listener.connected:
+                print("⚠️ LISTEN 연결이 끊어졌습니다. 재연결합니다.")
+                continue
+
+            # 연달아 들어오는 INSERT 는 잠깐 모았다가 한 번에 처리합니다.
+            await asyncio.sleep(debounce)
+            tables = listener.drain()
+            if tables:
+                await run_cycle(tables)
+    finally:
+        await listener.close()
+
+async def main():
+    """메인 감시 루프를 실행합니다."""
+    print(f"🚀 PostgreSQL 기반 지능형 알림 시스템 (비동기, {settings.monitoring_mode} 모드, "
+          f"알림 {settings.monitoring_alert_dispatch})을 시작합니다...")
+    try:
+        if settings.monitoring_mode == "poll":
+            await poll_loop()
+            return
+        try:
+            missing = await missing_notify_triggers(settings.monitoring_notify_channel)
+        except Exception as e:
+            missing = None
+            print(f"❌ NOTIFY 트리거 확인 실패: {e}")
+        if missing is None or missing:
+            # 트리거가 없으면 INSERT 알림이 오지 않으므로, 안전망 스캔 주기 대신 폴링 주기로 확인합니다.
+            reason = f"{missing} 테이블에 attack_notify_insert 트리거가 없음 (migrations/005 미적용?)" if missing else "트리거 확인 불가"
+            print(f"⚠️ {reason}: {POLLING_INTERVAL}초 폴링 모드로 전환합니다.")
+            await poll_loop()
+        else:
+            await notify_loop()
+    finally:
+        await close_http_session()
+
 # --- 스크립트 실행 ---
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,178 @@
+# src/monitoring/watcher_benchmark.py
+
+"""
+postgres_watcher 를 여러 프로세스로 동시에 실행했을 때의 백로그 처리량과 중복 여부를 측정합니다.
+
+합성 사용자와 알림 미발송 행을 --rows 만큼 넣어 커밋한 뒤, --replicas 로 지정한 프로세스 수마다
+같은 백로그를 run_table 로 처리하고 처리량(행/초), 중복 처리 행, 중복 알림을 출력합니다.
+알림 API 는 호출하지 않고 --alert-latency-ms 만큼 기다리는 것으로 대신합니다.
+측정이 끝나면 합성 데이터를 모두 삭제합니다.
+
+시드 행은 실제로 커밋되므로(INSERT 알림 트리거 포함) 실행 중인 감시 프로세스가 없는 스테이징 DB 에서 실행하세요.
+
+    python -m src.monitoring.watcher_benchmark --rows 200000 --replicas 1 2 4 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import asyncio
+import multiprocessing
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+# --- 프로젝트 경로 설정 및 모듈 import ---
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from src.core.database import engine
+
+SEED_USER_PREFIX = "watcherbench_"
+
+SEED_SQL = {
+    "Attack_log": """
+        INSERT INTO "Attack_log" (detected_at, attack_type, severity, confidence, source_address, hostname,
+                                  user_id, description, response_type, responded_at, notification)
+        SELECT now() - random() * INTERVAL '1 hour',
+               (ARRAY['Execution', 'Persistence', 'Discovery', 'Lateral Movement'])[1 + g % 4],
+               'high', 90, '10.0.0.' || (g % 250), 'HOST' || (g % 50), :prefix || (1 + g % :users),
+               '{}'::jsonb, 'alert', now(), false
+        FROM generate_series(1, :rows) g
+    """,
+    "Attack_traffic": """
+        INSERT INTO "Attack_traffic" ("@timestamp", user_id, "Src_IP", "Dst_Port", "Protocol", "Flow_Duration",
+                                      "Tot_Fwd_Pkts", "Tot_Bwd_Pkts", "Flow_Byts_per_s", "Flow_Pkts_per_s", "Bwd_IAT_Tot",
+                                      "FIN_Flag_Cnt", "RST_Flag_Cnt", "PSH_Flag_Cnt", "ACK_Flag_Cnt", "URG_Flag_Cnt",
+                                      "Down_per_Up_Ratio", notification)
+        SELECT now() - random() * INTERVAL '1 hour', :prefix || (1 + g % :users), '10.0.' || (g % 250) || '.1',
+               80, 6, 1000, 2, 1, 100.0, 10.0, 0, 0, 0, 0, 1, 0, 0, false
+        FROM generate_series(1, :rows) g
+    """,
+}
+
+
+async def seed(table: str, rows: int, users: int):
+    params = {"rows": rows, "users": users, "prefix": SEED_USER_PREFIX}
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            INSERT INTO "Users" (user_id, password_hash, email, name, phone, emp_number)
+            SELECT :prefix || g, 'x', :prefix || g || '@example.invalid', 'watcher bench', '000', 'E' || g
+            FROM generate_series(1, :users) g
+        """), params)
+        await conn.execute(text(SEED_SQL[table]), params)
+        await conn.execute(text(f'ANALYZE "{table}"'))
+    await engine.dispose()  # 측정 단계마다 asyncio.run 으로 새 이벤트 루프를 쓰므로 연결을 남기지 않습니다.
+
+
+async def reset(table: str):
+    """다음 측정을 위해 시드 행을 다시 미발송 상태로 되돌리고 알림 이력을 지웁니다."""
+    params = {"pattern": SEED_USER_PREFIX + "%"}
+    async with engine.begin() as conn:
+        await conn.execute(text(f'UPDATE "{table}" SET notification = false WHERE user_id LIKE :pattern'), params)
+        await conn.execute(text('DELETE FROM "Alert_History" WHERE user_id LIKE :pattern'), params)
+    await engine.dispose()
+
+
+async def cleanup(table: str):
+    params = {"pattern": SEED_USER_PREFIX + "%"}
+    async with engine.begin() as conn:
+        await conn.execute(text(f'DELETE FROM "{table}" WHERE user_id LIKE :pattern'), params)
+        await conn.execute(text('DELETE FROM "Attack_log_rollup" WHERE user_id LIKE :pattern'), params)
+        await conn.execute(text('DELETE FROM "Alert_History" WHERE user_id LIKE :pattern'), params)
+        await conn.execute(text('DELETE FROM "Users" WHERE user_id LIKE :pattern'), params)
+    await engine.dispose()
+
+
+async def _run_replica(table: str, alert_latency_ms: int) -> Dict[str, Any]:
+    from src.monitoring import postgres_watcher as watcher
+
+    processed_ids, alerts = [], []
+    mark_attacks_as_sent = watcher.mark_attacks_as_sent
+
+    async def recording_mark(db, model, attack_ids, id_column_name):
+        await mark_attacks_as_sent(db, model, attack_ids, id_column_name)
+        processed_ids.extend(attack_ids)
+
+    async def simulated_alert(payload):
+        await asyncio.sleep(alert_latency_ms / 1000)
+        alerts.append((payload["user_id"], payload["attack_type"]))
+        return True
+
+    watcher.mark_attacks_as_sent = recording_mark
+    watcher.call_alert_api_async = simulated_alert
+
+    # 다른 프로세스가 잠근 행만 남아 묶음이 덜 차면 run_table 이 끝나므로, 더 가져올 행이 없을 때까지 반복합니다.
+    while await watcher.run_table(table):
+        pass
+    await watcher.engine.dispose()
+    return {"processed_ids": processed_ids, "alerts": alerts}
+
+
+def _replica_main(table: str, alert_latency_ms: int, barrier, results):
+    sys.stdout = open(os.devnull, "w")  # 감시 로그는 출력하지 않습니다.
+    barrier.wait()
+    results.put(asyncio.run(_run_replica(table, alert_latency_ms)))
+
+
+def run_replicas(table: str, replicas: int, alert_latency_ms: int) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(replicas + 1)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_replica_main, args=(table, alert_latency_ms, barrier, results))
+                 for _ in range(replicas)]
+    for p in processes:
+        p.start()
+
+    # 모든 프로세스가 import 를 마친 뒤 동시에 시작합니다.
+    barrier.wait()
+    started = time.perf_counter()
+    outputs = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for p in processes:
+        p.join()
+
+    processed_ids = [i for out in outputs for i in out["processed_ids"]]
+    alerts = [a for out in outputs for a in out["alerts"]]
+    return {
+        "replicas": replicas,
+        "elapsed": elapsed,
+        "processed": len(processed_ids),
+        "duplicate_rows": len(processed_ids) - len(set(processed_ids)),
+        "alerts": len(alerts),
+        "duplicate_alerts": len(alerts) - len(set(alerts)),
+        "per_replica": [len(out["processed_ids"]) for out in outputs],
+    }
+
+
+def main(table: str, rows: int, users: int, replica_counts: List[int], alert_latency_ms: int) -> int:
+    print(f"🌱 합성 백로그 생성: {table} {rows}행, 사용자 {users}명")
+    asyncio.run(seed(table, rows, users))
+
+    failed = False
+    try:
+        for replicas in replica_counts:
+            asyncio.run(reset(table))
+            r = run_replicas(table, replicas, alert_latency_ms)
+            ok = r["processed"] == rows and not r["duplicate_rows"] and not r["duplicate_alerts"]
+            failed |= not ok
+            print(f"   - {'✅' if ok else '❌'} 프로세스 {r['replicas']:>2}개: {r['processed']}행 {r['elapsed']:.2f}초 "
+                  f"({r['processed'] / r['elapsed']:.0f}행/초), 프로세스별 {r['per_replica']}, "
+                  f"알림 {r['alerts']}건, 중복 행 {r['duplicate_rows']}, 중복 알림 {r['duplicate_alerts']}")
+    finally:
+        asyncio.run(cleanup(table))
+        print("🧹 합성 데이터 삭제 완료")
+    return 1 if failed else 0
+
+
+# --- 스크립트 실행 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="postgres_watcher 다중 프로세스 처리량 / 중복 측정")
+    parser.add_argument("--table", choices=list(SEED_SQL), default="Attack_log")
+    parser.add_argument("--rows", type=int, default=200000, help="미발송 백로그 행 수")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1, 2, 4, 8], help="측정할 프로세스 수 목록")
+    parser.add_argument("--alert-latency-ms", type=int, default=20, help="알림 API 호출 대신 기다릴 시간")
+    args = parser.parse_args()
+    sys.exit(main(args.table, args.rows, args.users, args.replicas, args.alert_latency_ms))
@@ -4,12 +4,13 @@ from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel, Field # Field를 import 합니다.
-from typing import List # List 타입을 import 합니다.
-from datetime import datetime, timezone
+from typing import List, Optional # List 타입을 import 합니다.
+from datetime import datetime, timedelta, timezone
 
 from ..services import email_service, sms_service
+from ..services.agent_response_producer import agent_response_producer
 from ..core.database import get_db
-from ..models.models import User, IncidentLogReport, IncidentTrafficReport
+from ..models.models import User, IncidentLogReport, IncidentTrafficReport, BlockIP, PolicyAction
 
 router = APIRouter(prefix="/api/internal", tags=["Internal Notifier"])
 
@@ -31,6 +32,13 @@ async def trigger_user_alert(
     내부 모니터링 시스템으로부터 그룹화된 공격 알림 요청을 받아,
     DB에 대표 인시던트 보고서를 생성하고 알림을 발송합니다.
     """
+    return await handle_alert(payload, db, background_tasks)
+
+async def handle_alert(payload: AlertPayload, db: AsyncSession, background_tasks: BackgroundTasks) -> dict:
+    """
+    알림 처리 본문입니다. API 와 같은 프로세스에서 도는 감시 프로세스는 HTTP 를 거치지 않고 이 함수를 직접 호출합니다.
+    (postgres_watcher, MONITORING_ALERT_DISPATCH=inprocess)
+    """
     # 1. 사용자 정보 조회
     stmt = select(User).where(User.user_id == payload.user_id)
     result = await db.execute(stmt)
@@ -75,3 +83,69 @@ async def trigger_user_alert(
         background_tasks.add_task(sms_service.send_alert_sms, db_user.phone, sms_message)
 
     return {"message": "Alert tasks have been successfully scheduled."}
+
+# ▼▼▼ 대응 조치: Block_ip / Policy_actions 에 기록한 뒤 에이전트 응답 토픽으로 전달합니다. ▼▼▼
+class BlockIPRequest(BaseModel):
+    ip_address: str
+    port: Optional[int] = None
+    host_address: Optional[str] = None
+    traffic_attack_id: Optional[int] = None
+    log_attack_id: Optional[int] = None
+    duration_minutes: int = Field(60, gt=0)
+
+class PolicyActionRequest(BaseModel):
+    action_type: str = Field(..., max_length=50)
+    target: str = Field(..., max_length=100)
+    traffic_attack_id: Optional[int] = None
+    log_attack_id: Optional[int] = None
+
+async def _publish_response(publish, row) -> dict:
+    """
+    프로듀서 버퍼에 넣는 것까지만 기다리고 브로커 확인은 기다리지 않습니다. (전달 결과는 프로듀서 metrics 에서 집계)
+    Kafka 에 연결할 수 없으면 기록은 남기고 503 을 반환합니다.
+    """
+    try:
+        await publish(row)
+    except Exception as e:
+        print(f"❌ 에이전트 응답 전송 실패: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Response recorded but could not be sent to agents.")
+    return {"message": "Response action has been queued for agents."}
+
+@router.post("/response/block-ip", status_code=status.HTTP_202_ACCEPTED)
+async def block_ip(payload: BlockIPRequest, db: AsyncSession = Depends(get_db)):
+    """IP/호스트 차단을 Block_ip 에 기록하고 에이전트에게 차단 지시를 보냅니다."""
+    now = datetime.now(timezone.utc)
+    block = BlockIP(
+        traffic_attack_id=payload.traffic_attack_id,
+        log_attack_id=payload.log_attack_id,
+        ip_address=payload.ip_address,
+        port=payload.port,
+        host_address=payload.host_address,
+        blocked_at=now,
+        expires_at=now + timedelta(minutes=payload.duration_minutes),
+        status=True,
+    )
+    db.add(block)
+    await db.commit()
+    await db.refresh(block)
+    result = await _publish_response(agent_response_producer.publish_block_ip, block)
+    return {**result, "block_id": block.block_id}
+
+@router.post("/response/policy-action", status_code=status.HTTP_202_ACCEPTED)
+async def policy_action(payload: PolicyActionRequest, db: AsyncSession = Depends(get_db)):
+    """정책 조치를 Policy_actions 에 기록하고 에이전트에게 조치 지시를 보냅니다."""
+    now = datetime.now(timezone.utc)
+    action = PolicyAction(
+        traffic_attack_id=payload.traffic_attack_id,
+        log_attack_id=payload.log_attack_id,
+        action_type=payload.action_type,
+        target=payload.target,
+        triggered_at=now,
+        executed_at=now,
+        status=True,
+    )
+    db.add(action)
+    await db.commit()
+    await db.refresh(action)
+    result = await _publish_response(agent_response_producer.publish_policy_action, action)
+    return {**result, "action_id": action.action_id}
@@ -1,8 +1,9 @@
 # src/routes/users.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import Annotated # Python 3.9+에서 Depends와 함께 사용
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, Optional # Python 3.9+에서 Depends와 함께 사용
 from elasticsearch import Elasticsearch
 
 # 상대 경로 임포트
@@ -11,6 +12,8 @@ from ..models.models import User # ORM 모델 (user_model 대신 직접 User 임
 from ..utils.auth import get_current_user # 현재 사용자 가져오는 의존성
 from ..core.database import get_db # DB 세션 의존성
 from ..services import user_service # 사용자 서비스 임포트
+from ..services.langchain_agent.log_data import log_user_service # 위협 로그 조회 서비스
+from ..services.langchain_agent.packet_data import traffic_user_service # 공격 트래픽 조회 서비스
 
 # --- 설정 파일 임포트 ---
 from ..core.config import settings # Settings 객체 임포트
@@ -103,6 +106,39 @@ def get_my_recent_attacks(current_user: Annotated[User, Depends(get_current_user
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch data from Elasticsearch: {e}")
 
+# ----------------------------------------------------
+# 나의 위협 로그 / 공격 트래픽 목록 (커서 기반 페이지네이션)
+# ----------------------------------------------------
+@router.get("/me/attacks/logs", summary="현재 사용자의 위협 로그 목록 조회 (커서 페이지네이션)")
+async def list_my_threat_logs(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+):
+    """
+    Attack_log 를 최신순으로 조회합니다. 응답의 `next_cursor` 를 `cursor` 로 넘기면 다음 페이지를 조회하며,
+    더 이상 데이터가 없으면 `next_cursor` 는 null 입니다.
+    """
+    try:
+        return await log_user_service.get_threat_logs_page(db, current_user.user_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/me/attacks/traffic", summary="현재 사용자의 공격 트래픽 목록 조회 (커서 페이지네이션)")
+async def list_my_traffic_attacks(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+):
+    """Attack_traffic 을 최신순으로 조회합니다. 페이지네이션 방식은 /me/attacks/logs 와 같습니다."""
+    try:
+        return await traffic_user_service.get_traffic_attacks_page(db, current_user.user_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 # ----------------------------------------------------
 # (선택 사항) 특정 user_id를 가진 사용자 조회 (어드민용 등)
 # ----------------------------------------------------
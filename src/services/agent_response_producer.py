@@ -0,0 +1,143 @@
+# src/services/agent_response_producer.py
+import asyncio
+import json
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional
+
+from aiokafka import AIOKafkaProducer
+
+from ..core.config import settings
+from ..models.models import BlockIP, PolicyAction
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def block_ip_message(block: BlockIP) -> Dict[str, Any]:
+    """Block_ip 행을 에이전트가 수행할 차단 지시 메시지로 변환합니다."""
+    return {
+        "type": "block_ip",
+        "block_id": block.block_id,
+        "traffic_attack_id": block.traffic_attack_id,
+        "log_attack_id": block.log_attack_id,
+        "ip_address": block.ip_address,
+        "port": block.port,
+        "host_address": block.host_address,
+        "blocked_at": block.blocked_at,
+        "expires_at": block.expires_at,
+        "status": block.status,
+    }
+
+
+def policy_action_message(action: PolicyAction) -> Dict[str, Any]:
+    """Policy_actions 행을 에이전트가 수행할 정책 조치 메시지로 변환합니다."""
+    return {
+        "type": "policy_action",
+        "action_id": action.action_id,
+        "traffic_attack_id": action.traffic_attack_id,
+        "log_attack_id": action.log_attack_id,
+        "action_type": action.action_type,
+        "target": action.target,
+        "triggered_at": action.triggered_at,
+        "executed_at": action.executed_at,
+        "status": action.status,
+    }
+
+
+class AgentResponseProducer:
+    """
+    차단/정책 조치를 kafka_topic_agent_response 토픽으로 보내는 비동기 프로듀서입니다.
+
+    - linger_ms 동안 메시지를 모아 한 번에 보내고(배치), 배치 단위로 압축합니다. (gzip 기본, lz4 는 lz4 패키지 필요)
+    - 같은 호스트/IP 에 대한 지시는 같은 파티션으로 가도록 호스트 주소(없으면 IP)를 키로 사용해 순서를 보장합니다.
+    - publish()는 프로듀서 버퍼에 넣는 것까지만 기다리고 브로커 응답은 기다리지 않습니다.
+      전달 결과와 지연 시간(전송 요청 → 브로커 확인)은 콜백에서 집계하여 metrics()로 제공합니다.
+    - 처음 publish() 할 때 연결하므로, Kafka 가 없어도 API 서버 기동에는 영향이 없습니다.
+    """
+
+    def __init__(self, topic: Optional[str] = None):
+        self.topic = topic or settings.kafka_topic_agent_response
+        self.producer: Optional[AIOKafkaProducer] = None
+        self._start_lock = asyncio.Lock()
+
+        self.sent = 0
+        self.delivered = 0
+        self.failed = 0
+        self._latencies_ms: Deque[float] = deque(maxlen=1024)
+
+    async def start(self):
+        async with self._start_lock:
+            if self.producer is not None:
+                return
+            producer = AIOKafkaProducer(
+                bootstrap_servers=settings.kafka_bootstrap_servers,
+                linger_ms=settings.agent_response_linger_ms,
+                max_batch_size=settings.agent_response_batch_bytes,
+                compression_type=settings.agent_response_compression or None,
+                acks="all",
+                enable_idempotence=True,
+                key_serializer=lambda key: key.encode("utf-8") if key is not None else None,
+                value_serializer=lambda value: json.dumps(value, default=_json_default, ensure_ascii=False).encode("utf-8"),
+            )
+            await producer.start()
+            self.producer = producer
+            print(f"🚀 에이전트 응답 프로듀서 시작: '{self.topic}' (linger_ms={settings.agent_response_linger_ms}, compression={settings.agent_response_compression})")
+
+    async def stop(self):
+        """버퍼에 남은 메시지를 모두 보낸 뒤 종료합니다."""
+        if self.producer is not None:
+            await self.producer.stop()
+            self.producer = None
+
+    async def publish(self, message: Dict[str, Any], key: Optional[str] = None) -> asyncio.Future:
+        """메시지를 전송 버퍼에 넣고, 브로커 확인을 기다리는 future 를 반환합니다. (await 하지 않아도 됨)"""
+        if self.producer is None:
+            await self.start()
+        message.setdefault("issued_at", datetime.now(timezone.utc))
+        started = time.monotonic()
+        future = await self.producer.send(self.topic, value=message, key=key)
+        self.sent += 1
+        future.add_done_callback(lambda f: self._on_delivery(f, started, message))
+        return future
+
+    async def publish_block_ip(self, block: BlockIP) -> asyncio.Future:
+        return await self.publish(block_ip_message(block), key=str(block.host_address or block.ip_address))
+
+    async def publish_policy_action(self, action: PolicyAction) -> asyncio.Future:
+        return await self.publish(policy_action_message(action), key=action.target)
+
+    def _on_delivery(self, future: asyncio.Future, started: float, message: Dict[str, Any]):
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+            print(f"❌ 에이전트 응답 전송 실패 ({message.get('type')}): {future.exception() if not future.cancelled() else 'cancelled'}")
+            return
+        self.delivered += 1
+        self._latencies_ms.append((time.monotonic() - started) * 1000)
+
+    def metrics(self) -> Dict[str, Any]:
+        """전송/확인/실패 건수와 최근 1024건의 전달 지연(ms) p50/p99 를 반환합니다."""
+        latencies = sorted(self._latencies_ms)
+
+        def percentile(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 2)
+
+        return {
+            "topic": self.topic,
+            "sent": self.sent,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "in_flight": self.sent - self.delivered - self.failed,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99),
+        }
+
+
+# 프로세스 전역 프로듀서 인스턴스
+agent_response_producer = AgentResponseProducer()
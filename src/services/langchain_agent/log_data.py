@@ -1,15 +1,25 @@
 # app/services/log_dashboard_service.py
 
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-# ▼▼▼ [수정] literal_column을 import하여 SQL 문법 오류를 해결합니다. ▼▼▼
-from sqlalchemy import select, func, text, literal_column
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from elasticsearch import AsyncElasticsearch
 
 from src.core.config import settings
-from app.models.models import AttackLog
+from src.models.models import AttackLog, AttackLogRollup
+from src.utils.pagination import encode_cursor, decode_cursor
+
+_TIME_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+def _parse_time_range(time_range: str) -> timedelta:
+    """'30m' / '24h' / '7d' 형태의 기간을 timedelta 로 변환합니다. (형식이 다르면 7일)"""
+    unit = _TIME_UNITS.get(time_range[-1:])
+    if unit is None or not time_range[:-1].isdigit():
+        return timedelta(days=7)
+    return timedelta(**{unit: int(time_range[:-1])})
 
 class LogDashboardService:
     """
@@ -47,19 +57,38 @@ class LogDashboardService:
             "distribution": []
         }
         try:
-            sql_interval = time_range.replace('h', ' hour').replace('d', ' day').replace('m', ' minute')
-            
-            # ▼▼▼ [수정] func.text() 대신 literal_column()을 사용하여 SQL 문법 오류를 해결합니다. ▼▼▼
-            stmt = select(
+            # 1분 롤업(Attack_log_rollup)에서 완전한 버킷을 합산하고, 시작 시각이 걸친 첫 버킷의 일부만 원본에서 셉니다.
+            # → 조회 비용이 탐지 건수가 아니라 (유형 수 × 분 수)에 비례하므로 공격량이 늘어도 일정합니다.
+            since = datetime.now(timezone.utc) - _parse_time_range(time_range)
+            first_full_bucket = since.replace(second=0, microsecond=0)
+            if first_full_bucket < since:
+                first_full_bucket += timedelta(minutes=1)
+
+            counts: Dict[str, int] = {}
+            rollup_stmt = select(
+                AttackLogRollup.attack_type,
+                func.sum(AttackLogRollup.count).label("count")
+            ).where(
+                AttackLogRollup.user_id == user_id,
+                AttackLogRollup.bucket >= first_full_bucket
+            ).group_by(AttackLogRollup.attack_type)
+            partial_stmt = select(
                 AttackLog.attack_type,
                 func.count(AttackLog.log_id).label("count")
             ).where(
                 AttackLog.user_id == user_id,
-                AttackLog.detected_at >= func.now() - literal_column(f"INTERVAL '{sql_interval}'")
-            ).group_by(AttackLog.attack_type).order_by(func.count(AttackLog.log_id).desc())
-            
-            summary_result = await db.execute(stmt)
-            distribution_data = [{"type": row.attack_type, "count": row.count} for row in summary_result.mappings().all()]
+                AttackLog.detected_at >= since,
+                AttackLog.detected_at < first_full_bucket
+            ).group_by(AttackLog.attack_type)
+
+            for stmt in (rollup_stmt, partial_stmt):
+                for row in (await db.execute(stmt)).mappings().all():
+                    counts[row.attack_type] = counts.get(row.attack_type, 0) + int(row.count)
+
+            distribution_data = [
+                {"type": attack_type, "count": count}
+                for attack_type, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)
+            ]
 
             if distribution_data:
                 results["distribution"] = distribution_data
@@ -101,5 +130,40 @@ class LogDashboardService:
             print(f"❌ DB 최신 위협 로그 조회 실패 (User: {user_id}): {e}", flush=True)
             return []
 
+    async def get_threat_logs_page(self, db: AsyncSession, user_id: str, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        특정 사용자의 위협 로그를 최신순으로 한 페이지 조회합니다. (detected_at, log_id 키셋 페이지네이션)
+        응답의 next_cursor 를 다음 요청의 cursor 로 넘기면 이어서 조회하며, 몇 번째 페이지든 비용이 같습니다.
+        커서 형식이 잘못되었으면 ValueError 를 발생시킵니다.
+        """
+        after = decode_cursor(cursor)
+        try:
+            stmt = select(
+                AttackLog.log_id,
+                AttackLog.detected_at,
+                AttackLog.attack_type,
+                AttackLog.source_address,
+                AttackLog.description,
+                AttackLog.hostname
+            ).where(AttackLog.user_id == user_id)
+            if after:
+                stmt = stmt.where(tuple_(AttackLog.detected_at, AttackLog.log_id) < tuple_(*after))
+            # 한 건을 더 읽어 다음 페이지가 있는지 확인합니다.
+            stmt = stmt.order_by(AttackLog.detected_at.desc(), AttackLog.log_id.desc()).limit(limit + 1)
+
+            rows = (await db.execute(stmt)).mappings().all()
+            items = []
+            for row in rows[:limit]:
+                details = dict(row)
+                details["process_name"] = (details.pop("description") or {}).get("process_path", "N/A")
+                items.append(details)
+
+            next_cursor = encode_cursor(rows[limit - 1].detected_at, rows[limit - 1].log_id) if len(rows) > limit else None
+            return {"items": items, "next_cursor": next_cursor}
+        except Exception as e:
+            await db.rollback()
+            print(f"❌ DB 위협 로그 페이지 조회 실패 (User: {user_id}): {e}", flush=True)
+            return {"items": [], "next_cursor": None}
+
 # 서비스 인스턴스 생성
 log_user_service = LogDashboardService()
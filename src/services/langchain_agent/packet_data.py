@@ -1,14 +1,15 @@
 # app/services/packet_data.py
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from elasticsearch import AsyncElasticsearch, NotFoundError
 
 from src.core.config import settings
-from app.models.models import AttackTraffic
+from src.models.models import AttackTraffic
+from src.utils.pagination import encode_cursor, decode_cursor
 
 
 class TrafficDashboardService:
@@ -218,5 +219,36 @@ class TrafficDashboardService:
             print(f"❌ ES IP별 트래픽 요약 조회 실패 (User: {user_id}): {e}", flush=True)
             return []
 
+    async def get_traffic_attacks_page(self, db: AsyncSession, user_id: str, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        특정 사용자의 공격 트래픽을 최신순으로 한 페이지 조회합니다. ("@timestamp", traffic_id 키셋 페이지네이션)
+        커서 형식이 잘못되었으면 ValueError 를 발생시킵니다.
+        """
+        after = decode_cursor(cursor)
+        try:
+            stmt = select(
+                AttackTraffic.traffic_id,
+                AttackTraffic.timestamp,
+                AttackTraffic.src_ip,
+                AttackTraffic.dst_port,
+                AttackTraffic.protocol,
+                AttackTraffic.flow_duration,
+                AttackTraffic.tot_fwd_pkts,
+                AttackTraffic.tot_bwd_pkts,
+                AttackTraffic.flow_byts_per_s
+            ).where(AttackTraffic.user_id == user_id)
+            if after:
+                stmt = stmt.where(tuple_(AttackTraffic.timestamp, AttackTraffic.traffic_id) < tuple_(*after))
+            stmt = stmt.order_by(AttackTraffic.timestamp.desc(), AttackTraffic.traffic_id.desc()).limit(limit + 1)
+
+            rows = (await db.execute(stmt)).mappings().all()
+            items = [dict(row) for row in rows[:limit]]
+            next_cursor = encode_cursor(rows[limit - 1].timestamp, rows[limit - 1].traffic_id) if len(rows) > limit else None
+            return {"items": items, "next_cursor": next_cursor}
+        except Exception as e:
+            await db.rollback()
+            print(f"❌ DB 공격 트래픽 페이지 조회 실패 (User: {user_id}): {e}", flush=True)
+            return {"items": [], "next_cursor": None}
+
 # 서비스 인스턴스 생성
 traffic_user_service = TrafficDashboardService()
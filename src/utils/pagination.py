@@ -0,0 +1,31 @@
+# src/utils/pagination.py
+
+"""
+(시간, id) 키셋 페이지네이션용 커서입니다.
+
+OFFSET 은 앞 페이지의 행을 모두 읽고 버리므로 뒤 페이지일수록 느려집니다.
+대신 마지막으로 받은 행의 (시간, id) 를 커서로 돌려주고, 다음 페이지는 그보다 작은 행부터 인덱스로 바로 찾습니다.
+커서는 클라이언트가 내용을 해석하지 않도록 base64url 로 감싼 불투명 문자열입니다.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """커서를 (시간, id) 로 되돌립니다. 없으면 None, 형식이 잘못되었으면 ValueError 를 발생시킵니다."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"잘못된 커서입니다: {cursor}") from e
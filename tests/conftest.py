@@ -0,0 +1,8 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# --- 프로젝트 경로 설정 (src 패키지 import) ---
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
@@ -0,0 +1,90 @@
+# tests/test_preprocess.py
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import RobustScaler
+
+from src.inference.preprocess import FusedTrafficPreprocessor, _allocated_bytes, _sklearn_transform, compare_with_sklearn
+
+N_FEATURES = 21
+
+
+def _fit(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = np.abs(rng.standard_normal((500, N_FEATURES))) * rng.uniform(1, 1e6, N_FEATURES)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    imputer = SimpleImputer(strategy="median").fit(X)
+    scaler = RobustScaler().fit(imputer.transform(X))
+    return imputer, scaler
+
+
+def _inputs(n_rows: int, seed: int) -> np.ndarray:
+    """결측값(NaN) / ±inf 와 전부 NaN 인 행이 섞인 입력"""
+    rng = np.random.default_rng(seed)
+    X = np.abs(rng.standard_normal((n_rows, N_FEATURES))) * 1e4
+    X[rng.random(X.shape) < 0.05] = np.nan
+    X[rng.random(X.shape) < 0.01] = np.inf
+    X[rng.random(X.shape) < 0.01] = -np.inf
+    X[::7] = np.nan
+    return X
+
+
+def _assert_matches(imputer, scaler, actual: np.ndarray, X: np.ndarray):
+    expected = _sklearn_transform(imputer, scaler, X)
+    assert actual.dtype == np.float32 and actual.shape == expected.shape
+    np.testing.assert_array_equal(actual, expected.astype(np.float32))
+
+
+def test_matches_sklearn_with_nan_rows():
+    imputer, scaler = _fit()
+    X = _inputs(300, seed=1)
+    before = X.copy()
+    preprocessor = FusedTrafficPreprocessor(imputer, scaler)
+
+    _assert_matches(imputer, scaler, preprocessor.transform(X), X)
+    np.testing.assert_array_equal(X, before)  # 입력은 변경하지 않습니다.
+
+    report = compare_with_sklearn(imputer, scaler, n_rows=512, seed=2)
+    assert report["passed"], report
+
+
+def test_larger_batch_after_smaller_one_grows_buffer():
+    imputer, scaler = _fit()
+    preprocessor = FusedTrafficPreprocessor(imputer, scaler, initial_rows=16)
+
+    small = _inputs(10, seed=3)
+    _assert_matches(imputer, scaler, preprocessor.transform(small), small)
+    assert preprocessor.buffer_growths == 0
+
+    large = _inputs(1000, seed=4)
+    _assert_matches(imputer, scaler, preprocessor.transform(large), large)
+    assert preprocessor.buffer_growths == 1
+    assert preprocessor.stats()["buffer_rows"] >= 1000
+
+    # 늘어난 버퍼에서 다시 작은 배치를 처리해도 이전 배치의 값이 섞이지 않아야 합니다.
+    _assert_matches(imputer, scaler, preprocessor.transform(small), small)
+
+
+def test_repeated_calls_do_not_allocate():
+    imputer, scaler = _fit()
+    preprocessor = FusedTrafficPreprocessor(imputer, scaler, initial_rows=8192)
+    X = _inputs(8192, seed=5)
+    first = preprocessor.transform(X)
+
+    for seed in (6, 7, 8):
+        X = _inputs(8192, seed=seed)
+        out = preprocessor.transform(X)
+        assert np.shares_memory(out, first)
+        _assert_matches(imputer, scaler, out, X)
+    assert preprocessor.buffer_growths == 0
+
+    # numpy ufunc 의 고정 크기 내부 버퍼(최대 8192 원소) 외에는 할당하지 않으므로 배치 크기와 무관해야 하고,
+    # 호출마다 (n, 21) float64 배열 두 개를 만드는 sklearn 경로보다 훨씬 적어야 합니다.
+    small = _allocated_bytes(preprocessor.transform, X[:1024])
+    large = _allocated_bytes(preprocessor.transform, X)
+    assert large - small < 4096
+    assert large * 10 < _allocated_bytes(_sklearn_transform, imputer, scaler, X)
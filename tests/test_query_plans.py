@@ -0,0 +1,206 @@
+# tests/test_query_plans.py
+
+"""
+자주 실행되는 조회가 인덱스를 타는지 EXPLAIN 으로 확인하는 회귀 검사입니다. (migrations/002_hot_query_indexes.sql)
+
+한 트랜잭션 안에서 합성 사용자 / Attack_log / Attack_traffic / Alert_History 행을 넣고 ANALYZE 한 뒤
+각 조회의 실행 계획을 확인하고, 마지막에 롤백하므로 DB 에는 아무것도 남지 않습니다.
+DATABASE_URL 의 Postgres 에 연결할 수 없으면 건너뜁니다.
+
+    pytest tests/test_query_plans.py
+    QUERY_PLAN_ROWS=500000 pytest tests/test_query_plans.py
+"""
+
+import os
+import json
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pytest
+
+pytest.importorskip("asyncpg")
+
+from sqlalchemy import text
+
+try:
+    from src.core.database import engine
+    from src.models.models import AttackLog, AttackTraffic
+    from src.monitoring.postgres_watcher import claim_statement, cooldown_statement
+except Exception as e:  # DATABASE_URL 등 설정이 없는 환경
+    pytest.skip(f"DB 설정을 불러올 수 없습니다: {e}", allow_module_level=True)
+
+ROWS = int(os.getenv("QUERY_PLAN_ROWS", "200000"))
+USERS = 50
+# 이 행 수 이상인 테이블(또는 파티션)의 Seq Scan 만 실패로 판단합니다.
+MIN_ROWS = 1000
+
+SEED_USER_PREFIX = "plancheck_"
+_CHECKED_TABLES = ("Attack_log", "Attack_traffic", "Alert_History", "Attack_log_rollup")
+
+# 이름 → SQL 문자열(파라미터 :user_id / :since / :bucket) 또는 params 를 받아 SQLAlchemy 문을 만드는 함수
+QUERIES = {
+    # postgres_watcher.fetch_unprocessed_attacks 가 실제로 실행하는 FOR UPDATE SKIP LOCKED 문
+    "watcher_log": lambda p: claim_statement(AttackLog, "log_id"),
+    "watcher_traffic": lambda p: claim_statement(AttackTraffic, "traffic_id"),
+    # postgres_watcher.claim_alert_slots 의 쿨다운 INSERT ... ON CONFLICT DO UPDATE
+    "alert_cooldown": lambda p: cooldown_statement(
+        [(p["user_id"], t) for t in ("Execution", "Persistence", "Traffic Anomaly")], p["now"]
+    ),
+    # LogDashboardService.get_recent_threat_logs
+    "recent_threat_logs": (
+        'SELECT detected_at, attack_type, source_address, description, hostname FROM "Attack_log" '
+        'WHERE user_id = :user_id ORDER BY detected_at DESC LIMIT 100'
+    ),
+    # LogDashboardService.get_threat_logs_page
+    "threat_logs_page": (
+        'SELECT log_id, detected_at, attack_type FROM "Attack_log" WHERE user_id = :user_id '
+        'AND (detected_at, log_id) < (:since, 2147483647) ORDER BY detected_at DESC, log_id DESC LIMIT 51'
+    ),
+    # TrafficDashboardService.get_traffic_attacks_page
+    "traffic_attacks_page": (
+        'SELECT traffic_id, "@timestamp", "Src_IP" FROM "Attack_traffic" WHERE user_id = :user_id '
+        'AND ("@timestamp", traffic_id) < (:since, 2147483647) ORDER BY "@timestamp" DESC, traffic_id DESC LIMIT 51'
+    ),
+    # LogDashboardService.get_threat_summary: 완성된 1분 버킷은 롤업에서, 앞쪽 자투리 구간만 원본에서 셉니다.
+    "threat_summary_rollup": (
+        'SELECT attack_type, sum(count) FROM "Attack_log_rollup" WHERE user_id = :user_id AND bucket >= :bucket '
+        'GROUP BY attack_type'
+    ),
+    "threat_summary_partial": (
+        'SELECT attack_type, count(log_id) FROM "Attack_log" WHERE user_id = :user_id '
+        'AND detected_at >= :since AND detected_at < :bucket GROUP BY attack_type'
+    ),
+    # attack_search_tool
+    "attack_search_log": (
+        'SELECT detected_at, attack_type, source_address FROM "Attack_log" '
+        'WHERE user_id = :user_id AND detected_at >= :since ORDER BY detected_at DESC LIMIT 10'
+    ),
+    "attack_search_traffic": (
+        'SELECT "@timestamp", "Src_IP" FROM "Attack_traffic" '
+        'WHERE user_id = :user_id AND "@timestamp" >= :since ORDER BY "@timestamp" DESC LIMIT 10'
+    ),
+}
+
+
+async def seed(conn, rows: int, users: int):
+    """최근 90일에 고르게 분포된 합성 행을 넣습니다. 알림 미발송 행은 1% 입니다."""
+    params = {"rows": rows, "users": users, "prefix": SEED_USER_PREFIX}
+    await conn.execute(text("""
+        INSERT INTO "Users" (user_id, password_hash, email, name, phone, emp_number)
+        SELECT :prefix || g, 'x', :prefix || g || '@example.invalid', 'plan check', '000', 'E' || g
+        FROM generate_series(1, :users) g
+    """), params)
+    await conn.execute(text("""
+        INSERT INTO "Attack_log" (detected_at, attack_type, severity, confidence, source_address, hostname,
+                                  user_id, description, response_type, responded_at, notification)
+        SELECT now() - random() * INTERVAL '90 days',
+               (ARRAY['Execution', 'Persistence', 'Discovery', 'Lateral Movement'])[1 + g % 4],
+               'high', 90, '10.0.0.' || (g % 250), 'HOST' || (g % 50), :prefix || (1 + g % :users),
+               '{}'::jsonb, 'alert', now(), g % 100 <> 0
+        FROM generate_series(1, :rows) g
+    """), params)
+    await conn.execute(text("""
+        INSERT INTO "Attack_traffic" ("@timestamp", user_id, "Src_IP", "Dst_Port", "Protocol", "Flow_Duration",
+                                      "Tot_Fwd_Pkts", "Tot_Bwd_Pkts", "Flow_Byts_per_s", "Flow_Pkts_per_s", "Bwd_IAT_Tot",
+                                      "FIN_Flag_Cnt", "RST_Flag_Cnt", "PSH_Flag_Cnt", "ACK_Flag_Cnt", "URG_Flag_Cnt",
+                                      "Down_per_Up_Ratio", notification)
+        SELECT now() - random() * INTERVAL '90 days', :prefix || (1 + g % :users), '10.0.' || (g % 250) || '.1',
+               80, 6, 1000, 2, 1, 100.0, 10.0, 0, 0, 0, 0, 1, 0, 0, g % 100 <> 0
+        FROM generate_series(1, :rows) g
+    """), params)
+    await conn.execute(text("""
+        INSERT INTO "Alert_History" (user_id, attack_type, last_sent_at)
+        SELECT :prefix || u, t, now()
+        FROM generate_series(1, :users) u,
+             unnest(ARRAY['Execution', 'Persistence', 'Discovery', 'Lateral Movement', 'Traffic Anomaly']) t
+        ON CONFLICT DO NOTHING
+    """), params)
+    for table in _CHECKED_TABLES:
+        await conn.execute(text(f'ANALYZE "{table}"'))
+
+
+async def _row_counts(conn) -> Dict[str, float]:
+    """검사 대상 테이블과 그 파티션의 추정 행 수(pg_class.reltuples)."""
+    result = await conn.execute(text("""
+        SELECT c.relname, c.reltuples
+        FROM pg_class c
+        WHERE c.relkind IN ('r', 'p')
+          AND (c.relname = ANY(:tables)
+               OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent IN
+                            (SELECT oid FROM pg_class WHERE relname = ANY(:tables))))
+    """), {"tables": list(_CHECKED_TABLES)})
+    return {name: tuples for name, tuples in result.all()}
+
+
+async def _explain(conn, query, params: Dict[str, Any]) -> Dict[str, Any]:
+    if isinstance(query, str):
+        plan_json = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params)).scalar()
+    else:
+        # 워처가 실행하는 문장을 그대로 컴파일해 EXPLAIN 합니다. (asyncpg 는 $1, $2 ... 위치 파라미터)
+        compiled = query(params).compile(dialect=engine.dialect)
+        values = tuple(compiled.params[key] for key in compiled.positiontup)
+        plan_json = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", values)).scalar()
+    return (json.loads(plan_json) if isinstance(plan_json, str) else plan_json)[0]["Plan"]
+
+
+def _nodes(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    found = [plan]
+    for child in plan.get("Plans", []):
+        found.extend(_nodes(child))
+    return found
+
+
+async def _collect_plans() -> Dict[str, Any]:
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            await seed(conn, ROWS, USERS)
+            now = datetime.now(timezone.utc)
+            since = now - timedelta(days=7)
+            params = {
+                "user_id": f"{SEED_USER_PREFIX}1",
+                "since": since,
+                "bucket": since.replace(second=0, microsecond=0) + timedelta(minutes=1),
+                "now": now,
+            }
+            counts = await _row_counts(conn)
+            plans = {name: await _explain(conn, query, params) for name, query in QUERIES.items()}
+        finally:
+            await trans.rollback()
+    return {"counts": counts, "plans": plans}
+
+
+@pytest.fixture(scope="module")
+def explained():
+    async def run():
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            return e
+        try:
+            return await _collect_plans()
+        finally:
+            await engine.dispose()
+
+    result = asyncio.run(run())
+    if isinstance(result, Exception):
+        pytest.skip(f"Postgres 에 연결할 수 없습니다: {result}")
+    return result
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_query_uses_index(explained, name):
+    counts = explained["counts"]
+    seq_scans = [
+        node.get("Relation Name") for node in _nodes(explained["plans"][name])
+        if node.get("Node Type") == "Seq Scan" and counts.get(node.get("Relation Name"), 0) >= MIN_ROWS
+    ]
+    assert not seq_scans, f"{name}: Seq Scan {', '.join(seq_scans)}"
+
+
+def test_alert_cooldown_has_conflict_arbiter(explained):
+    # ON CONFLICT (user_id, attack_type) 는 유니크 인덱스를 중재자(arbiter)로 써야 합니다.
+    modify = [n for n in _nodes(explained["plans"]["alert_cooldown"]) if n.get("Node Type") == "ModifyTable"]
+    assert modify and modify[0].get("Conflict Arbiter Indexes")
@@ -0,0 +1,83 @@
+# tests/test_tree_ensemble.py
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+from src.inference.tree_ensemble import RoutedModel, TreeEnsemble, export_ensemble, load_model
+
+
+def _inputs(n_rows: int, n_features: int, seed: int) -> np.ndarray:
+    """결측값(NaN)과 ±inf 가 섞인 float32 입력"""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, n_features)) * 3
+    X[rng.random(X.shape) < 0.05] = np.nan
+    X[rng.random(X.shape) < 0.03] = np.inf
+    X[rng.random(X.shape) < 0.03] = -np.inf
+    return X.astype(np.float32)
+
+
+def _fit(n_classes: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((3000, 8)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int) + (X[:, 3] > 1) * (n_classes - 2 if n_classes > 2 else 0)
+    # 학습 데이터에도 결측값을 넣어 분기마다 default_left 가 달라지게 합니다.
+    X[rng.random(X.shape) < 0.1] = np.nan
+    model = xgb.XGBClassifier(n_estimators=40, max_depth=5, learning_rate=0.3, tree_method="hist", random_state=seed)
+    return model.fit(X, y)
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_xgboost_parity_with_missing_and_inf(n_classes, seed):
+    model = _fit(n_classes)
+    ensemble = export_ensemble(model)
+    X = _inputs(2000, ensemble.n_features, seed)
+
+    expected = np.asarray(model.predict_proba(X), dtype=np.float64)
+    actual = ensemble.predict_proba(X)
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+    assert (actual.argmax(axis=1) == expected.argmax(axis=1)).all()
+
+
+def test_breadth_first_layout():
+    ensemble = export_ensemble(_fit(3))
+    for start, end in zip(ensemble.roots, list(ensemble.roots[1:]) + [ensemble.n_nodes]):
+        nodes = np.arange(start, end)
+        is_leaf = ensemble.left[nodes] == nodes
+        # 내부 노드의 두 자식(left, left + 1)은 같은 트리 안에 있고, 리프는 임계값이 NaN 이라 제자리에 머뭅니다.
+        assert ((ensemble.left[nodes][~is_leaf] + 1) < end).all()
+        assert (ensemble.left[nodes][~is_leaf] > nodes[~is_leaf]).all()
+        assert np.isnan(ensemble.threshold[nodes][is_leaf]).all()
+
+
+def test_save_load_roundtrip(tmp_path):
+    model = _fit(3)
+    ensemble = export_ensemble(model)
+    path = str(tmp_path / "model.npz")
+    ensemble.save(path)
+    X = _inputs(500, ensemble.n_features, seed=3)
+    np.testing.assert_array_equal(TreeEnsemble.load(path).predict_proba(X), ensemble.predict_proba(X))
+
+
+def test_routed_model_uses_native_model_for_large_batches(tmp_path):
+    import joblib
+
+    model = _fit(2)
+    model_path, compiled_path = str(tmp_path / "model.joblib"), str(tmp_path / "model.npz")
+    joblib.dump(model, model_path)
+    export_ensemble(model).save(compiled_path)
+
+    routed = load_model(model_path, compiled_path, compiled_max_rows=16)
+    assert isinstance(routed, RoutedModel)
+    calls = []
+    routed.ensemble.predict_proba = lambda X: calls.append(("ensemble", len(X))) or np.zeros((len(X), 2))
+    routed.model.predict_proba = lambda X: calls.append(("model", len(X))) or np.zeros((len(X), 2))
+    routed.predict_proba(_inputs(16, 8, seed=0))
+    routed.predict_proba(_inputs(17, 8, seed=0))
+    assert calls == [("ensemble", 16), ("model", 17)]
+
+    assert isinstance(load_model(model_path, compiled_path, compiled_max_rows=0), TreeEnsemble)
+    assert not isinstance(load_model(model_path), (TreeEnsemble, RoutedModel))